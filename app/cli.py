@@ -0,0 +1,102 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli backfill-analytics [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+    python -m app.cli adjust-credit-limits percentage --percent 10 [--cap AMOUNT] [filters]
+    python -m app.cli adjust-credit-limits cap --cap AMOUNT [filters]
+    python -m app.cli adjust-credit-limits set --file limits.csv
+"""
+import argparse
+import csv
+import sys
+from datetime import date
+from app.config import settings
+from app.database import SessionLocal, init_db
+
+
+def backfill_analytics(args) -> int:
+    """Rebuild the daily transaction rollups from the transactions table"""
+    from app.services.analytics_service import AnalyticsService
+
+    db = SessionLocal()
+    try:
+        written = AnalyticsService(db).backfill_rollups(start=args.start, end=args.end)
+    finally:
+        db.close()
+
+    print(f"Rebuilt {written} daily rollup rows")
+    return 0
+
+
+def read_limits(path: str) -> dict:
+    """{customer_id: credit_limit} from a CSV file with customer_id and credit_limit columns"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return {int(row["customer_id"]): float(row["credit_limit"]) for row in csv.DictReader(f)}
+
+
+def adjust_credit_limits(args) -> int:
+    """Change many customers' credit limits by one rule, recording every change"""
+    from app.services.credit_limit_service import ADJUSTMENT_FILTERS, CreditLimitService
+
+    filters = {name: getattr(args, name) for name in ADJUSTMENT_FILTERS if getattr(args, name) is not None}
+    limits = read_limits(args.file) if args.file else None
+
+    db = SessionLocal()
+    try:
+        summary = CreditLimitService(db).adjust(
+            args.rule,
+            percent=args.percent,
+            cap=args.cap,
+            limits=limits,
+            filters=filters,
+            reason=args.reason,
+            batch_size=args.batch_size,
+            progress=lambda processed, changed: print(f"{processed} processed, {changed} changed", flush=True)
+        )
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        db.close()
+
+    print(f"Batch {summary['batch_id']}: changed {summary['changed']} of {summary['processed']} customers")
+    if summary["missing"]:
+        print(f"Customers not found: {', '.join(map(str, summary['missing']))}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Bareq Al-Yusr maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-analytics", help=backfill_analytics.__doc__)
+    backfill.add_argument("--from", dest="start", type=date.fromisoformat, help="First day (default: first transaction)")
+    backfill.add_argument("--to", dest="end", type=date.fromisoformat, help="Last day (default: last transaction)")
+    backfill.set_defaults(handler=backfill_analytics)
+
+    adjust = commands.add_parser("adjust-credit-limits", help=adjust_credit_limits.__doc__)
+    adjust.add_argument("rule", choices=["percentage", "cap", "set"])
+    adjust.add_argument("--percent", type=float, help="Change for the percentage rule, e.g. 10 or -5")
+    adjust.add_argument("--cap", type=float, help="Highest limit after the change")
+    adjust.add_argument("--file", help="CSV of customer_id,credit_limit for the set rule")
+    adjust.add_argument("--city")
+    adjust.add_argument("--min-limit", dest="min_limit", type=float)
+    adjust.add_argument("--max-limit", dest="max_limit", type=float)
+    adjust.add_argument("--min-utilisation", dest="min_utilisation", type=float, help="Used over credit limit, 0-1")
+    adjust.add_argument("--max-utilisation", dest="max_utilisation", type=float, help="Used over credit limit, 0-1")
+    adjust.add_argument("--reason", help="Stored on every audit row")
+    adjust.add_argument("--batch-size", dest="batch_size", type=int, default=settings.CREDIT_LIMIT_BATCH_SIZE)
+    adjust.set_defaults(handler=adjust_credit_limits)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    init_db()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,9 @@ from functools import lru_cache
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./bareq_alyusr.db"
+    DB_POOL_SIZE: int = 5  # Connections kept open, shared by the API and the mounted admin
+    DB_MAX_OVERFLOW: int = 10
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # How long a writer waits for the SQLite lock
     
     # JWT Settings
     SECRET_KEY: str = "your-super-secret-key-change-in-production"
@@ -18,15 +21,45 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     API_VERSION: str = "v1"
     
+    # Pagination
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+    COUNT_SCAN_LIMIT: int = 10000  # Filtered totals above this are reported as estimates
+    
     # Transaction Settings
     TRANSACTION_FEE_PERCENTAGE: float = 0.5
+    NODE_ID: Optional[int] = None  # Unique per host for reference numbers; derived from the pid if unset
+    TRANSACTION_CACHE_TTL_SECONDS: int = 300  # Cache for finished transactions looked up by reference
+    TRANSACTION_CACHE_SIZE: int = 2048
+    TRANSACTION_BATCH_MAX_SIZE: int = 500  # Max purchase requests per batch call
+    CREDIT_LIMIT_BATCH_SIZE: int = 1000  # Customers updated per transaction by bulk limit adjustments
     
     # Flask Admin
     FLASK_SECRET_KEY: str = "flask-admin-secret-key"
-    FLASK_PORT: int = 5000
+    FLASK_PORT: int = 5000  # Only used when flask_admin/app.py runs on its own
+    FLASK_ADMIN_MOUNT: str = "/flask"  # Serve the Flask admin inside the FastAPI app under this path; empty to disable
+    FLASK_ADMIN_THREADS: int = 4  # Threads running Flask requests in the FastAPI process
     
     # FastAPI
     FASTAPI_PORT: int = 8000
+    MAX_REQUEST_BODY_BYTES: int = 10 * 1024 * 1024  # Larger uploads get 413 from the PythonAnywhere bridge
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Smaller responses are sent uncompressed
+    FAST_JSON_RESPONSES: bool = False  # Encode default responses with orjson
+    LAZY_ROUTERS: bool = True  # Import each API router on the first request under its prefix
+    
+    # Production launcher (gunicorn.conf.py)
+    WORKERS: Optional[int] = None  # Defaults to the number of CPU cores
+    PRELOAD_APP: bool = True  # Import the app once in the master and fork workers from it
+    GRACEFUL_TIMEOUT_SECONDS: int = 30  # How long a stopping worker may spend finishing its requests
+    
+    # Background Jobs
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LEASE_SECONDS: int = 120
+    TRANSACTION_EXPIRY_INTERVAL_SECONDS: int = 60
+    TRANSACTION_EXPIRY_BATCH_SIZE: int = 500
+    OVERDUE_DETECTION_INTERVAL_SECONDS: int = 900
+    OVERDUE_DETECTION_BATCH_SIZE: int = 500
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 3600  # Recount the dashboard summary and report drift
     
     class Config:
         env_file = ".env"
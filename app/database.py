@@ -1,19 +1,84 @@
-from sqlalchemy import create_engine
+import hashlib
+import threading
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
-# Create database engine
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(settings.DATABASE_URL)
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    The process's only database engine, created on first use rather than at
+    import. The API and the mounted Flask admin share its pool.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                pool_options = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+                if settings.DATABASE_URL.startswith("sqlite"):
+                    if make_url(settings.DATABASE_URL).database in (None, "", ":memory:"):
+                        pool_options = {}  # In-memory databases keep one connection per thread
+                    engine = create_engine(
+                        settings.DATABASE_URL,
+                        connect_args={"check_same_thread": False},
+                        **pool_options
+                    )
+                    event.listen(engine, "connect", _sqlite_pragmas)
+                else:
+                    engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, **pool_options)
+                _engine = engine
+    return _engine
+
+
+def dispose_engine(close: bool = True) -> None:
+    """
+    Drop the engine's pooled connections. A forked worker calls this with
+    close=False so it opens its own connections without closing the ones
+    the parent still holds.
+    """
+    if _engine is not None:
+        _engine.dispose(close=close)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers run alongside the single writer, and busy_timeout makes
+    a writer wait for the lock instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    finally:
+        cursor.close()
+
+
+def __getattr__(name):
+    # `from app.database import engine` keeps working
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to the engine when the first session is made"""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
 
 # Create base class for models
 Base = declarative_base()
@@ -28,7 +93,92 @@ def get_db():
         db.close()
 
 
+def schema_fingerprint() -> str:
+    """Hash of every table, column and index the models declare"""
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(f"table {table.name}")
+        for column in table.columns:
+            parts.append(f"  {column.name} {column.type!r} nullable={column.nullable} pk={column.primary_key}")
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            expressions = ", ".join(str(expression) for expression in index.expressions)
+            parts.append(f"  index {index.name} ({expressions}) unique={index.unique}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _stamped_fingerprint(engine: Engine):
+    """Fingerprint recorded by the last init_db, or None before the first one"""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT fingerprint FROM schema_stamps WHERE id = 1")).scalar()
+    except DBAPIError:
+        return None
+
+
+def _add_missing_columns(connection) -> None:
+    """
+    Add nullable model columns that existing tables lack. create_all only
+    creates whole tables, so a column added to a model later would otherwise
+    never reach a database created before it.
+    """
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            connection.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN "
+                f"{preparer.format_column(column)} {column.type.compile(dialect=connection.dialect)}"
+            ))
+
+
 def init_db():
-    """Initialize database tables"""
-    from app.models import user, customer, merchant, transaction, repayment_plan
-    Base.metadata.create_all(bind=engine)
+    """
+    Initialize database tables.
+
+    Creating tables and indexes is skipped when schema_stamps already holds
+    the fingerprint of the current models, so a worker restart against an
+    up-to-date database costs one query instead of a catalog check per
+    table and index.
+    """
+    from app.models import (
+        user, customer, merchant, transaction, repayment_plan,
+        job_lease, job_checkpoint, overdue_summary, platform_stats,
+        transaction_rollup, credit_limit_change, schema_stamp
+    )
+    engine = get_engine()
+    fingerprint = schema_fingerprint()
+
+    if _stamped_fingerprint(engine) != fingerprint:
+        Base.metadata.create_all(bind=engine)
+
+        # create_all skips columns and indexes on tables that already exist. IF
+        # NOT EXISTS rather than checkfirst, which cannot see expression indexes
+        # on SQLite. Calling the DDL skips indexes meant for other dialects.
+        with engine.begin() as connection:
+            _add_missing_columns(connection)
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    CreateIndex(index, if_not_exists=True)(index, connection)
+
+        db = SessionLocal()
+        try:
+            db.merge(schema_stamp.SchemaStamp(id=1, fingerprint=fingerprint))
+            db.commit()
+        finally:
+            db.close()
+
+    # Seed the platform summary row and analytics rollups from the existing data
+    from app.services.stats_service import StatsService
+    from app.services.analytics_service import AnalyticsService
+    db = SessionLocal()
+    try:
+        StatsService(db).ensure_stats()
+        db.commit()
+        AnalyticsService(db).ensure_rollups()
+    finally:
+        db.close()
@@ -1,21 +1,27 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse
 from app.config import settings
-from app.database import init_db
-from app.routers import (
-    auth_router,
-    customers_router,
-    merchants_router,
-    transactions_router,
-    repayments_router
-)
-from app.routers import admin as admin_router
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from app.database import get_engine
+from app.routers import API_ROUTERS
+from app.services.scheduler import start_scheduler, stop_scheduler
+from app.utils.compression import CompressionMiddleware
+from app.utils.lazy_routers import LazyRouterMiddleware, LazyRouters, LazyWSGIApp
+from app.utils.responses import FastJSONResponse
+from app.utils.static_files import FrontendFiles
+from app.utils.worker_hooks import on_worker_start
+from contextlib import asynccontextmanager
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background jobs (transaction expiry) for the lifetime of the server"""
+    start_scheduler()
+    yield
+    stop_scheduler()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.APP_NAME,
@@ -40,7 +46,9 @@ app = FastAPI(
     """,
     version=settings.API_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
 )
 
 # Add CORS middleware
@@ -50,15 +58,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor and totals for list endpoints, and conditional GET validators
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Exact", "ETag"],
 )
 
-# Include routers
-app.include_router(auth_router, prefix="/api/v1")
-app.include_router(customers_router, prefix="/api/v1")
-app.include_router(merchants_router, prefix="/api/v1")
-app.include_router(transactions_router, prefix="/api/v1")
-app.include_router(repayments_router, prefix="/api/v1")
-app.include_router(admin_router.router, prefix="/api/v1")
+# Compress JSON, exports and the frontend for clients that accept it
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Include routers, on first use unless LAZY_ROUTERS is off
+api_routers = LazyRouters(app, "/api/v1", API_ROUTERS)
+if settings.LAZY_ROUTERS:
+    app.add_middleware(LazyRouterMiddleware, routers=api_routers)
+else:
+    api_routers.load_all()
+
+# The Flask admin runs in this process on the same engine and pool
+if settings.FLASK_ADMIN_MOUNT:
+    flask_admin = LazyWSGIApp("flask_admin.app:flask_app", threads=settings.FLASK_ADMIN_THREADS)
+    if not settings.LAZY_ROUTERS:
+        flask_admin.load()
+    app.mount(settings.FLASK_ADMIN_MOUNT, flask_admin, name="flask_admin")
+
+
+@on_worker_start
+def load_routers():
+    """Import every router now instead of on a worker's first requests"""
+    api_routers.load_all()
+    if settings.FLASK_ADMIN_MOUNT:
+        flask_admin.load()
+
+
+@on_worker_start
+def connect_database():
+    """Open the first pooled connection, and check the database is reachable"""
+    with get_engine().connect():
+        pass
 
 
 @app.get("/")
@@ -81,17 +115,16 @@ async def health_check():
 # Serve frontend static files (must be after API routes)
 frontend_dist = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "dist")
 if os.path.exists(frontend_dist):
-    # Serve static assets
-    app.mount("/assets", StaticFiles(directory=os.path.join(frontend_dist, "assets")), name="static")
+    # Read once; requests are answered from memory
+    frontend_files = FrontendFiles.load(frontend_dist)
     
     @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
+    async def serve_frontend(full_path: str, request: Request):
         """Serve frontend for all non-API routes"""
-        file_path = os.path.join(frontend_dist, full_path)
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-            return FileResponse(file_path)
-        # Return index.html for SPA routing
-        return FileResponse(os.path.join(frontend_dist, "index.html"))
+        static_file = frontend_files.lookup(full_path)
+        if static_file is None:
+            return Response(status_code=404)
+        return static_file.response(request.headers)
 
 
 if __name__ == "__main__":
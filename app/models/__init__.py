@@ -3,6 +3,13 @@ from app.models.customer import Customer
 from app.models.merchant import Merchant
 from app.models.transaction import Transaction, TransactionStatus
 from app.models.repayment_plan import RepaymentPlan, RepaymentSchedule, PaymentStatus
+from app.models.job_lease import JobLease
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.overdue_summary import CustomerOverdueSummary
+from app.models.platform_stats import PlatformStats
+from app.models.transaction_rollup import TransactionDailyRollup
+from app.models.credit_limit_change import CreditLimitChange
+from app.models.schema_stamp import SchemaStamp
 
 __all__ = [
     "User",
@@ -14,4 +21,11 @@ __all__ = [
     "RepaymentPlan",
     "RepaymentSchedule",
     "PaymentStatus",
+    "JobLease",
+    "JobCheckpoint",
+    "CustomerOverdueSummary",
+    "PlatformStats",
+    "TransactionDailyRollup",
+    "CreditLimitChange",
+    "SchemaStamp",
 ]
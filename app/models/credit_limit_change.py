@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class CreditLimitChange(Base):
+    """Audit row for one change to a customer's credit limit"""
+    __tablename__ = "credit_limit_changes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
+    
+    # Shared by every row written by one bulk adjustment, NULL for single updates
+    batch_id = Column(String(32), nullable=True, index=True)
+    
+    old_limit = Column(Float, nullable=False)
+    new_limit = Column(Float, nullable=False)
+    old_available = Column(Float, nullable=False)
+    new_available = Column(Float, nullable=False)
+    
+    reason = Column(String(500), nullable=True)
+    changed_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # Admin user, NULL from the CLI
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CreditLimitChange(customer_id={self.customer_id}, {self.old_limit} -> {self.new_limit})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Index, func, literal_column
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -6,6 +6,13 @@ from app.database import Base
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Admin customer list: keyset pagination per sort column and city filter
+        Index("ix_customers_created_at_id", "created_at", "id"),
+        Index("ix_customers_credit_limit_id", "credit_limit", "id"),
+        Index("ix_customers_available_limit_id", "available_limit", "id"),
+        Index("ix_customers_city_id", "city", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
@@ -59,3 +66,14 @@ class Customer(Base):
         # Ensure available_limit doesn't exceed credit_limit
         if self.available_limit > self.credit_limit:
             self.available_limit = self.credit_limit
+
+
+# Share of the credit limit in use, NULL when there is no limit. The index
+# only serves queries that spell the expression exactly this way, with a
+# literal 0 rather than a bound parameter.
+CUSTOMER_UTILISATION = Customer.used_limit / func.nullif(Customer.credit_limit, literal_column("0"), type_=Float)
+
+Index("ix_customers_utilisation", CUSTOMER_UTILISATION)
+
+# Admin prefix search on Postgres; see ix_users_full_name_prefix
+Index("ix_customers_national_id_prefix", Customer.national_id.collate("C")).ddl_if(dialect="postgresql")
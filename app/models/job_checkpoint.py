@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class JobCheckpoint(Base):
+    """High-water mark for incremental background jobs"""
+    __tablename__ = "job_checkpoints"
+    
+    name = Column(String(100), primary_key=True)  # Job name
+    high_water_mark = Column(DateTime, nullable=True)  # Everything before this has been processed
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<JobCheckpoint(name={self.name}, high_water_mark={self.high_water_mark})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class JobLease(Base):
+    """Lease row that elects a single worker to run a background job"""
+    __tablename__ = "job_leases"
+    
+    name = Column(String(100), primary_key=True)  # Job name
+    owner = Column(String(255), nullable=True)  # Worker currently holding the lease
+    acquired_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)  # Lease is free once this passes
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<JobLease(name={self.name}, owner={self.owner}, expires_at={self.expires_at})>"
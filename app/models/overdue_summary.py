@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+
+class CustomerOverdueSummary(Base):
+    """Per-customer overdue totals, maintained by the overdue detection job"""
+    __tablename__ = "customer_overdue_summaries"
+    
+    customer_id = Column(Integer, ForeignKey("customers.id"), primary_key=True)
+    
+    overdue_installments = Column(Integer, default=0)  # Number of overdue installments
+    overdue_amount = Column(Float, default=0.0, index=True)  # Unpaid amount across them
+    oldest_due_date = Column(DateTime, nullable=True)  # Earliest missed due date
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    customer = relationship("Customer")
+    
+    def __repr__(self):
+        return f"<CustomerOverdueSummary(customer_id={self.customer_id}, overdue_amount={self.overdue_amount})>"
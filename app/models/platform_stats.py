@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class PlatformStats(Base):
+    """Single-row summary of platform totals, kept up to date by the services"""
+    __tablename__ = "platform_stats"
+    
+    id = Column(Integer, primary_key=True)  # Always 1
+    
+    # Customers
+    customers_total = Column(Integer, default=0)
+    customers_approved = Column(Integer, default=0)
+    
+    # Merchants
+    merchants_total = Column(Integer, default=0)
+    merchants_approved = Column(Integer, default=0)
+    
+    # Transactions by status
+    transactions_total = Column(Integer, default=0)
+    transactions_pending = Column(Integer, default=0)
+    transactions_approved = Column(Integer, default=0)
+    transactions_rejected = Column(Integer, default=0)
+    transactions_cancelled = Column(Integer, default=0)
+    transactions_completed = Column(Integer, default=0)
+    transactions_expired = Column(Integer, default=0)
+    
+    # Approved + completed transactions
+    total_value = Column(Float, default=0.0)
+    total_fees = Column(Float, default=0.0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reconciled_at = Column(DateTime, nullable=True)  # Last full recompute
+    
+    def __repr__(self):
+        return f"<PlatformStats(customers={self.customers_total}, merchants={self.merchants_total}, transactions={self.transactions_total})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Enum as SQLEnum, String
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Enum as SQLEnum, String, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
@@ -41,6 +41,8 @@ class RepaymentPlan(Base):
     end_date = Column(DateTime, nullable=False)  # When last payment is due
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+    # Version of the plan and its schedules; see touch()
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     transaction = relationship("Transaction", back_populates="repayment_plan")
@@ -50,6 +52,10 @@ class RepaymentPlan(Base):
     def __repr__(self):
         return f"<RepaymentPlan(id={self.id}, months={self.number_of_months}, monthly={self.monthly_payment})>"
     
+    def touch(self) -> None:
+        """Mark the plan changed after changing only one of its schedules"""
+        self.updated_at = datetime.utcnow()
+    
     @staticmethod
     def calculate_monthly_payment(total_amount: float, number_of_months: int) -> float:
         """Calculate monthly payment amount"""
@@ -88,6 +94,10 @@ class RepaymentPlan(Base):
 class RepaymentSchedule(Base):
     """Individual payment schedule entries"""
     __tablename__ = "repayment_schedules"
+    __table_args__ = (
+        # Overdue detection scans open installments in due-date order
+        Index("ix_repayment_schedules_status_due_date", "status", "due_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     repayment_plan_id = Column(Integer, ForeignKey("repayment_plans.id"), nullable=False)
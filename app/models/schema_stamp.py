@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class SchemaStamp(Base):
+    """Single row recording the model fingerprint the tables were last created from"""
+    __tablename__ = "schema_stamps"
+    
+    id = Column(Integer, primary_key=True)  # Always 1
+    fingerprint = Column(String(64), nullable=False)
+    stamped_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SchemaStamp(fingerprint={self.fingerprint[:12]})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum as SQLEnum, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -14,8 +14,30 @@ class TransactionStatus(str, enum.Enum):
     EXPIRED = "expired"  # Request expired without customer response
 
 
+# Statuses a transaction never leaves once reached
+TERMINAL_TRANSACTION_STATUSES = frozenset({
+    TransactionStatus.COMPLETED,
+    TransactionStatus.REJECTED,
+    TransactionStatus.EXPIRED,
+    TransactionStatus.CANCELLED,
+})
+
+
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Expiry sweeps scan pending rows in expiry order
+        Index("ix_transactions_status_expires_at", "status", "expires_at"),
+        # Per-merchant status tallies for the balance summary
+        Index("ix_transactions_merchant_id_status", "merchant_id", "status"),
+        # Merchant statements range-scan approvals and completions by time
+        Index("ix_transactions_merchant_id_approved_at", "merchant_id", "approved_at"),
+        Index("ix_transactions_merchant_id_completed_at", "merchant_id", "completed_at"),
+        # Newest-first keyset pagination of transaction lists
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+        Index("ix_transactions_customer_id_created_at_id", "customer_id", "created_at", "id"),
+        Index("ix_transactions_merchant_id_created_at_id", "merchant_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
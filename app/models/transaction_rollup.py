@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class TransactionDailyRollup(Base):
+    """
+    Per-day transaction totals for analytics, kept up to date by the services.
+    
+    Transactions are counted on the day they were created, under their
+    current status, so a transaction moves between columns of the same row
+    as its status changes.
+    """
+    __tablename__ = "transaction_daily_rollups"
+    
+    bucket_date = Column(Date, primary_key=True)  # UTC day of Transaction.created_at
+    
+    # Transactions by current status
+    transactions_total = Column(Integer, default=0)
+    transactions_pending = Column(Integer, default=0)
+    transactions_approved = Column(Integer, default=0)
+    transactions_rejected = Column(Integer, default=0)
+    transactions_cancelled = Column(Integer, default=0)
+    transactions_completed = Column(Integer, default=0)
+    transactions_expired = Column(Integer, default=0)
+    
+    # Approved + completed transactions
+    total_value = Column(Float, default=0.0)
+    total_fees = Column(Float, default=0.0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<TransactionDailyRollup(date={self.bucket_date}, total={self.transactions_total})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -18,7 +18,7 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     phone_number = Column(String(20), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
-    full_name = Column(String(255), nullable=False)
+    full_name = Column(String(255), index=True, nullable=False)  # Admin name prefix search
     user_type = Column(SQLEnum(UserType), nullable=False)
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
@@ -32,3 +32,9 @@ class User(Base):
     
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, type={self.user_type})>"
+
+
+# Admin prefix search on Postgres, which compares in code point order (see
+# admin_service.prefix_match); SQLite's default indexes already sort that way
+Index("ix_users_full_name_prefix", User.full_name.collate("C")).ddl_if(dialect="postgresql")
+Index("ix_users_phone_number_prefix", User.phone_number.collate("C")).ddl_if(dialect="postgresql")
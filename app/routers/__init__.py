@@ -1,8 +1,30 @@
-from app.routers.auth import router as auth_router
-from app.routers.customers import router as customers_router
-from app.routers.merchants import router as merchants_router
-from app.routers.transactions import router as transactions_router
-from app.routers.repayments import router as repayments_router
+import importlib
+
+# First path segment under /api/v1 -> router module
+API_ROUTERS = {
+    "/auth": "app.routers.auth",
+    "/customers": "app.routers.customers",
+    "/merchants": "app.routers.merchants",
+    "/transactions": "app.routers.transactions",
+    "/repayments": "app.routers.repayments",
+    "/admin": "app.routers.admin",
+}
+
+_ROUTER_NAMES = {
+    "auth_router": "app.routers.auth",
+    "customers_router": "app.routers.customers",
+    "merchants_router": "app.routers.merchants",
+    "transactions_router": "app.routers.transactions",
+    "repayments_router": "app.routers.repayments",
+}
+
+
+def __getattr__(name):
+    # Routers are imported when first asked for, not with the package
+    if name in _ROUTER_NAMES:
+        return importlib.import_module(_ROUTER_NAMES[name]).router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "auth_router",
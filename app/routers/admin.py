@@ -1,15 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional, List
+from typing import Optional
+from datetime import date, datetime
 from app.database import get_db
 from app.models.user import User, UserType
-from app.models.customer import Customer
-from app.models.merchant import Merchant
-from app.models.transaction import Transaction, TransactionStatus
+from app.schemas.customer import CreditLimitAdjustment
+from app.services.admin_service import (
+    AdminService,
+    CUSTOMER_EXPORT_COLUMNS,
+    MERCHANT_EXPORT_COLUMNS,
+    parse_columns
+)
+from app.services.analytics_service import AnalyticsService, default_range_start
+from app.services.credit_limit_service import ADJUSTMENT_FILTERS, CreditLimitService
+from app.services.repayment_service import RepaymentService
+from app.services.stats_service import StatsService
 from app.utils.security import verify_password, create_access_token, get_password_hash
+from app.utils.metrics import metrics
+from app.utils.export import EXPORT_FORMATS, iter_export, rows_in_own_session
+from app.utils.pagination import (
+    InvalidCursor,
+    NEXT_CURSOR_HEADER,
+    TOTAL_COUNT_HEADER,
+    TOTAL_COUNT_EXACT_HEADER
+)
 from app.config import settings
-from datetime import datetime
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -36,6 +52,25 @@ def verify_admin_token(authorization: str, db: Session) -> User:
     return user
 
 
+def export_response(format: str, columns: Optional[str], available: dict, filename: str, fetch) -> StreamingResponse:
+    """Validate export parameters and stream fetch(db, column_names) in the requested format"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Valid values: {list(EXPORT_FORMATS)}")
+    
+    try:
+        names = parse_columns(columns, available)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    rows = rows_in_own_session(lambda db: fetch(db, names))
+    
+    return StreamingResponse(
+        iter_export(format, rows, names),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
+
+
 @router.post("/create-admin", response_model=dict)
 async def create_admin(
     email: str,
@@ -108,99 +143,196 @@ async def admin_login(
 @router.get("/dashboard", response_model=dict)
 async def dashboard(
     authorization: str,
+    live: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get admin dashboard statistics (live=true recounts the tables instead of reading the summary)"""
+    verify_admin_token(authorization, db)
+    
+    return StatsService(db).get_dashboard_stats(materialized=not live)
+
+
+@router.get("/metrics", response_model=dict)
+async def get_metrics(
+    authorization: str,
+    db: Session = Depends(get_db)
+):
+    """Get background job metrics (rows expired, sweep latency, job runs)"""
+    verify_admin_token(authorization, db)
+    
+    return metrics.snapshot()
+
+
+@router.post("/stats/reconcile", response_model=dict)
+async def reconcile_stats(
+    authorization: str,
+    db: Session = Depends(get_db)
+):
+    """Recount the dashboard statistics and report any drift that was corrected"""
+    verify_admin_token(authorization, db)
+
+    drift = StatsService(db).reconcile()
+    if drift:
+        metrics.increment("stats.drift_detected")
+
+    return {"drift": drift, "dashboard": StatsService(db).get_dashboard_stats()}
+
+
+@router.get("/analytics/transactions", response_model=dict)
+async def transaction_analytics(
+    authorization: str,
+    granularity: str = "day",
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
     db: Session = Depends(get_db)
 ):
-    """Get admin dashboard statistics"""
+    """Transaction counts, GMV, fees and approval rate per day, week or month"""
     verify_admin_token(authorization, db)
     
-    total_customers = db.query(Customer).count()
-    approved_customers = db.query(Customer).filter(Customer.is_approved == True).count()
-    pending_customers = db.query(Customer).filter(Customer.is_approved == False).count()
-    
-    total_merchants = db.query(Merchant).count()
-    approved_merchants = db.query(Merchant).filter(Merchant.is_approved == True).count()
-    pending_merchants = db.query(Merchant).filter(Merchant.is_approved == False).count()
-    
-    total_transactions = db.query(Transaction).count()
-    pending_transactions = db.query(Transaction).filter(
-        Transaction.status == TransactionStatus.PENDING
-    ).count()
-    approved_transactions = db.query(Transaction).filter(
-        Transaction.status == TransactionStatus.APPROVED
-    ).count()
-    completed_transactions = db.query(Transaction).filter(
-        Transaction.status == TransactionStatus.COMPLETED
-    ).count()
-    
-    total_transaction_value = db.query(
-        func.sum(Transaction.amount)
-    ).filter(
-        Transaction.status.in_([TransactionStatus.APPROVED, TransactionStatus.COMPLETED])
-    ).scalar() or 0
-    
-    total_fees_collected = db.query(
-        func.sum(Transaction.fee_amount)
-    ).filter(
-        Transaction.status.in_([TransactionStatus.APPROVED, TransactionStatus.COMPLETED])
-    ).scalar() or 0
+    end = end or datetime.utcnow().date()
+    start = start or default_range_start(end, granularity)
+    
+    try:
+        buckets = AnalyticsService(db).get_transaction_series(granularity, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "customers": {
-            "total": total_customers,
-            "approved": approved_customers,
-            "pending": pending_customers
-        },
-        "merchants": {
-            "total": total_merchants,
-            "approved": approved_merchants,
-            "pending": pending_merchants
-        },
-        "transactions": {
-            "total": total_transactions,
-            "pending": pending_transactions,
-            "approved": approved_transactions,
-            "completed": completed_transactions,
-            "total_value": total_transaction_value,
-            "total_fees": total_fees_collected
-        }
+        "granularity": granularity,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "buckets": buckets
     }
 
 
-@router.get("/customers", response_model=list)
-async def list_customers(
+@router.get("/overdue-customers", response_model=list)
+async def list_overdue_customers(
     authorization: str,
-    is_approved: Optional[bool] = None,
+    limit: int = 50,
     db: Session = Depends(get_db)
 ):
-    """List all customers"""
+    """List customers with the largest overdue amounts"""
     verify_admin_token(authorization, db)
     
-    query = db.query(Customer)
-    if is_approved is not None:
-        query = query.filter(Customer.is_approved == is_approved)
-    
-    customers = query.all()
+    repayment_service = RepaymentService(db)
+    rows = repayment_service.get_overdue_customers(limit=min(limit, 500))
     
     result = []
-    for customer in customers:
-        user = db.query(User).filter(User.id == customer.user_id).first()
+    for summary, user in rows:
         result.append({
-            "id": customer.id,
-            "user_id": customer.user_id,
-            "full_name": user.full_name if user else None,
-            "email": user.email if user else None,
-            "phone_number": user.phone_number if user else None,
-            "national_id": customer.national_id,
-            "credit_limit": customer.credit_limit,
-            "available_limit": customer.available_limit,
-            "used_limit": customer.used_limit,
-            "is_approved": customer.is_approved,
-            "created_at": customer.created_at.isoformat() if customer.created_at else None
+            "customer_id": summary.customer_id,
+            "full_name": user.full_name,
+            "phone_number": user.phone_number,
+            "overdue_installments": summary.overdue_installments,
+            "overdue_amount": summary.overdue_amount,
+            "oldest_due_date": summary.oldest_due_date.isoformat() if summary.oldest_due_date else None,
+            "updated_at": summary.updated_at.isoformat() if summary.updated_at else None
         })
     
     return result
 
 
+@router.get("/risk/customers", response_model=dict)
+async def customer_risk(
+    authorization: str,
+    limit: int = Query(20, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Top customers by credit utilisation and by overdue amount, for risk review"""
+    verify_admin_token(authorization, db)
+    
+    limit = min(limit, settings.PAGE_SIZE_MAX)
+    service = AdminService(db)
+    
+    return {
+        "by_utilisation": service.top_customers_by_utilisation(limit),
+        "by_overdue": service.top_customers_by_overdue(limit)
+    }
+
+
+@router.get("/customers", response_model=list)
+async def list_customers(
+    authorization: str,
+    response: Response,
+    is_approved: Optional[bool] = None,
+    city: Optional[str] = None,
+    min_limit: Optional[float] = Query(None, ge=0),
+    max_limit: Optional[float] = Query(None, ge=0),
+    min_utilisation: Optional[float] = Query(None, ge=0),
+    max_utilisation: Optional[float] = Query(None, ge=0),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    search: Optional[str] = None,
+    sort: str = "id",
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List customers one page at a time, filtered and sorted on the server.
+    
+    The next page cursor is returned in the X-Next-Cursor header. The first
+    page also carries X-Total-Count and X-Total-Count-Exact.
+    """
+    verify_admin_token(authorization, db)
+    
+    filters = dict(
+        is_approved=is_approved,
+        city=city or None,
+        min_limit=min_limit,
+        max_limit=max_limit,
+        min_utilisation=min_utilisation,
+        max_utilisation=max_utilisation,
+        created_from=created_from,
+        created_to=created_to,
+        search=search.strip() or None if search else None
+    )
+    service = AdminService(db)
+    
+    try:
+        customers, next_cursor = service.customer_page(
+            sort=sort, descending=order == "desc", limit=limit, cursor=cursor, **filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if not cursor:
+        total, exact = service.count_customers(**filters)
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+        response.headers[TOTAL_COUNT_EXACT_HEADER] = "true" if exact else "false"
+    
+    return customers
+
+
+@router.get("/customers/export")
+async def export_customers(
+    authorization: str,
+    format: str = "csv",
+    columns: Optional[str] = None,
+    is_approved: Optional[bool] = None,
+    city: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Stream customers as CSV or JSON lines (columns is a comma-separated list)"""
+    verify_admin_token(authorization, db)
+    
+    return export_response(
+        format, columns, CUSTOMER_EXPORT_COLUMNS, "customers",
+        lambda db, names: AdminService(db).iter_customers_export(
+            names,
+            is_approved=is_approved,
+            city=city,
+            created_from=created_from,
+            created_to=created_to
+        )
+    )
+
+
 @router.post("/customers/{customer_id}/approve", response_model=dict)
 async def approve_customer(
     customer_id: int,
@@ -210,15 +342,9 @@ async def approve_customer(
     """Approve a customer"""
     verify_admin_token(authorization, db)
     
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
-    
-    if not customer:
+    if AdminService(db).approve_customer(customer_id) is None:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    customer.is_approved = True
-    customer.approved_at = datetime.utcnow()
-    db.commit()
-    
     return {"message": "Customer approved successfully", "customer_id": customer_id}
 
 
@@ -230,71 +356,121 @@ async def update_credit_limit(
     db: Session = Depends(get_db)
 ):
     """Update customer credit limit"""
-    verify_admin_token(authorization, db)
-    
-    if credit_limit < 0:
-        raise HTTPException(status_code=400, detail="Invalid credit limit")
+    admin = verify_admin_token(authorization, db)
     
-    customer = db.query(Customer).filter(Customer.id == customer_id).first()
+    try:
+        result = AdminService(db).set_credit_limit(customer_id, credit_limit, changed_by=admin.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if not customer:
+    if result is None:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    old_limit = customer.credit_limit
-    difference = credit_limit - old_limit
-    
-    customer.credit_limit = credit_limit
-    customer.available_limit += difference
-    
-    if customer.available_limit > customer.credit_limit:
-        customer.available_limit = customer.credit_limit
-    if customer.available_limit < 0:
-        customer.available_limit = 0
-    
-    db.commit()
+    return result
+
+
+@router.post("/customers/credit-limits/adjust", response_model=dict)
+async def adjust_credit_limits(
+    adjustment: CreditLimitAdjustment,
+    authorization: str,
+    db: Session = Depends(get_db)
+):
+    """Change many customers' credit limits by one rule, recording every change"""
+    admin = verify_admin_token(authorization, db)
+    
+    filters = adjustment.model_dump(include=set(ADJUSTMENT_FILTERS), exclude_none=True)
+    limits = {item.customer_id: item.credit_limit for item in adjustment.limits or []}
+    
+    try:
+        return CreditLimitService(db).adjust(
+            adjustment.rule,
+            percent=adjustment.percent,
+            cap=adjustment.cap,
+            limits=limits,
+            filters=filters,
+            reason=adjustment.reason,
+            changed_by=admin.id,
+            batch_size=settings.CREDIT_LIMIT_BATCH_SIZE
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/customers/credit-limits/changes", response_model=list)
+async def list_credit_limit_changes(
+    batch_id: str,
+    authorization: str,
+    db: Session = Depends(get_db)
+):
+    """Audit rows written by one bulk credit limit adjustment"""
+    verify_admin_token(authorization, db)
     
-    return {
-        "message": "Credit limit updated",
-        "old_limit": old_limit,
-        "new_limit": credit_limit,
-        "available_limit": customer.available_limit
-    }
+    return [
+        {
+            "customer_id": change.customer_id,
+            "old_limit": change.old_limit,
+            "new_limit": change.new_limit,
+            "old_available": change.old_available,
+            "new_available": change.new_available,
+            "reason": change.reason,
+            "changed_by": change.changed_by,
+            "created_at": change.created_at
+        }
+        for change in CreditLimitService(db).get_changes(batch_id)
+    ]
 
 
 @router.get("/merchants", response_model=list)
 async def list_merchants(
     authorization: str,
+    response: Response,
     is_approved: Optional[bool] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """List all merchants"""
+    """List merchants one page at a time (next page cursor in the X-Next-Cursor header)"""
     verify_admin_token(authorization, db)
     
-    query = db.query(Merchant)
-    if is_approved is not None:
-        query = query.filter(Merchant.is_approved == is_approved)
+    try:
+        merchants, next_cursor = AdminService(db).merchant_page(
+            is_approved=is_approved, limit=limit, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    merchants = query.all()
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    result = []
-    for merchant in merchants:
-        user = db.query(User).filter(User.id == merchant.user_id).first()
-        result.append({
-            "id": merchant.id,
-            "user_id": merchant.user_id,
-            "full_name": user.full_name if user else None,
-            "email": user.email if user else None,
-            "phone_number": user.phone_number if user else None,
-            "business_name": merchant.business_name,
-            "commercial_registration": merchant.commercial_registration,
-            "balance": merchant.balance,
-            "total_earnings": merchant.total_earnings,
-            "total_fees_paid": merchant.total_fees_paid,
-            "is_approved": merchant.is_approved,
-            "created_at": merchant.created_at.isoformat() if merchant.created_at else None
-        })
+    return merchants
+
+
+@router.get("/merchants/export")
+async def export_merchants(
+    authorization: str,
+    format: str = "csv",
+    columns: Optional[str] = None,
+    is_approved: Optional[bool] = None,
+    city: Optional[str] = None,
+    business_category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Stream merchants as CSV or JSON lines (columns is a comma-separated list)"""
+    verify_admin_token(authorization, db)
     
-    return result
+    return export_response(
+        format, columns, MERCHANT_EXPORT_COLUMNS, "merchants",
+        lambda db, names: AdminService(db).iter_merchants_export(
+            names,
+            is_approved=is_approved,
+            city=city,
+            business_category=business_category,
+            created_from=created_from,
+            created_to=created_to
+        )
+    )
 
 
 @router.post("/merchants/{merchant_id}/approve", response_model=dict)
@@ -306,56 +482,32 @@ async def approve_merchant(
     """Approve a merchant"""
     verify_admin_token(authorization, db)
     
-    merchant = db.query(Merchant).filter(Merchant.id == merchant_id).first()
-    
-    if not merchant:
+    if AdminService(db).approve_merchant(merchant_id) is None:
         raise HTTPException(status_code=404, detail="Merchant not found")
     
-    merchant.is_approved = True
-    merchant.approved_at = datetime.utcnow()
-    db.commit()
-    
     return {"message": "Merchant approved successfully", "merchant_id": merchant_id}
 
 
 @router.get("/transactions", response_model=list)
 async def list_transactions(
     authorization: str,
+    response: Response,
     status: Optional[str] = None,
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """List all transactions"""
+    """List transactions newest first, one page at a time (next page cursor in the X-Next-Cursor header)"""
     verify_admin_token(authorization, db)
     
-    query = db.query(Transaction)
-    if status:
-        try:
-            tx_status = TransactionStatus(status)
-            query = query.filter(Transaction.status == tx_status)
-        except ValueError:
-            pass
-    
-    transactions = query.order_by(Transaction.created_at.desc()).offset(offset).limit(limit).all()
+    try:
+        transactions, next_cursor = AdminService(db).transaction_page(
+            status=status, limit=limit, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    result = []
-    for tx in transactions:
-        customer = db.query(Customer).filter(Customer.id == tx.customer_id).first()
-        merchant = db.query(Merchant).filter(Merchant.id == tx.merchant_id).first()
-        customer_user = db.query(User).filter(User.id == customer.user_id).first() if customer else None
-        
-        result.append({
-            "id": tx.id,
-            "reference_number": tx.reference_number,
-            "customer_name": customer_user.full_name if customer_user else None,
-            "merchant_name": merchant.business_name if merchant else None,
-            "amount": tx.amount,
-            "fee_amount": tx.fee_amount,
-            "merchant_receives": tx.merchant_receives,
-            "status": tx.status.value,
-            "created_at": tx.created_at.isoformat() if tx.created_at else None,
-            "approved_at": tx.approved_at.isoformat() if tx.approved_at else None
-        })
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    return result
+    return transactions
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
@@ -16,19 +16,36 @@ from app.utils.dependencies import (
 )
 from app.models.user import User
 from app.models.customer import Customer
+from app.models.merchant import Merchant
+from app.models.transaction import TransactionStatus
+from app.utils.http_cache import latest, not_modified, weak_etag
+from app.utils.pagination import InvalidCursor, NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
 
 @router.get("/me", response_model=CustomerResponse)
 async def get_my_profile(
+    request: Request,
+    response: Response,
     customer: Customer = Depends(get_current_customer),
     db: Session = Depends(get_db)
 ):
     """
     Get current customer's profile information.
+    
+    Supports conditional requests (ETag / Last-Modified).
     """
-    user = db.query(User).filter(User.id == customer.user_id).first()
+    # Loaded by the authentication dependency, so this does not query
+    user = db.get(User, customer.user_id)
+    
+    cached = not_modified(
+        request, response,
+        weak_etag("customer", customer.id, customer.updated_at, user.updated_at if user else None),
+        latest(customer.updated_at, user.updated_at if user else None)
+    )
+    if cached:
+        return cached
     
     return CustomerResponse(
         id=customer.id,
@@ -50,11 +67,21 @@ async def get_my_profile(
 
 @router.get("/me/limit", response_model=dict)
 async def get_my_credit_limit(
+    request: Request,
+    response: Response,
     customer: Customer = Depends(get_current_customer)
 ):
     """
     Get current customer's credit limit information.
+    
+    Supports conditional requests (ETag / Last-Modified).
     """
+    cached = not_modified(
+        request, response, weak_etag("limit", customer.id, customer.updated_at), customer.updated_at
+    )
+    if cached:
+        return cached
+    
     return {
         "credit_limit": customer.credit_limit,
         "available_limit": customer.available_limit,
@@ -114,7 +141,6 @@ async def get_my_pending_transactions(
     responses = []
     for tx in transactions:
         # Get merchant info
-        from app.models.merchant import Merchant
         merchant = db.query(Merchant).filter(Merchant.id == tx.merchant_id).first()
         merchant_user = db.query(User).filter(User.id == merchant.user_id).first() if merchant else None
         
@@ -139,6 +165,74 @@ async def get_my_pending_transactions(
     return responses
 
 
+@router.get("/me/transactions/history", response_model=List[TransactionResponse])
+async def get_my_transaction_history(
+    response: Response,
+    status: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    customer: Customer = Depends(get_current_customer),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current customer's transactions, newest first, one page at a time.
+    
+    The X-Next-Cursor response header holds the cursor for the next page.
+    """
+    tx_status = None
+    if status:
+        try:
+            tx_status = TransactionStatus(status)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status. Valid values: {[s.value for s in TransactionStatus]}"
+            )
+    
+    tx_service = TransactionService(db)
+    try:
+        transactions, next_cursor = tx_service.get_customer_transactions(
+            customer.id,
+            status=tx_status,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    # Merchant names for the whole page in one query
+    merchant_ids = {tx.merchant_id for tx in transactions}
+    merchant_names = dict(
+        db.query(Merchant.id, Merchant.business_name).filter(Merchant.id.in_(merchant_ids)).all()
+    ) if merchant_ids else {}
+    
+    return [
+        TransactionResponse(
+            id=tx.id,
+            reference_number=tx.reference_number,
+            customer_id=tx.customer_id,
+            merchant_id=tx.merchant_id,
+            amount=tx.amount,
+            fee_percentage=tx.fee_percentage,
+            fee_amount=tx.fee_amount,
+            merchant_receives=tx.merchant_receives,
+            description=tx.description,
+            product_name=tx.product_name,
+            status=tx.status.value,
+            created_at=tx.created_at,
+            approved_at=tx.approved_at,
+            rejected_at=tx.rejected_at,
+            completed_at=tx.completed_at,
+            expires_at=tx.expires_at,
+            merchant_name=merchant_names.get(tx.merchant_id)
+        )
+        for tx in transactions
+    ]
+
+
 @router.get("/me/repayment-plans", response_model=List[RepaymentPlanResponse])
 async def get_my_repayment_plans(
     customer: Customer = Depends(get_current_customer),
@@ -188,25 +282,34 @@ async def get_my_repayment_plans(
 
 @router.get("/", response_model=List[CustomerResponse])
 async def list_all_customers(
+    response: Response,
     is_approved: Optional[bool] = None,
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
     admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """
-    List all customers (Admin only).
+    List customers one page at a time (Admin only).
+    
+    The X-Next-Cursor response header holds the cursor for the next page.
     """
     customer_service = CustomerService(db)
-    customers = customer_service.get_all_customers(
-        is_approved=is_approved,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        customers, next_cursor = customer_service.get_all_customers(
+            is_approved=is_approved,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     responses = []
     for customer in customers:
-        user = db.query(User).filter(User.id == customer.user_id).first()
+        user = customer.user
         responses.append(CustomerResponse(
             id=customer.id,
             user_id=customer.user_id,
@@ -287,7 +390,8 @@ async def update_customer_credit_limit(
         updated_customer = customer_service.update_credit_limit(
             customer,
             credit_limit,
-            reason
+            reason,
+            changed_by=admin.id
         )
         
         return {
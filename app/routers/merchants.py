@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
 from app.database import get_db
-from app.services.merchant_service import MerchantService
+from app.services.merchant_service import MerchantService, STATEMENT_FIELDS
 from app.services.customer_service import CustomerService
 from app.services.transaction_service import TransactionService
 from app.schemas.merchant import MerchantResponse, MerchantUpdate, MerchantBalance
@@ -15,19 +17,36 @@ from app.utils.dependencies import (
 )
 from app.models.user import User
 from app.models.merchant import Merchant
+from app.utils.export import EXPORT_FORMATS, iter_export, rows_in_own_session
+from app.utils.http_cache import latest, not_modified, weak_etag
+from app.utils.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from app.utils.responses import json_response
 
 router = APIRouter(prefix="/merchants", tags=["Merchants"])
 
 
 @router.get("/me", response_model=MerchantResponse)
 async def get_my_profile(
+    request: Request,
+    response: Response,
     merchant: Merchant = Depends(get_current_merchant),
     db: Session = Depends(get_db)
 ):
     """
     Get current merchant's profile information.
+    
+    Supports conditional requests (ETag / Last-Modified).
     """
-    user = db.query(User).filter(User.id == merchant.user_id).first()
+    # Loaded by the authentication dependency, so this does not query
+    user = db.get(User, merchant.user_id)
+    
+    cached = not_modified(
+        request, response,
+        weak_etag("merchant", merchant.id, merchant.updated_at, user.updated_at if user else None),
+        latest(merchant.updated_at, user.updated_at if user else None)
+    )
+    if cached:
+        return cached
     
     return MerchantResponse(
         id=merchant.id,
@@ -66,6 +85,43 @@ async def get_my_balance(
     return MerchantBalance(**balance_info)
 
 
+@router.get("/me/statements/{period}")
+async def get_my_statement(
+    period: str,
+    format: str = "csv",
+    merchant: Merchant = Depends(get_current_merchant)
+):
+    """
+    Stream the current merchant's statement for a month (period is YYYY-MM).
+    
+    Rows are approved purchase amounts and fees deducted on completion, with
+    a running balance, as CSV (format=csv) or JSON lines (format=ndjson).
+    """
+    try:
+        start = datetime.strptime(period, "%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Period must be in YYYY-MM format")
+    
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Valid values: {list(EXPORT_FORMATS)}"
+        )
+    
+    end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+    merchant_id = merchant.id
+    
+    rows = rows_in_own_session(
+        lambda db: MerchantService(db).iter_statement(merchant_id, start, end)
+    )
+    
+    return StreamingResponse(
+        iter_export(format, rows, STATEMENT_FIELDS),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="statement-{period}.{format}"'}
+    )
+
+
 @router.put("/me", response_model=MerchantResponse)
 async def update_my_profile(
     business_name: str = None,
@@ -120,14 +176,17 @@ async def update_my_profile(
 
 @router.get("/me/transactions", response_model=List[TransactionResponse])
 async def get_my_transactions(
+    response: Response,
     status: str = None,
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
     merchant: Merchant = Depends(get_current_merchant),
     db: Session = Depends(get_db)
 ):
     """
-    Get all transactions for the current merchant.
+    Get the current merchant's transactions, newest first, one page at a time.
+    
+    The X-Next-Cursor response header holds the cursor for the next page.
     """
     tx_service = TransactionService(db)
     
@@ -138,16 +197,22 @@ async def get_my_transactions(
             tx_status = TransactionStatus(status)
         except ValueError:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
+                status_code=400,
                 detail=f"Invalid status. Valid values: {[s.value for s in TransactionStatus]}"
             )
     
-    transactions = tx_service.get_merchant_transactions(
-        merchant.id,
-        status=tx_status,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        transactions, next_cursor = tx_service.get_merchant_transactions(
+            merchant.id,
+            status=tx_status,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     responses = []
     for tx in transactions:
@@ -155,27 +220,12 @@ async def get_my_transactions(
             Customer, Customer.user_id == User.id
         ).filter(Customer.id == tx.customer_id).first()
         
-        responses.append(TransactionResponse(
-            id=tx.id,
-            reference_number=tx.reference_number,
-            customer_id=tx.customer_id,
-            merchant_id=tx.merchant_id,
-            amount=tx.amount,
-            fee_percentage=tx.fee_percentage,
-            fee_amount=tx.fee_amount,
-            merchant_receives=tx.merchant_receives,
-            description=tx.description,
-            product_name=tx.product_name,
-            status=tx.status.value,
-            created_at=tx.created_at,
-            approved_at=tx.approved_at,
-            rejected_at=tx.rejected_at,
-            completed_at=tx.completed_at,
-            expires_at=tx.expires_at,
+        responses.append(TransactionResponse.from_transaction(
+            tx,
             customer_name=customer_user.full_name if customer_user else None
         ))
     
-    return responses
+    return json_response(List[TransactionResponse], responses, response)
 
 
 @router.get("/search-customer", response_model=List[dict])
@@ -286,25 +336,34 @@ async def reject_payment_request(
 
 @router.get("/", response_model=List[MerchantResponse])
 async def list_all_merchants(
+    response: Response,
     is_approved: Optional[bool] = None,
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
     admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     """
-    List all merchants (Admin only).
+    List merchants one page at a time (Admin only).
+    
+    The X-Next-Cursor response header holds the cursor for the next page.
     """
     merchant_service = MerchantService(db)
-    merchants = merchant_service.get_all_merchants(
-        is_approved=is_approved,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        merchants, next_cursor = merchant_service.get_all_merchants(
+            is_approved=is_approved,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     responses = []
     for merchant in merchants:
-        user = db.query(User).filter(User.id == merchant.user_id).first()
+        user = merchant.user
         responses.append(MerchantResponse(
             id=merchant.id,
             user_id=merchant.user_id,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
@@ -7,6 +7,8 @@ from app.schemas.repayment import (
     RepaymentPlanResponse, RepaymentScheduleResponse, PaymentResponse
 )
 from app.utils.dependencies import get_current_customer, require_approved_customer
+from app.utils.http_cache import not_modified, weak_etag
+from app.utils.responses import json_response
 from app.models.customer import Customer
 
 router = APIRouter(prefix="/repayments", tags=["Repayments"])
@@ -14,6 +16,7 @@ router = APIRouter(prefix="/repayments", tags=["Repayments"])
 
 @router.get("/plans", response_model=List[RepaymentPlanResponse])
 async def get_my_repayment_plans(
+    response: Response,
     status: str = None,
     customer: Customer = Depends(get_current_customer),
     db: Session = Depends(get_db)
@@ -41,91 +44,57 @@ async def get_my_repayment_plans(
     
     responses = []
     for plan in plans:
-        responses.append(RepaymentPlanResponse(
-            id=plan.id,
-            transaction_id=plan.transaction_id,
-            customer_id=plan.customer_id,
-            total_amount=plan.total_amount,
-            number_of_months=plan.number_of_months,
-            monthly_payment=plan.monthly_payment,
-            total_paid=plan.total_paid,
-            remaining_amount=plan.remaining_amount,
-            payments_made=plan.payments_made,
-            payments_remaining=plan.payments_remaining,
-            status=plan.status.value,
-            start_date=plan.start_date,
-            end_date=plan.end_date,
-            created_at=plan.created_at,
-            completed_at=plan.completed_at,
-            transaction_reference=plan.transaction.reference_number if plan.transaction else None,
-            schedules=[{
-                "id": s.id,
-                "installment_number": s.installment_number,
-                "due_date": s.due_date,
-                "amount": s.amount,
-                "amount_paid": s.amount_paid,
-                "status": s.status.value,
-                "paid_at": s.paid_at,
-                "payment_reference": s.payment_reference
-            } for s in plan.schedules]
+        responses.append(RepaymentPlanResponse.from_plan(
+            plan,
+            plan.transaction.reference_number if plan.transaction else None
         ))
     
-    return responses
+    return json_response(List[RepaymentPlanResponse], responses, response)
 
 
 @router.get("/plans/{plan_id}", response_model=RepaymentPlanResponse)
 async def get_repayment_plan(
     plan_id: int,
+    request: Request,
+    response: Response,
     customer: Customer = Depends(get_current_customer),
     db: Session = Depends(get_db)
 ):
     """
     Get a specific repayment plan with all schedules.
+    
+    Supports conditional requests (ETag / Last-Modified): a current client
+    copy is answered from the plan's version alone, before the plan and its
+    schedules are loaded.
     """
     repayment_service = RepaymentService(db)
     
-    plan = repayment_service.get_repayment_plan_by_id(plan_id)
+    version = repayment_service.get_plan_version(plan_id)
     
-    if not plan:
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Repayment plan not found"
         )
     
-    if plan.customer_id != customer.id:
+    if version.customer_id != customer.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have access to this repayment plan"
         )
     
-    return RepaymentPlanResponse(
-        id=plan.id,
-        transaction_id=plan.transaction_id,
-        customer_id=plan.customer_id,
-        total_amount=plan.total_amount,
-        number_of_months=plan.number_of_months,
-        monthly_payment=plan.monthly_payment,
-        total_paid=plan.total_paid,
-        remaining_amount=plan.remaining_amount,
-        payments_made=plan.payments_made,
-        payments_remaining=plan.payments_remaining,
-        status=plan.status.value,
-        start_date=plan.start_date,
-        end_date=plan.end_date,
-        created_at=plan.created_at,
-        completed_at=plan.completed_at,
-        transaction_reference=plan.transaction.reference_number if plan.transaction else None,
-        schedules=[{
-            "id": s.id,
-            "installment_number": s.installment_number,
-            "due_date": s.due_date,
-            "amount": s.amount,
-            "amount_paid": s.amount_paid,
-            "status": s.status.value,
-            "paid_at": s.paid_at,
-            "payment_reference": s.payment_reference
-        } for s in plan.schedules]
-    )
+    # Plans created before updated_at existed have none until their next change
+    changed_at = version.updated_at or version.created_at
+    cached = not_modified(request, response, weak_etag("plan", plan_id, changed_at), changed_at)
+    if cached:
+        return cached
+    
+    plan = repayment_service.get_repayment_plan_by_id(plan_id)
+    
+    return json_response(RepaymentPlanResponse, RepaymentPlanResponse.from_plan(
+        plan,
+        plan.transaction.reference_number if plan.transaction else None
+    ), response)
 
 
 @router.post("/plans/{plan_id}/pay", response_model=PaymentResponse)
@@ -204,16 +173,7 @@ async def get_next_payment(
             detail="No pending payments found"
         )
     
-    return RepaymentScheduleResponse(
-        id=next_payment.id,
-        installment_number=next_payment.installment_number,
-        due_date=next_payment.due_date,
-        amount=next_payment.amount,
-        amount_paid=next_payment.amount_paid,
-        status=next_payment.status.value,
-        paid_at=next_payment.paid_at,
-        payment_reference=next_payment.payment_reference
-    )
+    return json_response(RepaymentScheduleResponse, RepaymentScheduleResponse.from_schedule(next_payment))
 
 
 @router.get("/overdue", response_model=List[RepaymentScheduleResponse])
@@ -228,19 +188,10 @@ async def get_overdue_payments(
     
     overdue_schedules = repayment_service.get_overdue_schedules(customer.id)
     
-    return [
-        RepaymentScheduleResponse(
-            id=s.id,
-            installment_number=s.installment_number,
-            due_date=s.due_date,
-            amount=s.amount,
-            amount_paid=s.amount_paid,
-            status=s.status.value,
-            paid_at=s.paid_at,
-            payment_reference=s.payment_reference
-        )
-        for s in overdue_schedules
-    ]
+    return json_response(
+        List[RepaymentScheduleResponse],
+        [RepaymentScheduleResponse.from_schedule(s) for s in overdue_schedules]
+    )
 
 
 @router.post("/schedules/{schedule_id}/request-payment")
@@ -5,7 +5,7 @@ from app.database import get_db
 from app.services.transaction_service import TransactionService
 from app.services.repayment_service import RepaymentService
 from app.schemas.transaction import (
-    TransactionCreate, TransactionResponse, TransactionApproval
+    TransactionCreate, TransactionResponse, TransactionApproval, TransactionBatchResult
 )
 from app.schemas.repayment import RepaymentPlanResponse
 from app.utils.dependencies import (
@@ -18,10 +18,19 @@ from app.utils.dependencies import (
 from app.models.user import User
 from app.models.customer import Customer
 from app.models.merchant import Merchant
-from app.models.transaction import TransactionStatus
+from app.models.transaction import TransactionStatus, TERMINAL_TRANSACTION_STATUSES
+from app.utils.cache import TTLCache
+from app.utils.responses import json_response
+from app.config import settings
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
+# Finished transactions never change, so their lookups by reference can be cached
+reference_cache = TTLCache(
+    maxsize=settings.TRANSACTION_CACHE_SIZE,
+    ttl_seconds=settings.TRANSACTION_CACHE_TTL_SECONDS
+)
+
 
 @router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
@@ -76,6 +85,72 @@ async def create_transaction(
         )
 
 
+@router.post("/batch", response_model=List[TransactionBatchResult], status_code=status.HTTP_201_CREATED)
+async def create_transactions_batch(
+    items: List[TransactionCreate],
+    merchant: Merchant = Depends(require_approved_merchant),
+    db: Session = Depends(get_db)
+):
+    """
+    Merchant sends many purchase requests in one call.
+    
+    Takes a JSON array of purchase requests and returns one result per item,
+    in the same order. Items that fail validation are reported with an error
+    and do not stop the others from being created.
+    """
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one purchase request is required"
+        )
+    
+    if len(items) > settings.TRANSACTION_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch can contain at most {settings.TRANSACTION_BATCH_MAX_SIZE} purchase requests"
+        )
+    
+    tx_service = TransactionService(db)
+    results = tx_service.create_transactions_batch(
+        merchant,
+        [item.model_dump() for item in items]
+    )
+    
+    responses = []
+    for result in results:
+        if not result["success"]:
+            responses.append(TransactionBatchResult(
+                index=result["index"],
+                success=False,
+                error=result["error"]
+            ))
+            continue
+        
+        transaction = result["transaction"]
+        responses.append(TransactionBatchResult(
+            index=result["index"],
+            success=True,
+            transaction=TransactionResponse(
+                id=transaction["id"],
+                reference_number=transaction["reference_number"],
+                customer_id=transaction["customer_id"],
+                merchant_id=transaction["merchant_id"],
+                amount=transaction["amount"],
+                fee_percentage=transaction["fee_percentage"],
+                fee_amount=transaction["fee_amount"],
+                merchant_receives=transaction["merchant_receives"],
+                description=transaction["description"],
+                product_name=transaction["product_name"],
+                status=transaction["status"].value,
+                created_at=transaction["created_at"],
+                expires_at=transaction["expires_at"],
+                customer_name=result["customer_name"]
+            )
+        ))
+    
+    return responses
+
+
 @router.post("/{transaction_id}/approve", response_model=dict)
 async def approve_transaction(
     transaction_id: int,
@@ -209,6 +284,52 @@ async def cancel_transaction(
         )
 
 
+@router.get("/by-ref/{reference_number}", response_model=TransactionResponse)
+async def get_transaction_by_reference(
+    reference_number: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get transaction details by reference number.
+    
+    Only the customer or merchant involved in the transaction can view it.
+    """
+    response = reference_cache.get(reference_number)
+    
+    if response is None:
+        tx_service = TransactionService(db)
+        row = tx_service.get_transaction_with_names_by_reference(reference_number)
+        
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Transaction not found"
+            )
+        
+        transaction, customer_name, merchant_name = row
+        response = TransactionResponse.from_transaction(transaction, customer_name, merchant_name)
+        
+        if transaction.status in TERMINAL_TRANSACTION_STATUSES:
+            reference_cache.set(reference_number, response)
+    
+    # Check if user has access to this transaction
+    if current_user.customer:
+        if response.customer_id != current_user.customer.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have access to this transaction"
+            )
+    elif current_user.merchant:
+        if response.merchant_id != current_user.merchant.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have access to this transaction"
+            )
+    
+    return json_response(TransactionResponse, response)
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: int,
@@ -253,26 +374,11 @@ async def get_transaction(
         Merchant, Merchant.user_id == User.id
     ).filter(Merchant.id == transaction.merchant_id).first()
     
-    return TransactionResponse(
-        id=transaction.id,
-        reference_number=transaction.reference_number,
-        customer_id=transaction.customer_id,
-        merchant_id=transaction.merchant_id,
-        amount=transaction.amount,
-        fee_percentage=transaction.fee_percentage,
-        fee_amount=transaction.fee_amount,
-        merchant_receives=transaction.merchant_receives,
-        description=transaction.description,
-        product_name=transaction.product_name,
-        status=transaction.status.value,
-        created_at=transaction.created_at,
-        approved_at=transaction.approved_at,
-        rejected_at=transaction.rejected_at,
-        completed_at=transaction.completed_at,
-        expires_at=transaction.expires_at,
+    return json_response(TransactionResponse, TransactionResponse.from_transaction(
+        transaction,
         customer_name=customer_user.full_name if customer_user else None,
         merchant_name=merchant_user.full_name if merchant_user else None
-    )
+    ))
 
 
 @router.get("/{transaction_id}/repayment-plan", response_model=RepaymentPlanResponse)
@@ -317,31 +423,7 @@ async def get_transaction_repayment_plan(
             detail="No repayment plan found for this transaction"
         )
     
-    return RepaymentPlanResponse(
-        id=plan.id,
-        transaction_id=plan.transaction_id,
-        customer_id=plan.customer_id,
-        total_amount=plan.total_amount,
-        number_of_months=plan.number_of_months,
-        monthly_payment=plan.monthly_payment,
-        total_paid=plan.total_paid,
-        remaining_amount=plan.remaining_amount,
-        payments_made=plan.payments_made,
-        payments_remaining=plan.payments_remaining,
-        status=plan.status.value,
-        start_date=plan.start_date,
-        end_date=plan.end_date,
-        created_at=plan.created_at,
-        completed_at=plan.completed_at,
-        transaction_reference=transaction.reference_number,
-        schedules=[{
-            "id": s.id,
-            "installment_number": s.installment_number,
-            "due_date": s.due_date,
-            "amount": s.amount,
-            "amount_paid": s.amount_paid,
-            "status": s.status.value,
-            "paid_at": s.paid_at,
-            "payment_reference": s.payment_reference
-        } for s in plan.schedules]
+    return json_response(
+        RepaymentPlanResponse,
+        RepaymentPlanResponse.from_plan(plan, transaction.reference_number)
     )
@@ -11,7 +11,7 @@ from app.schemas.merchant import (
 )
 from app.schemas.transaction import (
     TransactionCreate, TransactionResponse, TransactionApproval,
-    TransactionList
+    TransactionList, TransactionBatchResult
 )
 from app.schemas.repayment import (
     RepaymentPlanCreate, RepaymentPlanResponse, 
@@ -29,7 +29,7 @@ __all__ = [
     "MerchantBase", "MerchantCreate", "MerchantResponse", "MerchantUpdate",
     # Transaction
     "TransactionCreate", "TransactionResponse", "TransactionApproval",
-    "TransactionList",
+    "TransactionList", "TransactionBatchResult",
     # Repayment
     "RepaymentPlanCreate", "RepaymentPlanResponse", 
     "RepaymentScheduleResponse", "PaymentCreate",
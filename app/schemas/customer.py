@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -25,6 +25,31 @@ class CreditLimitUpdate(BaseModel):
     reason: Optional[str] = None  # Reason for the change
 
 
+class CustomerLimit(BaseModel):
+    customer_id: int
+    credit_limit: float = Field(..., ge=0)
+
+
+class CreditLimitAdjustment(BaseModel):
+    """
+    Used by admin to change many customers' credit limits at once.
+
+    percentage moves approved customers' limits by percent (optionally no
+    higher than cap), cap lowers approved customers' limits above cap, and
+    set applies limits. The filters narrow percentage and cap.
+    """
+    rule: str = Field(..., pattern="^(percentage|cap|set)$")
+    percent: Optional[float] = Field(None, gt=-100)
+    cap: Optional[float] = Field(None, ge=0)
+    limits: Optional[List[CustomerLimit]] = None
+    city: Optional[str] = None
+    min_limit: Optional[float] = None
+    max_limit: Optional[float] = None
+    min_utilisation: Optional[float] = None
+    max_utilisation: Optional[float] = None
+    reason: Optional[str] = None
+
+
 class CustomerResponse(BaseModel):
     id: int
     user_id: int
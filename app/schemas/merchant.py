@@ -61,6 +61,7 @@ class MerchantBalance(BaseModel):
     total_earnings: float
     total_fees_paid: float
     pending_transactions: int = 0
+    approved_transactions: int = 0
     completed_transactions: int = 0
 
     class Config:
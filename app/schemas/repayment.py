@@ -31,6 +31,20 @@ class RepaymentScheduleResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @classmethod
+    def from_schedule(cls, schedule) -> "RepaymentScheduleResponse":
+        """Build from a RepaymentSchedule row without validation (the row is trusted)"""
+        return cls.model_construct(
+            id=schedule.id,
+            installment_number=schedule.installment_number,
+            due_date=schedule.due_date,
+            amount=schedule.amount,
+            amount_paid=schedule.amount_paid,
+            status=PaymentStatus(schedule.status.value),
+            paid_at=schedule.paid_at,
+            payment_reference=schedule.payment_reference
+        )
+
 
 class RepaymentPlanResponse(BaseModel):
     id: int
@@ -58,6 +72,29 @@ class RepaymentPlanResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @classmethod
+    def from_plan(cls, plan, transaction_reference: Optional[str] = None) -> "RepaymentPlanResponse":
+        """Build from a RepaymentPlan row and its schedules without validation"""
+        return cls.model_construct(
+            id=plan.id,
+            transaction_id=plan.transaction_id,
+            customer_id=plan.customer_id,
+            total_amount=plan.total_amount,
+            number_of_months=plan.number_of_months,
+            monthly_payment=plan.monthly_payment,
+            total_paid=plan.total_paid,
+            remaining_amount=plan.remaining_amount,
+            payments_made=plan.payments_made,
+            payments_remaining=plan.payments_remaining,
+            status=PaymentStatus(plan.status.value),
+            start_date=plan.start_date,
+            end_date=plan.end_date,
+            created_at=plan.created_at,
+            completed_at=plan.completed_at,
+            schedules=[RepaymentScheduleResponse.from_schedule(s) for s in plan.schedules],
+            transaction_reference=transaction_reference
+        )
+
 
 class PaymentCreate(BaseModel):
     """Make a payment on a repayment schedule"""
@@ -58,6 +58,43 @@ class TransactionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @classmethod
+    def from_transaction(
+        cls,
+        transaction,
+        customer_name: Optional[str] = None,
+        merchant_name: Optional[str] = None
+    ) -> "TransactionResponse":
+        """Build from a Transaction row without validation (the row is trusted)"""
+        return cls.model_construct(
+            id=transaction.id,
+            reference_number=transaction.reference_number,
+            customer_id=transaction.customer_id,
+            merchant_id=transaction.merchant_id,
+            amount=transaction.amount,
+            fee_percentage=transaction.fee_percentage,
+            fee_amount=transaction.fee_amount,
+            merchant_receives=transaction.merchant_receives,
+            description=transaction.description,
+            product_name=transaction.product_name,
+            status=TransactionStatus(transaction.status.value),
+            created_at=transaction.created_at,
+            approved_at=transaction.approved_at,
+            rejected_at=transaction.rejected_at,
+            completed_at=transaction.completed_at,
+            expires_at=transaction.expires_at,
+            customer_name=customer_name,
+            merchant_name=merchant_name
+        )
+
+
+class TransactionBatchResult(BaseModel):
+    """Outcome of one item in a batch of purchase requests"""
+    index: int  # Position of the item in the request body
+    success: bool
+    transaction: Optional[TransactionResponse] = None
+    error: Optional[str] = None
+
 
 class TransactionList(BaseModel):
     transactions: List[TransactionResponse]
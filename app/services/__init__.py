@@ -1,8 +1,21 @@
-from app.services.auth_service import AuthService
-from app.services.transaction_service import TransactionService
-from app.services.repayment_service import RepaymentService
-from app.services.customer_service import CustomerService
-from app.services.merchant_service import MerchantService
+import importlib
+
+# Services are imported when first asked for, so importing one submodule
+# (the scheduler at startup) does not pull in all of them
+_SERVICES = {
+    "AuthService": "app.services.auth_service",
+    "TransactionService": "app.services.transaction_service",
+    "RepaymentService": "app.services.repayment_service",
+    "CustomerService": "app.services.customer_service",
+    "MerchantService": "app.services.merchant_service",
+}
+
+
+def __getattr__(name):
+    if name in _SERVICES:
+        return getattr(importlib.import_module(_SERVICES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "AuthService",
@@ -0,0 +1,444 @@
+from sqlalchemy.orm import Query, Session, contains_eager
+from sqlalchemy import and_, func, select, union
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from app.models.user import User
+from app.models.customer import Customer, CUSTOMER_UTILISATION
+from app.models.merchant import Merchant
+from app.models.overdue_summary import CustomerOverdueSummary
+from app.models.transaction import Transaction, TransactionStatus
+from app.models.platform_stats import PlatformStats
+from app.services.stats_service import STATS_ID
+from app.utils.pagination import paginate
+from app.config import settings
+
+# Exportable columns, in default order, and the expression each one reads
+CUSTOMER_EXPORT_COLUMNS = {
+    "id": Customer.id,
+    "user_id": Customer.user_id,
+    "full_name": User.full_name,
+    "email": User.email,
+    "phone_number": User.phone_number,
+    "national_id": Customer.national_id,
+    "city": Customer.city,
+    "credit_limit": Customer.credit_limit,
+    "available_limit": Customer.available_limit,
+    "used_limit": Customer.used_limit,
+    "is_approved": Customer.is_approved,
+    "approved_at": Customer.approved_at,
+    "created_at": Customer.created_at,
+}
+
+MERCHANT_EXPORT_COLUMNS = {
+    "id": Merchant.id,
+    "user_id": Merchant.user_id,
+    "full_name": User.full_name,
+    "email": User.email,
+    "phone_number": User.phone_number,
+    "business_name": Merchant.business_name,
+    "commercial_registration": Merchant.commercial_registration,
+    "business_category": Merchant.business_category,
+    "city": Merchant.city,
+    "balance": Merchant.balance,
+    "total_earnings": Merchant.total_earnings,
+    "total_fees_paid": Merchant.total_fees_paid,
+    "is_approved": Merchant.is_approved,
+    "approved_at": Merchant.approved_at,
+    "created_at": Merchant.created_at,
+}
+
+# Sort keys of the admin customer list; each has an index ending in id
+CUSTOMER_SORTS = {
+    "id": [Customer.id],
+    "created_at": [Customer.created_at, Customer.id],
+    "credit_limit": [Customer.credit_limit, Customer.id],
+    "available_limit": [Customer.available_limit, Customer.id],
+}
+
+# Sorts after every string that starts with a given prefix
+_PREFIX_END = "\U0010ffff"
+
+# Code point order, as SQLite compares text by default. Postgres otherwise
+# compares in the database locale, where the range below can miss matches.
+PREFIX_COLLATION = "C"
+
+
+def prefix_match(column, prefix: str, dialect: str):
+    """
+    column starts with prefix (case-sensitive), written as a range an index
+    can seek. On Postgres the comparison uses PREFIX_COLLATION and the
+    matching *_prefix indexes.
+    """
+    if dialect == "postgresql":
+        column = column.collate(PREFIX_COLLATION)
+    return and_(column >= prefix, column < prefix + _PREFIX_END)
+
+
+def parse_columns(columns: Optional[str], available: dict) -> List[str]:
+    """Validate a comma-separated column list; None or empty selects all columns"""
+    if not columns:
+        return list(available)
+
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(
+            f"Unknown columns: {', '.join(unknown)}. Valid columns: {', '.join(available)}"
+        )
+    return names
+
+
+class AdminService:
+    """
+    Admin reads and actions shared by the API admin router and the Flask admin.
+
+    Each listing loads a page and the users and names it shows in one joined
+    query; pages are bounded by PAGE_SIZE_MAX.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def customers_query(
+        self,
+        is_approved: Optional[bool] = None,
+        city: Optional[str] = None,
+        min_limit: Optional[float] = None,
+        max_limit: Optional[float] = None,
+        min_utilisation: Optional[float] = None,
+        max_utilisation: Optional[float] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        search: Optional[str] = None
+    ) -> Query:
+        """
+        Customers matching the admin list filters.
+
+        Limits bound credit_limit, utilisation bounds used/credit limit as a
+        fraction, and search matches the start of the name, phone number or
+        national ID, case-sensitively.
+        """
+        query = self.db.query(Customer)
+
+        if is_approved is not None:
+            query = query.filter(Customer.is_approved == is_approved)
+        if city:
+            query = query.filter(Customer.city == city)
+        if min_limit is not None:
+            query = query.filter(Customer.credit_limit >= min_limit)
+        if max_limit is not None:
+            query = query.filter(Customer.credit_limit <= max_limit)
+        if min_utilisation is not None:
+            query = query.filter(CUSTOMER_UTILISATION >= min_utilisation)
+        if max_utilisation is not None:
+            query = query.filter(CUSTOMER_UTILISATION <= max_utilisation)
+        if created_from:
+            query = query.filter(Customer.created_at >= created_from)
+        if created_to:
+            query = query.filter(Customer.created_at < created_to)
+        if search:
+            # One index seek per searched column instead of an OR across the join
+            dialect = self.db.get_bind().dialect.name
+            matches = union(
+                select(Customer.id).where(prefix_match(Customer.national_id, search, dialect)),
+                select(Customer.id).join(User, User.id == Customer.user_id).where(
+                    prefix_match(User.full_name, search, dialect)
+                ),
+                select(Customer.id).join(User, User.id == Customer.user_id).where(
+                    prefix_match(User.phone_number, search, dialect)
+                ),
+            )
+            query = query.filter(Customer.id.in_(matches))
+
+        return query
+
+    def search_customers(
+        self,
+        sort: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        **filters
+    ) -> Tuple[List[Customer], Optional[str]]:
+        """
+        A page of filtered customers with their users loaded, and the next page's cursor.
+
+        sort is a CUSTOMER_SORTS key and filters are those of customers_query.
+        Raises ValueError for an unknown sort and InvalidCursor for a bad cursor.
+        """
+        if sort not in CUSTOMER_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(CUSTOMER_SORTS)}")
+
+        query = self.customers_query(**filters).join(Customer.user).options(contains_eager(Customer.user))
+        scope = f"admin_customers:{sort}:{'desc' if descending else 'asc'}"
+        return paginate(query, scope, CUSTOMER_SORTS[sort], limit, cursor, descending=descending)
+
+    def customer_page(
+        self,
+        sort: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        **filters
+    ) -> Tuple[List[dict], Optional[str]]:
+        """search_customers shaped as admin list rows"""
+        customers, next_cursor = self.search_customers(sort, descending, limit, cursor, **filters)
+        return [self._customer_row(customer) for customer in customers], next_cursor
+
+    @staticmethod
+    def _customer_row(customer: Customer) -> dict:
+        user = customer.user
+        return {
+            "id": customer.id,
+            "user_id": customer.user_id,
+            "full_name": user.full_name,
+            "email": user.email,
+            "phone_number": user.phone_number,
+            "national_id": customer.national_id,
+            "city": customer.city,
+            "credit_limit": customer.credit_limit,
+            "available_limit": customer.available_limit,
+            "used_limit": customer.used_limit,
+            "is_approved": customer.is_approved,
+            "created_at": customer.created_at.isoformat() if customer.created_at else None
+        }
+
+    def count_customers(self, **filters) -> Tuple[int, bool]:
+        """
+        Number of customers matching filters, and whether it is exact.
+
+        Totals by approval come from the platform_stats row. Other filters
+        count at most COUNT_SCAN_LIMIT matches; past that the limit is
+        returned as a lower bound.
+        """
+        is_approved = filters.get("is_approved")
+        if all(value is None for name, value in filters.items() if name != "is_approved"):
+            stats = self.db.get(PlatformStats, STATS_ID)
+            if stats is not None:
+                if is_approved is None:
+                    return stats.customers_total, True
+                if is_approved:
+                    return stats.customers_approved, True
+                return stats.customers_total - stats.customers_approved, True
+
+        cap = settings.COUNT_SCAN_LIMIT
+        matched = self.customers_query(**filters).with_entities(Customer.id).limit(cap + 1).subquery()
+        count = self.db.query(func.count()).select_from(matched).scalar()
+        return min(count, cap), count <= cap
+
+    def top_customers_by_utilisation(self, limit: int = 20) -> List[dict]:
+        """Customers using the largest share of their credit limit, read in ix_customers_utilisation order"""
+        rows = self._risk_query().filter(
+            CUSTOMER_UTILISATION.isnot(None)
+        ).order_by(CUSTOMER_UTILISATION.desc()).limit(limit)
+        return [self._risk_row(*row) for row in rows]
+
+    def top_customers_by_overdue(self, limit: int = 20) -> List[dict]:
+        """Customers with the largest overdue amounts, read in overdue_amount index order"""
+        rows = self._risk_query().filter(
+            CustomerOverdueSummary.overdue_amount > 0
+        ).order_by(CustomerOverdueSummary.overdue_amount.desc()).limit(limit)
+        return [self._risk_row(*row) for row in rows]
+
+    def _risk_query(self) -> Query:
+        return self.db.query(Customer, User, CustomerOverdueSummary).join(
+            User, User.id == Customer.user_id
+        ).outerjoin(
+            CustomerOverdueSummary, CustomerOverdueSummary.customer_id == Customer.id
+        )
+
+    @staticmethod
+    def _risk_row(customer: Customer, user: User, summary: Optional[CustomerOverdueSummary]) -> dict:
+        return {
+            "customer_id": customer.id,
+            "full_name": user.full_name,
+            "phone_number": user.phone_number,
+            "credit_limit": customer.credit_limit,
+            "used_limit": customer.used_limit,
+            "utilisation": customer.used_limit / customer.credit_limit if customer.credit_limit else None,
+            "overdue_amount": summary.overdue_amount if summary else 0.0,
+            "overdue_installments": summary.overdue_installments if summary else 0,
+            "oldest_due_date": summary.oldest_due_date.isoformat() if summary and summary.oldest_due_date else None
+        }
+
+    def merchant_page(
+        self,
+        is_approved: Optional[bool] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        A page of merchants in id order joined to their users, and the next
+        page's cursor. Raises InvalidCursor for a bad cursor.
+        """
+        from app.services.merchant_service import MerchantService
+
+        merchants, next_cursor = MerchantService(self.db).get_all_merchants(is_approved, limit, cursor)
+        return [self._merchant_row(merchant) for merchant in merchants], next_cursor
+
+    @staticmethod
+    def _merchant_row(merchant: Merchant) -> dict:
+        user = merchant.user
+        return {
+            "id": merchant.id,
+            "user_id": merchant.user_id,
+            "full_name": user.full_name if user else None,
+            "email": user.email if user else None,
+            "phone_number": user.phone_number if user else None,
+            "business_name": merchant.business_name,
+            "commercial_registration": merchant.commercial_registration,
+            "balance": merchant.balance,
+            "total_earnings": merchant.total_earnings,
+            "total_fees_paid": merchant.total_fees_paid,
+            "is_approved": merchant.is_approved,
+            "created_at": merchant.created_at.isoformat() if merchant.created_at else None
+        }
+
+    def transaction_page(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        A page of transactions newest first, with customer and merchant names
+        joined in, and the next page's cursor. An unknown status is ignored.
+        Raises InvalidCursor for a bad cursor.
+        """
+        from app.services.transaction_service import TransactionService
+
+        tx_status = None
+        if status:
+            try:
+                tx_status = TransactionStatus(status)
+            except ValueError:
+                pass
+
+        transactions, next_cursor = TransactionService(self.db).get_all_transactions(tx_status, limit, cursor)
+        return [self._transaction_row(tx) for tx in transactions], next_cursor
+
+    @staticmethod
+    def _transaction_row(tx: Transaction) -> dict:
+        customer_user = tx.customer.user if tx.customer else None
+        return {
+            "id": tx.id,
+            "reference_number": tx.reference_number,
+            "customer_name": customer_user.full_name if customer_user else None,
+            "merchant_name": tx.merchant.business_name if tx.merchant else None,
+            "amount": tx.amount,
+            "fee_amount": tx.fee_amount,
+            "merchant_receives": tx.merchant_receives,
+            "status": tx.status.value,
+            "created_at": tx.created_at.isoformat() if tx.created_at else None,
+            "approved_at": tx.approved_at.isoformat() if tx.approved_at else None
+        }
+
+    # ============ Actions ============
+
+    def approve_customer(self, customer_id: int) -> Optional[Customer]:
+        """Approve a customer; None if there is no such customer"""
+        from app.services.customer_service import CustomerService
+
+        customer = self.db.get(Customer, customer_id)
+        if customer is None:
+            return None
+        return CustomerService(self.db).approve_customer(customer)
+
+    def approve_merchant(self, merchant_id: int) -> Optional[Merchant]:
+        """Approve a merchant; None if there is no such merchant"""
+        from app.services.merchant_service import MerchantService
+
+        merchant = self.db.get(Merchant, merchant_id)
+        if merchant is None:
+            return None
+        return MerchantService(self.db).approve_merchant(merchant)
+
+    def set_credit_limit(
+        self,
+        customer_id: int,
+        credit_limit: float,
+        reason: Optional[str] = None,
+        changed_by: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Set one customer's credit limit and return the old and new values;
+        None if there is no such customer. Raises ValueError for a negative limit.
+        """
+        from app.services.credit_limit_service import CreditLimitService
+
+        if credit_limit < 0:
+            raise ValueError("Invalid credit limit")
+
+        customer = self.db.get(Customer, customer_id)
+        if customer is None:
+            return None
+
+        old_limit = customer.credit_limit
+        CreditLimitService(self.db).set_limit(customer, credit_limit, reason, changed_by)
+        return {
+            "message": "Credit limit updated",
+            "old_limit": old_limit,
+            "new_limit": credit_limit,
+            "available_limit": customer.available_limit
+        }
+
+    # ============ Exports ============
+
+    def iter_customers_export(
+        self,
+        columns: List[str],
+        is_approved: Optional[bool] = None,
+        city: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        yield_per: int = 1000
+    ) -> Iterator[dict]:
+        """Stream customers joined to their users, yield_per rows at a time"""
+        stmt = select(*[CUSTOMER_EXPORT_COLUMNS[name].label(name) for name in columns]).select_from(
+            Customer
+        ).outerjoin(User, User.id == Customer.user_id)
+
+        if is_approved is not None:
+            stmt = stmt.where(Customer.is_approved == is_approved)
+        if city:
+            stmt = stmt.where(Customer.city == city)
+        if created_from:
+            stmt = stmt.where(Customer.created_at >= created_from)
+        if created_to:
+            stmt = stmt.where(Customer.created_at < created_to)
+
+        yield from self._stream(stmt.order_by(Customer.id), yield_per)
+
+    def iter_merchants_export(
+        self,
+        columns: List[str],
+        is_approved: Optional[bool] = None,
+        city: Optional[str] = None,
+        business_category: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        yield_per: int = 1000
+    ) -> Iterator[dict]:
+        """Stream merchants joined to their users, yield_per rows at a time"""
+        stmt = select(*[MERCHANT_EXPORT_COLUMNS[name].label(name) for name in columns]).select_from(
+            Merchant
+        ).outerjoin(User, User.id == Merchant.user_id)
+
+        if is_approved is not None:
+            stmt = stmt.where(Merchant.is_approved == is_approved)
+        if city:
+            stmt = stmt.where(Merchant.city == city)
+        if business_category:
+            stmt = stmt.where(Merchant.business_category == business_category)
+        if created_from:
+            stmt = stmt.where(Merchant.created_at >= created_from)
+        if created_to:
+            stmt = stmt.where(Merchant.created_at < created_to)
+
+        yield from self._stream(stmt.order_by(Merchant.id), yield_per)
+
+    def _stream(self, stmt, yield_per: int) -> Iterator[dict]:
+        """Rows of stmt as dicts, read through a server-side cursor"""
+        result = self.db.execute(stmt.execution_options(yield_per=yield_per))
+        for row in result.mappings():
+            yield dict(row)
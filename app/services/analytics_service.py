@@ -0,0 +1,185 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, func
+from datetime import date, datetime, timedelta
+from typing import Optional, List
+from app.models.transaction import Transaction
+from app.models.transaction_rollup import TransactionDailyRollup
+from app.services.stats_service import STATUS_COLUMNS, VALUE_STATUSES
+
+GRANULARITIES = ("day", "week", "month")
+
+# Longest series a single request may ask for
+MAX_BUCKETS = 3660
+
+ROLLUP_COUNT_FIELDS = ["transactions_total"] + list(STATUS_COLUMNS.values())
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """First day of the bucket containing day (weeks start on Monday)"""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start: date, granularity: str) -> date:
+    """First day of the bucket after the one starting at start"""
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def default_range_start(end: date, granularity: str) -> date:
+    """Start of the default window: 30 days, 12 weeks or 12 months ending at end"""
+    if granularity == "week":
+        return bucket_start(end, "week") - timedelta(weeks=11)
+    if granularity == "month":
+        start = bucket_start(end, "month")
+        for _ in range(11):
+            start = bucket_start(start - timedelta(days=1), "month")
+        return start
+    return end - timedelta(days=29)
+
+
+class AnalyticsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_transaction_series(self, granularity: str, start: date, end: date) -> List[dict]:
+        """
+        Per-bucket transaction totals between start and end (inclusive).
+
+        Reads only the daily rollup rows in the range and folds them into
+        weeks or months. Every bucket in the range is returned, empty ones
+        with zeros. Transactions are counted in the bucket they were created in.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        if start > end:
+            raise ValueError("from must not be after to")
+
+        buckets = {}
+        cursor = bucket_start(start, granularity)
+        while cursor <= end:
+            if len(buckets) >= MAX_BUCKETS:
+                raise ValueError(f"Range covers more than {MAX_BUCKETS} buckets")
+            buckets[cursor] = dict.fromkeys(ROLLUP_COUNT_FIELDS, 0)
+            buckets[cursor].update(total_value=0.0, total_fees=0.0)
+            cursor = next_bucket(cursor, granularity)
+
+        rows = self.db.query(TransactionDailyRollup).filter(
+            TransactionDailyRollup.bucket_date >= start,
+            TransactionDailyRollup.bucket_date <= end
+        ).all()
+
+        for row in rows:
+            totals = buckets[bucket_start(row.bucket_date, granularity)]
+            for name in ROLLUP_COUNT_FIELDS:
+                totals[name] += getattr(row, name) or 0
+            totals["total_value"] += row.total_value or 0.0
+            totals["total_fees"] += row.total_fees or 0.0
+
+        return [self._format_bucket(day, totals) for day, totals in buckets.items()]
+
+    @staticmethod
+    def _format_bucket(start: date, totals: dict) -> dict:
+        approved = totals["transactions_approved"] + totals["transactions_completed"]
+        # Cancelled requests were withdrawn by the merchant, so they are not a customer decision
+        decided = approved + totals["transactions_rejected"] + totals["transactions_expired"]
+
+        return {
+            "bucket": start.isoformat(),
+            "transactions": totals["transactions_total"],
+            "pending": totals["transactions_pending"],
+            "approved": totals["transactions_approved"],
+            "completed": totals["transactions_completed"],
+            "rejected": totals["transactions_rejected"],
+            "cancelled": totals["transactions_cancelled"],
+            "expired": totals["transactions_expired"],
+            "gmv": round(totals["total_value"], 2),
+            "fees": round(totals["total_fees"], 2),
+            "approval_rate": round(approved / decided, 4) if decided else None
+        }
+
+    def backfill_rollups(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        chunk_days: int = 31
+    ) -> int:
+        """
+        Rebuild the daily rollup rows between start and end from the transactions.
+
+        Defaults to the whole transaction history. Works through the range
+        chunk_days at a time, committing after each chunk. Returns the number
+        of rollup rows written.
+        """
+        if start is None or end is None:
+            first, last = self.db.query(
+                func.min(Transaction.created_at), func.max(Transaction.created_at)
+            ).one()
+            if first is None:
+                return 0
+            start = start or first.date()
+            end = end or last.date()
+
+        written = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            written += self._rebuild_days(chunk_start, chunk_end)
+            self.db.commit()
+            chunk_start = chunk_end + timedelta(days=1)
+
+        return written
+
+    def _rebuild_days(self, start: date, end: date) -> int:
+        """Replace the rollup rows for start..end (inclusive)"""
+        day = func.date(Transaction.created_at, type_=Date)
+
+        grouped = self.db.query(
+            day,
+            Transaction.status,
+            func.count(Transaction.id),
+            func.sum(Transaction.amount),
+            func.sum(Transaction.fee_amount)
+        ).filter(
+            Transaction.created_at >= datetime.combine(start, datetime.min.time()),
+            Transaction.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+        ).group_by(day, Transaction.status).all()
+
+        rows = {}
+        for bucket_date, tx_status, count, amount, fees in grouped:
+            row = rows.get(bucket_date)
+            if row is None:
+                row = rows[bucket_date] = TransactionDailyRollup(
+                    bucket_date=bucket_date,
+                    total_value=0.0,
+                    total_fees=0.0,
+                    **dict.fromkeys(ROLLUP_COUNT_FIELDS, 0)
+                )
+            row.transactions_total += count
+            if tx_status in STATUS_COLUMNS:
+                name = STATUS_COLUMNS[tx_status]
+                setattr(row, name, getattr(row, name) + count)
+            if tx_status in VALUE_STATUSES:
+                row.total_value += amount or 0.0
+                row.total_fees += fees or 0.0
+
+        self.db.query(TransactionDailyRollup).filter(
+            TransactionDailyRollup.bucket_date >= start,
+            TransactionDailyRollup.bucket_date <= end
+        ).delete(synchronize_session=False)
+        self.db.add_all(rows.values())
+        self.db.flush()
+
+        return len(rows)
+
+    def ensure_rollups(self) -> int:
+        """Backfill the rollups once if they are empty but transactions exist"""
+        if self.db.query(TransactionDailyRollup.bucket_date).first() is not None:
+            return 0
+        return self.backfill_rollups()
@@ -4,6 +4,7 @@ from typing import Optional, Tuple
 from app.models.user import User, UserType
 from app.models.customer import Customer
 from app.models.merchant import Merchant
+from app.services.stats_service import StatsService
 from app.utils.security import (
     verify_password, 
     get_password_hash, 
@@ -115,6 +116,7 @@ class AuthService:
             is_approved=True
         )
         self.db.add(customer)
+        StatsService(self.db).record_customer_created(approved=customer.is_approved)
         self.db.commit()
         self.db.refresh(user)
         self.db.refresh(customer)
@@ -170,6 +172,7 @@ class AuthService:
             is_approved=True
         )
         self.db.add(merchant)
+        StatsService(self.db).record_merchant_created(approved=merchant.is_approved)
         self.db.commit()
         self.db.refresh(user)
         self.db.refresh(merchant)
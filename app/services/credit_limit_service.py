@@ -0,0 +1,259 @@
+"""
+Credit limit changes, one customer at a time or in bulk.
+
+Every change keeps the same invariants: the available limit moves by the
+change in credit limit and stays within 0..credit_limit, and an audit row
+in credit_limit_changes records the values before and after.
+"""
+import logging
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import DateTime, Float, Integer, String, and_, bindparam, case, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from app.models.customer import Customer
+from app.models.credit_limit_change import CreditLimitChange
+from app.services.admin_service import AdminService
+
+logger = logging.getLogger(__name__)
+
+ADJUSTMENT_RULES = ("percentage", "cap", "set")
+
+# customers_query filters that narrow the customers a percentage or cap rule touches
+ADJUSTMENT_FILTERS = ("city", "min_limit", "max_limit", "min_utilisation", "max_utilisation")
+
+_AUDIT_COLUMNS = [
+    "customer_id", "batch_id", "old_limit", "new_limit", "old_available",
+    "new_available", "reason", "changed_by", "created_at",
+]
+
+
+def clamp_available(available: float, old_limit: float, new_limit: float) -> float:
+    """Available limit after the credit limit moves from old_limit to new_limit"""
+    return max(0.0, min(available + new_limit - old_limit, new_limit))
+
+
+def clamped_available_sql(new_limit):
+    """clamp_available for the customers row being updated, as a SQL expression"""
+    shifted = Customer.available_limit + new_limit - Customer.credit_limit
+    return case((shifted > new_limit, new_limit), (shifted < 0, 0.0), else_=shifted)
+
+
+class CreditLimitService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def set_limit(
+        self,
+        customer: Customer,
+        new_limit: float,
+        reason: Optional[str] = None,
+        changed_by: Optional[int] = None
+    ) -> Customer:
+        """Change one customer's credit limit and record it. Commits."""
+        if new_limit < 0:
+            raise ValueError("Credit limit cannot be negative")
+
+        old_limit = customer.credit_limit
+        old_available = customer.available_limit
+        customer.credit_limit = new_limit
+        customer.available_limit = clamp_available(old_available, old_limit, new_limit)
+
+        self.db.add(CreditLimitChange(
+            customer_id=customer.id,
+            old_limit=old_limit,
+            new_limit=new_limit,
+            old_available=old_available,
+            new_available=customer.available_limit,
+            reason=reason,
+            changed_by=changed_by
+        ))
+        self.db.commit()
+        self.db.refresh(customer)
+
+        return customer
+
+    def adjust(
+        self,
+        rule: str,
+        percent: Optional[float] = None,
+        cap: Optional[float] = None,
+        limits: Optional[Dict[int, float]] = None,
+        filters: Optional[dict] = None,
+        reason: Optional[str] = None,
+        changed_by: Optional[int] = None,
+        batch_size: int = 1000,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> dict:
+        """
+        Apply one rule to many customers, batch_size customers per transaction.
+
+        percentage moves each approved customer's limit by percent (rounded
+        to 2 places), never raising it past cap when one is given. cap lowers
+        approved customers' limits above cap. set applies limits, a
+        {customer_id: credit_limit} dict. filters (ADJUSTMENT_FILTERS) narrow
+        percentage and cap. progress(processed, changed) is called after each
+        committed batch. Raises ValueError for an invalid rule.
+        """
+        self._validate(rule, percent, cap, limits, filters or {})
+
+        summary = {
+            "batch_id": uuid.uuid4().hex,
+            "rule": rule,
+            "processed": 0,
+            "changed": 0,
+            "missing": [],
+        }
+
+        if rule == "set":
+            batches = self._set_batches(limits, reason, changed_by, batch_size, summary)
+        else:
+            batches = self._rule_batches(rule, percent, cap, filters or {}, reason, changed_by, batch_size, summary)
+
+        for processed, changed in batches:
+            self.db.commit()
+            summary["processed"] += processed
+            summary["changed"] += changed
+            logger.info(
+                "Credit limit adjustment %s: %d processed, %d changed",
+                summary["batch_id"], summary["processed"], summary["changed"]
+            )
+            if progress:
+                progress(summary["processed"], summary["changed"])
+
+        return summary
+
+    def get_changes(self, batch_id: str) -> List[CreditLimitChange]:
+        """Audit rows written by one bulk adjustment"""
+        return self.db.query(CreditLimitChange).filter(
+            CreditLimitChange.batch_id == batch_id
+        ).order_by(CreditLimitChange.customer_id).all()
+
+    @staticmethod
+    def _validate(rule, percent, cap, limits, filters) -> None:
+        if rule not in ADJUSTMENT_RULES:
+            raise ValueError(f"rule must be one of: {', '.join(ADJUSTMENT_RULES)}")
+        if cap is not None and cap < 0:
+            raise ValueError("cap cannot be negative")
+        if rule == "percentage" and (percent is None or percent <= -100):
+            raise ValueError("percentage needs percent greater than -100")
+        if rule == "cap" and cap is None:
+            raise ValueError("cap needs a cap value")
+        if rule == "set":
+            if not limits:
+                raise ValueError("set needs at least one customer limit")
+            if any(limit < 0 for limit in limits.values()):
+                raise ValueError("Credit limit cannot be negative")
+
+        unknown = [name for name in filters if name not in ADJUSTMENT_FILTERS]
+        if unknown:
+            raise ValueError(f"Unknown filters: {', '.join(unknown)}. Valid filters: {', '.join(ADJUSTMENT_FILTERS)}")
+
+    def _rule_batches(self, rule, percent, cap, filters, reason, changed_by, batch_size, summary):
+        """
+        Walk the matching customers in id order and update each batch with
+        one INSERT ... SELECT for the audit rows and one UPDATE.
+        """
+        if rule == "percentage":
+            new_limit = func.round(Customer.credit_limit * (1 + percent / 100.0), 2)
+            if cap is not None:
+                # Limits already above the cap are left alone rather than cut
+                ceiling = case((Customer.credit_limit > cap, Customer.credit_limit), else_=cap)
+                new_limit = case((new_limit > ceiling, ceiling), else_=new_limit)
+        else:
+            new_limit = literal(cap, Float)
+
+        query = AdminService(self.db).customers_query(is_approved=True, **filters)
+        if rule == "cap":
+            query = query.filter(Customer.credit_limit > cap)
+
+        last_id = 0
+        while True:
+            ids = [
+                row.id for row in query.with_entities(Customer.id).filter(
+                    Customer.id > last_id
+                ).order_by(Customer.id).limit(batch_size).with_for_update()
+            ]
+            if not ids:
+                return
+            last_id = ids[-1]
+
+            target = and_(Customer.id.in_(ids), new_limit != Customer.credit_limit)
+            now = datetime.utcnow()
+
+            self.db.execute(insert(CreditLimitChange).from_select(_AUDIT_COLUMNS, select(
+                Customer.id,
+                literal(summary["batch_id"], String),
+                Customer.credit_limit,
+                new_limit,
+                Customer.available_limit,
+                clamped_available_sql(new_limit),
+                literal(reason, String),
+                literal(changed_by, Integer),
+                literal(now, DateTime)
+            ).where(target)))
+
+            result = self.db.execute(
+                update(Customer).where(target).values(
+                    credit_limit=new_limit,
+                    available_limit=clamped_available_sql(new_limit),
+                    updated_at=now
+                ).execution_options(synchronize_session=False)
+            )
+
+            yield len(ids), result.rowcount
+
+    def _set_batches(self, limits, reason, changed_by, batch_size, summary):
+        """
+        Apply explicit limits batch by batch: lock the batch's customers,
+        then write the audit rows and updates as two executemany statements.
+        """
+        new_limit = bindparam("b_limit", type_=Float)
+        customer_id = bindparam("b_id", type_=Integer)
+
+        audit = insert(CreditLimitChange).from_select(_AUDIT_COLUMNS, select(
+            Customer.id,
+            bindparam("b_batch", type_=String),
+            Customer.credit_limit,
+            new_limit,
+            Customer.available_limit,
+            clamped_available_sql(new_limit),
+            bindparam("b_reason", type_=String),
+            bindparam("b_changed_by", type_=Integer),
+            bindparam("b_now", type_=DateTime)
+        ).where(Customer.id == customer_id))
+
+        apply = update(Customer).where(Customer.id == customer_id).values(
+            credit_limit=new_limit,
+            available_limit=clamped_available_sql(new_limit),
+            updated_at=bindparam("b_now", type_=DateTime)
+        ).execution_options(synchronize_session=False)
+
+        ids = sorted(limits)
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            current = dict(self.db.execute(
+                select(Customer.id, Customer.credit_limit).where(Customer.id.in_(chunk)).with_for_update()
+            ).all())
+            summary["missing"].extend(customer for customer in chunk if customer not in current)
+
+            now = datetime.utcnow()
+            params = [
+                {
+                    "b_id": customer,
+                    "b_limit": limits[customer],
+                    "b_batch": summary["batch_id"],
+                    "b_reason": reason,
+                    "b_changed_by": changed_by,
+                    "b_now": now,
+                }
+                for customer in chunk
+                if customer in current and current[customer] != limits[customer]
+            ]
+            if params:
+                # Core executemany on the session's connection; the ORM would treat these as bulk by-primary-key writes
+                connection = self.db.connection()
+                connection.execute(audit, params)
+                connection.execute(apply, params)
+
+            yield len(chunk), len(params)
@@ -1,8 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from app.models.customer import Customer
 from app.models.user import User
+from app.services.credit_limit_service import CreditLimitService
+from app.services.stats_service import StatsService
+from app.utils.pagination import paginate
 
 
 class CustomerService:
@@ -25,35 +28,20 @@ class CustomerService:
         self, 
         customer: Customer, 
         new_limit: float,
-        reason: Optional[str] = None
+        reason: Optional[str] = None,
+        changed_by: Optional[int] = None
     ) -> Customer:
         """Update customer's credit limit (admin function)"""
-        if new_limit < 0:
-            raise ValueError("Credit limit cannot be negative")
-        
-        old_limit = customer.credit_limit
-        difference = new_limit - old_limit
-        
-        customer.credit_limit = new_limit
-        customer.available_limit += difference
-        
-        # Ensure available_limit doesn't exceed credit_limit
-        if customer.available_limit > customer.credit_limit:
-            customer.available_limit = customer.credit_limit
-        
-        # Ensure available_limit doesn't go negative
-        if customer.available_limit < 0:
-            customer.available_limit = 0
-        
-        self.db.commit()
-        self.db.refresh(customer)
-        
-        return customer
+        return CreditLimitService(self.db).set_limit(customer, new_limit, reason, changed_by)
     
     def approve_customer(self, customer: Customer) -> Customer:
         """Approve a customer account (admin function)"""
+        newly_approved = not customer.is_approved
         customer.is_approved = True
         customer.approved_at = datetime.utcnow()
+        if newly_approved:
+            # After the change, so a missing stats row is rebuilt with it counted
+            StatsService(self.db).record_customer_approved()
         
         self.db.commit()
         self.db.refresh(customer)
@@ -82,16 +70,16 @@ class CustomerService:
     def get_all_customers(
         self, 
         is_approved: Optional[bool] = None,
-        limit: int = 50,
-        offset: int = 0
-    ) -> List[Customer]:
-        """Get all customers (admin function)"""
-        query = self.db.query(Customer)
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Customer], Optional[str]]:
+        """Get a page of customers in id order with their users loaded, and the next page's cursor (admin function)"""
+        query = self.db.query(Customer).outerjoin(Customer.user).options(contains_eager(Customer.user))
         
         if is_approved is not None:
             query = query.filter(Customer.is_approved == is_approved)
         
-        return query.offset(offset).limit(limit).all()
+        return paginate(query, "customers", [Customer.id], limit, cursor, descending=False)
     
     def get_customer_with_user(self, customer_id: int) -> Optional[dict]:
         """Get customer with associated user information"""
@@ -1,10 +1,17 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import func, literal, select, union_all
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterator, Optional, List, Tuple
 from app.models.merchant import Merchant
 from app.models.user import User
+from app.services.stats_service import StatsService, sum_where
+from app.utils.pagination import paginate
 from app.models.transaction import Transaction, TransactionStatus
 
+STATEMENT_FIELDS = [
+    "date", "type", "reference_number", "product_name", "credit", "debit", "balance"
+]
+
 
 class MerchantService:
     def __init__(self, db: Session):
@@ -26,8 +33,12 @@ class MerchantService:
     
     def approve_merchant(self, merchant: Merchant) -> Merchant:
         """Approve a merchant account (admin function)"""
+        newly_approved = not merchant.is_approved
         merchant.is_approved = True
         merchant.approved_at = datetime.utcnow()
+        if newly_approved:
+            # After the change, so a missing stats row is rebuilt with it counted
+            StatsService(self.db).record_merchant_approved()
         
         self.db.commit()
         self.db.refresh(merchant)
@@ -70,43 +81,103 @@ class MerchantService:
     
     def get_merchant_balance(self, merchant: Merchant) -> dict:
         """Get merchant's balance information"""
-        pending_count = self.db.query(Transaction).filter(
-            Transaction.merchant_id == merchant.id,
-            Transaction.status == TransactionStatus.PENDING
-        ).count()
-        
-        completed_count = self.db.query(Transaction).filter(
-            Transaction.merchant_id == merchant.id,
-            Transaction.status == TransactionStatus.COMPLETED
-        ).count()
-        
-        approved_count = self.db.query(Transaction).filter(
-            Transaction.merchant_id == merchant.id,
-            Transaction.status == TransactionStatus.APPROVED
-        ).count()
+        # One pass over the (merchant_id, status) index instead of a COUNT per status
+        counts = dict(
+            self.db.query(Transaction.status, func.count(Transaction.id)).filter(
+                Transaction.merchant_id == merchant.id
+            ).group_by(Transaction.status).all()
+        )
         
         return {
             "balance": merchant.balance,
             "total_earnings": merchant.total_earnings,
             "total_fees_paid": merchant.total_fees_paid,
-            "pending_transactions": pending_count,
-            "approved_transactions": approved_count,
-            "completed_transactions": completed_count
+            "pending_transactions": counts.get(TransactionStatus.PENDING, 0),
+            "approved_transactions": counts.get(TransactionStatus.APPROVED, 0),
+            "completed_transactions": counts.get(TransactionStatus.COMPLETED, 0)
         }
     
+    def iter_statement(
+        self,
+        merchant_id: int,
+        start: datetime,
+        end: datetime,
+        yield_per: int = 1000
+    ) -> Iterator[dict]:
+        """
+        Itemized balance movements between start and end, oldest first.
+        
+        Yields an opening balance row, a credit for every purchase approved in
+        the period and a debit for the fee of every transaction completed in
+        it, each with the running balance, then a closing balance row. Rows
+        are streamed from a server-side cursor yield_per at a time.
+        """
+        opening = self.db.query(
+            sum_where(Transaction.approved_at < start, Transaction.amount)
+            - sum_where(Transaction.completed_at < start, Transaction.fee_amount)
+        ).filter(Transaction.merchant_id == merchant_id).scalar() or 0.0
+        
+        balance = opening
+        yield {"date": start, "type": "opening_balance", "balance": round(balance, 2)}
+        
+        approvals = select(
+            Transaction.approved_at.label("occurred_at"),
+            literal(0).label("entry_order"),
+            Transaction.id.label("transaction_id"),
+            Transaction.reference_number,
+            Transaction.product_name,
+            Transaction.amount.label("credit"),
+            literal(0.0).label("debit")
+        ).where(
+            Transaction.merchant_id == merchant_id,
+            Transaction.approved_at >= start,
+            Transaction.approved_at < end
+        )
+        fees = select(
+            Transaction.completed_at.label("occurred_at"),
+            literal(1).label("entry_order"),
+            Transaction.id.label("transaction_id"),
+            Transaction.reference_number,
+            Transaction.product_name,
+            literal(0.0).label("credit"),
+            Transaction.fee_amount.label("debit")
+        ).where(
+            Transaction.merchant_id == merchant_id,
+            Transaction.completed_at >= start,
+            Transaction.completed_at < end
+        )
+        entries = union_all(approvals, fees)
+        columns = entries.selected_columns
+        stmt = entries.order_by(columns.occurred_at, columns.entry_order, columns.transaction_id)
+        
+        result = self.db.execute(stmt.execution_options(yield_per=yield_per))
+        for row in result:
+            balance += row.credit - row.debit
+            yield {
+                "date": row.occurred_at,
+                "type": "approval" if row.entry_order == 0 else "fee",
+                "reference_number": row.reference_number,
+                "product_name": row.product_name,
+                "credit": row.credit,
+                "debit": row.debit,
+                "balance": round(balance, 2)
+            }
+        
+        yield {"date": end, "type": "closing_balance", "balance": round(balance, 2)}
+    
     def get_all_merchants(
         self, 
         is_approved: Optional[bool] = None,
-        limit: int = 50,
-        offset: int = 0
-    ) -> List[Merchant]:
-        """Get all merchants (admin function)"""
-        query = self.db.query(Merchant)
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Merchant], Optional[str]]:
+        """Get a page of merchants in id order with their users loaded, and the next page's cursor (admin function)"""
+        query = self.db.query(Merchant).outerjoin(Merchant.user).options(contains_eager(Merchant.user))
         
         if is_approved is not None:
             query = query.filter(Merchant.is_approved == is_approved)
         
-        return query.offset(offset).limit(limit).all()
+        return paginate(query, "merchants", [Merchant.id], limit, cursor, descending=False)
     
     def get_merchant_with_user(self, merchant_id: int) -> Optional[dict]:
         """Get merchant with associated user information"""
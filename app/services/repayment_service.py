@@ -1,10 +1,15 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from typing import Optional, List
+from typing import Optional, List, Iterable
 from app.models.repayment_plan import RepaymentPlan, RepaymentSchedule, PaymentStatus
 from app.models.transaction import Transaction, TransactionStatus
 from app.models.customer import Customer
+from app.models.overdue_summary import CustomerOverdueSummary
+
+# Installment statuses that still owe money and can fall overdue
+OPEN_INSTALLMENT_STATUSES = [PaymentStatus.PENDING, PaymentStatus.PARTIALLY_PAID]
 
 
 class RepaymentService:
@@ -79,6 +84,12 @@ class RepaymentService:
         """Get repayment plan by ID"""
         return self.db.query(RepaymentPlan).filter(RepaymentPlan.id == plan_id).first()
     
+    def get_plan_version(self, plan_id: int):
+        """The plan's customer_id, updated_at and created_at by primary key, without loading it"""
+        return self.db.query(
+            RepaymentPlan.customer_id, RepaymentPlan.updated_at, RepaymentPlan.created_at
+        ).filter(RepaymentPlan.id == plan_id).first()
+    
     def get_repayment_plan_by_transaction(self, transaction_id: int) -> Optional[RepaymentPlan]:
         """Get repayment plan by transaction ID"""
         return self.db.query(RepaymentPlan).filter(
@@ -150,6 +161,9 @@ class RepaymentService:
             schedule.paid_at = datetime.utcnow()
             plan.payments_made += 1
             plan.payments_remaining -= 1
+        elif schedule.due_date < datetime.utcnow():
+            # Still past due - a partial payment does not clear the overdue flag
+            schedule.status = PaymentStatus.OVERDUE
         else:
             schedule.status = PaymentStatus.PARTIALLY_PAID
         
@@ -171,6 +185,10 @@ class RepaymentService:
             tx_service = TransactionService(self.db)
             tx_service.complete_transaction(plan.transaction)
         
+        if schedule.due_date < datetime.utcnow():
+            self.db.flush()
+            self.refresh_overdue_summaries([customer.id])
+        
         self.db.commit()
         self.db.refresh(plan)
         self.db.refresh(schedule)
@@ -191,21 +209,112 @@ class RepaymentService:
         """Get the next pending payment for a plan"""
         return self.db.query(RepaymentSchedule).filter(
             RepaymentSchedule.repayment_plan_id == plan.id,
-            RepaymentSchedule.status.in_([PaymentStatus.PENDING, PaymentStatus.PARTIALLY_PAID])
+            RepaymentSchedule.status.in_(OPEN_INSTALLMENT_STATUSES + [PaymentStatus.OVERDUE])
         ).order_by(RepaymentSchedule.due_date).first()
     
-    def check_overdue_payments(self) -> int:
-        """Mark overdue payments"""
-        now = datetime.utcnow()
-        
-        overdue_count = self.db.query(RepaymentSchedule).filter(
-            RepaymentSchedule.status == PaymentStatus.PENDING,
-            RepaymentSchedule.due_date < now
-        ).update({"status": PaymentStatus.OVERDUE})
+    def check_overdue_payments(
+        self,
+        since: Optional[datetime] = None,
+        as_of: Optional[datetime] = None,
+        batch_size: int = 500
+    ) -> int:
+        """
+        Mark unpaid installments that fell due in [since, as_of) as overdue.
+        
+        Works in bounded batches over the (status, due_date) index and refreshes
+        the overdue summaries of the affected customers.
+        """
+        if as_of is None:
+            as_of = datetime.utcnow()
+        
+        overdue_count = 0
+        while True:
+            query = self.db.query(
+                RepaymentSchedule.id, RepaymentSchedule.repayment_plan_id, RepaymentPlan.customer_id
+            ).join(RepaymentPlan).filter(
+                RepaymentSchedule.status.in_(OPEN_INSTALLMENT_STATUSES),
+                RepaymentSchedule.due_date < as_of
+            )
+            if since is not None:
+                query = query.filter(RepaymentSchedule.due_date >= since)
+            
+            rows = query.order_by(RepaymentSchedule.due_date).limit(batch_size).all()
+            if not rows:
+                break
+            
+            overdue_count += self.db.query(RepaymentSchedule).filter(
+                RepaymentSchedule.id.in_([row.id for row in rows]),
+                RepaymentSchedule.status.in_(OPEN_INSTALLMENT_STATUSES)
+            ).update({"status": PaymentStatus.OVERDUE}, synchronize_session=False)
+            self.db.query(RepaymentPlan).filter(
+                RepaymentPlan.id.in_({row.repayment_plan_id for row in rows})
+            ).update({"updated_at": datetime.utcnow()}, synchronize_session=False)
+            
+            self.refresh_overdue_summaries({row.customer_id for row in rows})
+            self.db.commit()
+            
+            if len(rows) < batch_size:
+                break
         
-        self.db.commit()
         return overdue_count
     
+    def refresh_overdue_summaries(self, customer_ids: Iterable[int]) -> None:
+        """Recompute overdue totals for the given customers (caller commits)"""
+        customer_ids = list(customer_ids)
+        if not customer_ids:
+            return
+        
+        totals = {
+            row.customer_id: row
+            for row in self.db.query(
+                RepaymentPlan.customer_id,
+                func.count(RepaymentSchedule.id).label("installments"),
+                func.sum(RepaymentSchedule.amount - RepaymentSchedule.amount_paid).label("amount"),
+                func.min(RepaymentSchedule.due_date).label("oldest_due_date")
+            ).join(RepaymentPlan).filter(
+                RepaymentPlan.customer_id.in_(customer_ids),
+                RepaymentSchedule.status == PaymentStatus.OVERDUE
+            ).group_by(RepaymentPlan.customer_id).all()
+        }
+        
+        summaries = {
+            summary.customer_id: summary
+            for summary in self.db.query(CustomerOverdueSummary).filter(
+                CustomerOverdueSummary.customer_id.in_(customer_ids)
+            ).all()
+        }
+        
+        for customer_id in customer_ids:
+            row = totals.get(customer_id)
+            summary = summaries.get(customer_id)
+            
+            if row is None:
+                # Nothing overdue any more - drop the row so the table stays small
+                if summary is not None:
+                    self.db.delete(summary)
+                continue
+            
+            if summary is None:
+                summary = CustomerOverdueSummary(customer_id=customer_id)
+                self.db.add(summary)
+            
+            summary.overdue_installments = row.installments
+            summary.overdue_amount = round(row.amount or 0.0, 2)
+            summary.oldest_due_date = row.oldest_due_date
+            summary.updated_at = datetime.utcnow()
+    
+    def get_overdue_customers(self, limit: int = 50) -> List[tuple]:
+        """(summary, user) pairs for customers with the largest overdue amounts (admin function)"""
+        from app.models.user import User
+        
+        return self.db.query(CustomerOverdueSummary, User).join(
+            Customer, Customer.id == CustomerOverdueSummary.customer_id
+        ).join(
+            User, User.id == Customer.user_id
+        ).order_by(
+            CustomerOverdueSummary.overdue_amount.desc()
+        ).limit(limit).all()
+    
     def get_overdue_schedules(self, customer_id: int) -> List[RepaymentSchedule]:
         """Get all overdue schedules for a customer"""
         return self.db.query(RepaymentSchedule).join(RepaymentPlan).filter(
@@ -234,6 +343,7 @@ class RepaymentService:
             raise ValueError("Payment already requested for this installment")
         
         schedule.request_payment()
+        plan.touch()
         self.db.commit()
         self.db.refresh(schedule)
         
@@ -327,6 +437,10 @@ class RepaymentService:
             tx_service = TransactionService(self.db)
             tx_service.complete_transaction(transaction)
         
+        if schedule.due_date < datetime.utcnow():
+            self.db.flush()
+            self.refresh_overdue_summaries([customer.id])
+        
         self.db.commit()
         self.db.refresh(plan)
         self.db.refresh(schedule)
@@ -363,9 +477,15 @@ class RepaymentService:
         if schedule.status != PaymentStatus.PAYMENT_REQUESTED:
             raise ValueError("This installment does not have a pending payment request")
         
-        # Reset to pending
-        schedule.status = PaymentStatus.PENDING
+        # Reset to pending, or back to overdue if the due date has already passed
         schedule.payment_requested_at = None
+        plan.touch()
+        if schedule.due_date < datetime.utcnow():
+            schedule.status = PaymentStatus.OVERDUE
+            self.db.flush()
+            self.refresh_overdue_summaries([plan.customer_id])
+        else:
+            schedule.status = PaymentStatus.PENDING
         
         self.db.commit()
         self.db.refresh(schedule)
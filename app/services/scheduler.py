@@ -0,0 +1,265 @@
+"""
+In-process background scheduler.
+
+Every worker runs its own scheduler thread, but each job is guarded by a
+lease row in `job_leases` so only one worker runs it at a time. The lease
+is renewed on every run and expires if the holder dies, letting another
+worker take over.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job_lease import JobLease
+from app.models.job_checkpoint import JobCheckpoint
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob:
+    """A function run every interval_seconds with a fresh database session"""
+
+    def __init__(self, name: str, func: Callable[[Session], Optional[int]], interval_seconds: float):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.next_run = 0.0
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        lease_seconds: int = 120,
+        tick_seconds: float = 1.0
+    ):
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.tick_seconds = tick_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: List[ScheduledJob] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_job(self, name: str, func: Callable[[Session], Optional[int]], interval_seconds: float) -> None:
+        """Register a job to run every interval_seconds"""
+        self.jobs.append(ScheduledJob(name, func, interval_seconds))
+
+    def start(self) -> None:
+        """Start the scheduler thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Job scheduler started as %s", self.worker_id)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the scheduler thread and release held leases"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self._release_leases()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in self.jobs:
+                if now >= job.next_run:
+                    job.next_run = now + job.interval_seconds
+                    self.run_job(job)
+            self._stop.wait(self.tick_seconds)
+
+    def run_job(self, job: ScheduledJob) -> bool:
+        """Run a job if this worker holds its lease. Returns True if it ran."""
+        db = self.session_factory()
+        try:
+            if not self._acquire_lease(db, job.name):
+                return False
+
+            with metrics.timer(f"jobs.{job.name}.duration_seconds"):
+                job.func(db)
+            metrics.increment(f"jobs.{job.name}.runs")
+            return True
+        except Exception:
+            db.rollback()
+            metrics.increment(f"jobs.{job.name}.errors")
+            logger.exception("Background job %s failed", job.name)
+            return False
+        finally:
+            db.close()
+
+    def _acquire_lease(self, db: Session, name: str) -> bool:
+        """Take or renew the lease for a job"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        result = db.execute(
+            update(JobLease).where(
+                JobLease.name == name,
+                or_(
+                    JobLease.owner == self.worker_id,
+                    JobLease.expires_at.is_(None),
+                    JobLease.expires_at < now
+                )
+            ).values(owner=self.worker_id, acquired_at=now, expires_at=expires_at)
+        )
+        db.commit()
+
+        if result.rowcount:
+            return True
+
+        if db.get(JobLease, name) is not None:
+            return False  # Held by another worker
+
+        # First run of this job anywhere - create the lease row
+        try:
+            db.add(JobLease(name=name, owner=self.worker_id, acquired_at=now, expires_at=expires_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()
+            return False
+
+    def _release_leases(self) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(JobLease).where(
+                    JobLease.owner == self.worker_id
+                ).values(owner=None, expires_at=None)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Could not release job leases")
+        finally:
+            db.close()
+
+
+# ============ Jobs ============
+
+def expire_pending_transactions(db: Session) -> int:
+    """Sweep pending transactions whose expiry time has passed"""
+    from app.services.transaction_service import TransactionService
+
+    with metrics.timer("transactions.expiry_sweep_seconds"):
+        expired = TransactionService(db).expire_old_transactions(
+            batch_size=settings.TRANSACTION_EXPIRY_BATCH_SIZE
+        )
+
+    metrics.increment("transactions.expired", expired)
+    if expired:
+        logger.info("Expired %d pending transactions", expired)
+    return expired
+
+
+def get_checkpoint(db: Session, name: str) -> Optional[datetime]:
+    """High-water mark saved by the last successful run of a job"""
+    checkpoint = db.get(JobCheckpoint, name)
+    return checkpoint.high_water_mark if checkpoint else None
+
+
+def set_checkpoint(db: Session, name: str, high_water_mark: datetime) -> None:
+    """Save a job's high-water mark"""
+    checkpoint = db.get(JobCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=name)
+        db.add(checkpoint)
+    checkpoint.high_water_mark = high_water_mark
+    db.commit()
+
+
+def detect_overdue_installments(db: Session) -> int:
+    """Mark installments that became due since the last run as overdue"""
+    from app.services.repayment_service import RepaymentService
+
+    since = get_checkpoint(db, "detect_overdue_installments")
+    as_of = datetime.utcnow()
+
+    with metrics.timer("repayments.overdue_sweep_seconds"):
+        marked = RepaymentService(db).check_overdue_payments(
+            since=since,
+            as_of=as_of,
+            batch_size=settings.OVERDUE_DETECTION_BATCH_SIZE
+        )
+
+    set_checkpoint(db, "detect_overdue_installments", as_of)
+
+    metrics.increment("repayments.marked_overdue", marked)
+    if marked:
+        logger.info("Marked %d installments overdue", marked)
+    return marked
+
+
+def reconcile_platform_stats(db: Session) -> int:
+    """Recount the dashboard summary and correct any drift"""
+    from app.services.stats_service import StatsService
+
+    with metrics.timer("stats.reconcile_seconds"):
+        drift = StatsService(db).reconcile()
+
+    if drift:
+        metrics.increment("stats.drift_detected")
+        logger.warning("Platform stats drifted and were corrected: %s", drift)
+    return len(drift)
+
+
+def build_scheduler() -> JobScheduler:
+    """Create a scheduler with the application's jobs registered"""
+    scheduler = JobScheduler(lease_seconds=settings.SCHEDULER_LEASE_SECONDS)
+    scheduler.add_job(
+        "expire_pending_transactions",
+        expire_pending_transactions,
+        settings.TRANSACTION_EXPIRY_INTERVAL_SECONDS
+    )
+    scheduler.add_job(
+        "detect_overdue_installments",
+        detect_overdue_installments,
+        settings.OVERDUE_DETECTION_INTERVAL_SECONDS
+    )
+    scheduler.add_job(
+        "reconcile_platform_stats",
+        reconcile_platform_stats,
+        settings.STATS_RECONCILE_INTERVAL_SECONDS
+    )
+    return scheduler
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler() -> Optional[JobScheduler]:
+    """Start the process-wide scheduler (no-op if disabled or already running)"""
+    global _scheduler
+
+    if not settings.SCHEDULER_ENABLED:
+        return None
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = build_scheduler()
+        _scheduler.start()
+        return _scheduler
+
+
+def stop_scheduler() -> None:
+    """Stop the process-wide scheduler"""
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.stop()
+            _scheduler = None
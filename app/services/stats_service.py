@@ -0,0 +1,300 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import datetime
+from typing import Optional
+from app.models.platform_stats import PlatformStats
+from app.models.transaction_rollup import TransactionDailyRollup
+from app.models.customer import Customer
+from app.models.merchant import Merchant
+from app.models.transaction import Transaction, TransactionStatus
+
+STATS_ID = 1
+
+# PlatformStats column holding the count for each transaction status
+STATUS_COLUMNS = {
+    TransactionStatus.PENDING: "transactions_pending",
+    TransactionStatus.APPROVED: "transactions_approved",
+    TransactionStatus.REJECTED: "transactions_rejected",
+    TransactionStatus.CANCELLED: "transactions_cancelled",
+    TransactionStatus.COMPLETED: "transactions_completed",
+    TransactionStatus.EXPIRED: "transactions_expired",
+}
+
+# Statuses whose amounts count toward total value and fees
+VALUE_STATUSES = (TransactionStatus.APPROVED, TransactionStatus.COMPLETED)
+
+COUNT_FIELDS = [
+    "customers_total", "customers_approved",
+    "merchants_total", "merchants_approved",
+    "transactions_total",
+] + list(STATUS_COLUMNS.values())
+AMOUNT_FIELDS = ["total_value", "total_fees"]
+
+# Float sums can differ in the last bits depending on addition order
+AMOUNT_TOLERANCE = 0.005
+
+
+def count_where(condition):
+    """COUNT of rows matching condition, as a column expression"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def sum_where(condition, column):
+    """SUM of column over rows matching condition, as a column expression"""
+    return func.coalesce(func.sum(case((condition, column), else_=0.0)), 0.0)
+
+
+class StatsService:
+    """
+    Maintains the single-row platform_stats summary.
+
+    The record_* methods are called by the other services in the same
+    database transaction as the change they describe, so the summary commits
+    or rolls back together with it. They never commit themselves.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ============ Incremental updates ============
+
+    def record_customer_created(self, approved: bool = False) -> None:
+        """A customer registered"""
+        self._apply(customers_total=1, customers_approved=1 if approved else 0)
+
+    def record_customer_approved(self) -> None:
+        """An unapproved customer was approved"""
+        self._apply(customers_approved=1)
+
+    def record_merchant_created(self, approved: bool = False) -> None:
+        """A merchant registered"""
+        self._apply(merchants_total=1, merchants_approved=1 if approved else 0)
+
+    def record_merchant_approved(self) -> None:
+        """An unapproved merchant was approved"""
+        self._apply(merchants_approved=1)
+
+    def record_transactions_created(self, count: int = 1, created_at: Optional[datetime] = None) -> None:
+        """New pending transactions were created"""
+        deltas = {"transactions_total": count, "transactions_pending": count}
+        self._apply(**deltas)
+        self._apply_rollup(created_at or datetime.utcnow(), deltas)
+
+    def record_transaction_status_change(
+        self,
+        old_status: TransactionStatus,
+        new_status: TransactionStatus,
+        amount: float = 0.0,
+        fee_amount: float = 0.0,
+        count: int = 1,
+        created_at: Optional[datetime] = None
+    ) -> None:
+        """
+        count transactions moved from old_status to new_status.
+        
+        amount and fee_amount are their combined totals, and created_at their
+        creation time, which picks the analytics rollup row to update.
+        """
+        if count <= 0 or old_status == new_status:
+            return
+
+        deltas = {
+            STATUS_COLUMNS[old_status]: -count,
+            STATUS_COLUMNS[new_status]: count,
+        }
+        if new_status in VALUE_STATUSES and old_status not in VALUE_STATUSES:
+            deltas["total_value"] = amount
+            deltas["total_fees"] = fee_amount
+        elif old_status in VALUE_STATUSES and new_status not in VALUE_STATUSES:
+            deltas["total_value"] = -amount
+            deltas["total_fees"] = -fee_amount
+
+        self._apply(**deltas)
+        if created_at is not None:
+            self._apply_rollup(created_at, deltas)
+
+    def _apply(self, **deltas) -> None:
+        """Add deltas to the summary row with a single atomic UPDATE"""
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        values = {
+            name: getattr(PlatformStats, name) + delta
+            for name, delta in deltas.items()
+        }
+        values["updated_at"] = datetime.utcnow()
+
+        result = self.db.execute(
+            update(PlatformStats).where(PlatformStats.id == STATS_ID).values(values)
+        )
+
+        if result.rowcount == 0:
+            # No summary yet - build it from the data, including this change
+            self.db.flush()
+            self.rebuild_stats()
+
+    def _apply_rollup(self, created_at: datetime, deltas: dict) -> None:
+        """Add deltas to the analytics rollup row for created_at's day"""
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        bucket_date = created_at.date()
+        now = datetime.utcnow()
+        dialect = self.db.get_bind().dialect.name
+
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = insert(TransactionDailyRollup).values(bucket_date=bucket_date, updated_at=now, **deltas)
+            set_ = {
+                name: getattr(TransactionDailyRollup, name) + delta
+                for name, delta in deltas.items()
+            }
+            set_["updated_at"] = now
+            self.db.execute(stmt.on_conflict_do_update(index_elements=["bucket_date"], set_=set_))
+            return
+
+        # Other databases - update, or create the day's row
+        result = self.db.execute(
+            update(TransactionDailyRollup).where(
+                TransactionDailyRollup.bucket_date == bucket_date
+            ).values({
+                name: getattr(TransactionDailyRollup, name) + delta
+                for name, delta in deltas.items()
+            })
+        )
+        if result.rowcount == 0:
+            self.db.add(TransactionDailyRollup(bucket_date=bucket_date, **deltas))
+            self.db.flush()
+
+    # ============ Full recompute ============
+
+    def compute_stats(self) -> dict:
+        """
+        Compute all totals from the underlying tables.
+
+        Uses conditional aggregation so each table is scanned once.
+        """
+        customers_total, customers_approved = self.db.query(
+            func.count(Customer.id),
+            count_where(Customer.is_approved == True)
+        ).one()
+
+        merchants_total, merchants_approved = self.db.query(
+            func.count(Merchant.id),
+            count_where(Merchant.is_approved == True)
+        ).one()
+
+        statuses = list(STATUS_COLUMNS)
+        is_value = Transaction.status.in_(VALUE_STATUSES)
+        row = self.db.query(
+            func.count(Transaction.id),
+            *[count_where(Transaction.status == tx_status) for tx_status in statuses],
+            sum_where(is_value, Transaction.amount),
+            sum_where(is_value, Transaction.fee_amount)
+        ).one()
+
+        stats = {
+            "customers_total": customers_total,
+            "customers_approved": customers_approved,
+            "merchants_total": merchants_total,
+            "merchants_approved": merchants_approved,
+            "transactions_total": row[0],
+            "total_value": float(row[-2]),
+            "total_fees": float(row[-1]),
+        }
+        for tx_status, count in zip(statuses, row[1:-2]):
+            stats[STATUS_COLUMNS[tx_status]] = count
+
+        return stats
+
+    def rebuild_stats(self) -> PlatformStats:
+        """Overwrite the summary row with freshly computed totals (caller commits)"""
+        computed = self.compute_stats()
+
+        stats = self.db.get(PlatformStats, STATS_ID)
+        if stats is None:
+            stats = PlatformStats(id=STATS_ID)
+            self.db.add(stats)
+
+        for name, value in computed.items():
+            setattr(stats, name, value)
+        stats.reconciled_at = datetime.utcnow()
+        stats.updated_at = stats.reconciled_at
+
+        self.db.flush()
+        return stats
+
+    def ensure_stats(self) -> PlatformStats:
+        """Return the summary row, building it if it does not exist yet"""
+        stats = self.db.get(PlatformStats, STATS_ID)
+        if stats is None:
+            stats = self.rebuild_stats()
+        return stats
+
+    def reconcile(self) -> dict:
+        """
+        Recompute the summary from scratch, fix it, and report the drift.
+
+        Returns a dict of field -> {"stored", "actual"} for every field that
+        was wrong. Commits.
+        """
+        stored = self.db.get(PlatformStats, STATS_ID)
+        computed = self.compute_stats()
+
+        drift = {}
+        for name, actual in computed.items():
+            current = getattr(stored, name) if stored is not None else None
+            if current is None:
+                drift[name] = {"stored": None, "actual": actual}
+            elif name in AMOUNT_FIELDS:
+                if abs(current - actual) > AMOUNT_TOLERANCE:
+                    drift[name] = {"stored": current, "actual": actual}
+            elif current != actual:
+                drift[name] = {"stored": current, "actual": actual}
+
+        self.rebuild_stats()
+        self.db.commit()
+        return drift
+
+    # ============ Reads ============
+
+    def get_dashboard_stats(self, materialized: bool = True) -> dict:
+        """
+        Dashboard totals.
+
+        Reads the summary row. Falls back to a live single-scan computation
+        when the row is missing or materialized is False.
+        """
+        stats = self.db.get(PlatformStats, STATS_ID) if materialized else None
+        if stats is not None:
+            values = {name: getattr(stats, name) for name in COUNT_FIELDS + AMOUNT_FIELDS}
+        else:
+            values = self.compute_stats()
+        return self.format_dashboard(values)
+
+    @staticmethod
+    def format_dashboard(values: dict) -> dict:
+        """Shape a dict of summary fields as the admin dashboard response"""
+        return {
+            "customers": {
+                "total": values["customers_total"],
+                "approved": values["customers_approved"],
+                "pending": values["customers_total"] - values["customers_approved"]
+            },
+            "merchants": {
+                "total": values["merchants_total"],
+                "approved": values["merchants_approved"],
+                "pending": values["merchants_total"] - values["merchants_approved"]
+            },
+            "transactions": {
+                "total": values["transactions_total"],
+                "pending": values["transactions_pending"],
+                "approved": values["transactions_approved"],
+                "completed": values["transactions_completed"],
+                "total_value": round(values["total_value"] or 0, 2),
+                "total_fees": round(values["total_fees"] or 0, 2)
+            }
+        }
@@ -1,10 +1,13 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased, contains_eager
+from sqlalchemy import insert, update
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from app.models.transaction import Transaction, TransactionStatus
 from app.models.customer import Customer
 from app.models.merchant import Merchant
 from app.models.user import User
+from app.services.stats_service import StatsService
+from app.utils.pagination import paginate
 from app.utils.security import generate_reference_number
 from app.config import settings
 
@@ -42,6 +45,7 @@ class TransactionService:
         fee_amount, merchant_receives = Transaction.calculate_fee(amount, fee_percentage)
         
         # Create transaction
+        now = datetime.utcnow()
         transaction = Transaction(
             reference_number=generate_reference_number("TXN"),
             customer_id=customer_id,
@@ -53,15 +57,96 @@ class TransactionService:
             description=description,
             product_name=product_name,
             status=TransactionStatus.PENDING,
-            expires_at=datetime.utcnow() + timedelta(hours=24)  # Expires in 24 hours
+            created_at=now,
+            expires_at=now + timedelta(hours=24)  # Expires in 24 hours
         )
         
         self.db.add(transaction)
+        StatsService(self.db).record_transactions_created(created_at=now)
         self.db.commit()
         self.db.refresh(transaction)
         
         return transaction
     
+    def create_transactions_batch(self, merchant: Merchant, items: List[dict]) -> List[dict]:
+        """
+        Merchant creates many transaction requests at once.
+        
+        All customers are loaded with one IN query and all valid requests are
+        written with a single multi-row INSERT and one commit. Returns one result
+        per item, in order, with either the transaction values and customer name
+        or an error.
+        """
+        customer_ids = {item["customer_id"] for item in items}
+        customers = {
+            customer.id: (customer, full_name)
+            for customer, full_name in self.db.query(Customer, User.full_name).join(
+                User, User.id == Customer.user_id
+            ).filter(Customer.id.in_(customer_ids)).all()
+        } if customer_ids else {}
+        
+        fee_percentage = settings.TRANSACTION_FEE_PERCENTAGE
+        now = datetime.utcnow()
+        expires_at = now + timedelta(hours=24)  # Expires in 24 hours
+        
+        results = []
+        rows = []
+        for index, item in enumerate(items):
+            amount = item["amount"]
+            customer, full_name = customers.get(item["customer_id"], (None, None))
+            
+            error = None
+            if not customer:
+                error = "Customer not found"
+            elif not customer.is_approved:
+                error = "Customer account is not approved"
+            elif not customer.can_purchase(amount):
+                error = (
+                    f"Customer does not have enough available limit. "
+                    f"Available: {customer.available_limit}, Required: {amount}"
+                )
+            
+            if error:
+                results.append({"index": index, "success": False, "error": error})
+                continue
+            
+            fee_amount, merchant_receives = Transaction.calculate_fee(amount, fee_percentage)
+            row = {
+                "reference_number": generate_reference_number("TXN"),
+                "customer_id": customer.id,
+                "merchant_id": merchant.id,
+                "amount": amount,
+                "fee_percentage": fee_percentage,
+                "fee_amount": fee_amount,
+                "merchant_receives": merchant_receives,
+                "description": item.get("description"),
+                "product_name": item.get("product_name"),
+                "status": TransactionStatus.PENDING,
+                "created_at": now,
+                "expires_at": expires_at
+            }
+            rows.append(row)
+            results.append({
+                "index": index,
+                "success": True,
+                "transaction": row,
+                "customer_name": full_name
+            })
+        
+        if rows:
+            inserted = self.db.execute(
+                insert(Transaction).returning(Transaction.id, Transaction.reference_number),
+                rows
+            ).all()
+            StatsService(self.db).record_transactions_created(len(inserted), created_at=now)
+            self.db.commit()
+            
+            ids = {reference_number: id for id, reference_number in inserted}
+            for row in rows:
+                row["id"] = ids[row["reference_number"]]
+        
+        return results
+    
     def get_transaction_by_id(self, transaction_id: int) -> Optional[Transaction]:
         """Get transaction by ID"""
         return self.db.query(Transaction).filter(Transaction.id == transaction_id).first()
@@ -72,6 +157,27 @@ class TransactionService:
             Transaction.reference_number == reference_number
         ).first()
     
+    def get_transaction_with_names_by_reference(self, reference_number: str) -> Optional[tuple]:
+        """Get (transaction, customer name, merchant name) by reference number in one query"""
+        customer_user = aliased(User)
+        merchant_user = aliased(User)
+        
+        return self.db.query(
+            Transaction,
+            customer_user.full_name,
+            merchant_user.full_name
+        ).join(
+            Customer, Customer.id == Transaction.customer_id
+        ).join(
+            customer_user, customer_user.id == Customer.user_id
+        ).join(
+            Merchant, Merchant.id == Transaction.merchant_id
+        ).join(
+            merchant_user, merchant_user.id == Merchant.user_id
+        ).filter(
+            Transaction.reference_number == reference_number
+        ).first()
+    
     def approve_transaction(self, transaction: Transaction, customer: Customer) -> Transaction:
         """Customer approves a transaction"""
         if transaction.status != TransactionStatus.PENDING:
@@ -83,6 +189,11 @@ class TransactionService:
         # Check if transaction has expired
         if transaction.expires_at and transaction.expires_at < datetime.utcnow():
             transaction.status = TransactionStatus.EXPIRED
+            StatsService(self.db).record_transaction_status_change(
+                TransactionStatus.PENDING,
+                TransactionStatus.EXPIRED,
+                created_at=transaction.created_at
+            )
             self.db.commit()
             raise ValueError("Transaction has expired")
         
@@ -102,6 +213,13 @@ class TransactionService:
         # Update transaction status
         transaction.status = TransactionStatus.APPROVED
         transaction.approved_at = datetime.utcnow()
+        StatsService(self.db).record_transaction_status_change(
+            TransactionStatus.PENDING,
+            TransactionStatus.APPROVED,
+            amount=transaction.amount,
+            fee_amount=transaction.fee_amount,
+            created_at=transaction.created_at
+        )
         
         self.db.commit()
         self.db.refresh(transaction)
@@ -123,6 +241,11 @@ class TransactionService:
         
         transaction.status = TransactionStatus.REJECTED
         transaction.rejected_at = datetime.utcnow()
+        StatsService(self.db).record_transaction_status_change(
+            TransactionStatus.PENDING,
+            TransactionStatus.REJECTED,
+            created_at=transaction.created_at
+        )
         
         self.db.commit()
         self.db.refresh(transaction)
@@ -138,6 +261,11 @@ class TransactionService:
             raise ValueError("This transaction does not belong to you")
         
         transaction.status = TransactionStatus.CANCELLED
+        StatsService(self.db).record_transaction_status_change(
+            TransactionStatus.PENDING,
+            TransactionStatus.CANCELLED,
+            created_at=transaction.created_at
+        )
         
         self.db.commit()
         self.db.refresh(transaction)
@@ -157,6 +285,11 @@ class TransactionService:
         
         transaction.status = TransactionStatus.COMPLETED
         transaction.completed_at = datetime.utcnow()
+        StatsService(self.db).record_transaction_status_change(
+            TransactionStatus.APPROVED,
+            TransactionStatus.COMPLETED,
+            created_at=transaction.created_at
+        )
         
         self.db.commit()
         self.db.refresh(transaction)
@@ -167,31 +300,58 @@ class TransactionService:
         self, 
         customer_id: int, 
         status: Optional[TransactionStatus] = None,
-        limit: int = 50,
-        offset: int = 0
-    ) -> List[Transaction]:
-        """Get all transactions for a customer"""
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """Get a page of a customer's transactions, newest first, and the next page's cursor"""
         query = self.db.query(Transaction).filter(Transaction.customer_id == customer_id)
         
         if status:
             query = query.filter(Transaction.status == status)
         
-        return query.order_by(Transaction.created_at.desc()).offset(offset).limit(limit).all()
+        return paginate(
+            query, "customer_transactions", [Transaction.created_at, Transaction.id], limit, cursor
+        )
     
     def get_merchant_transactions(
         self, 
         merchant_id: int, 
         status: Optional[TransactionStatus] = None,
-        limit: int = 50,
-        offset: int = 0
-    ) -> List[Transaction]:
-        """Get all transactions for a merchant"""
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """Get a page of a merchant's transactions, newest first, and the next page's cursor"""
         query = self.db.query(Transaction).filter(Transaction.merchant_id == merchant_id)
         
         if status:
             query = query.filter(Transaction.status == status)
         
-        return query.order_by(Transaction.created_at.desc()).offset(offset).limit(limit).all()
+        return paginate(
+            query, "merchant_transactions", [Transaction.created_at, Transaction.id], limit, cursor
+        )
+    
+    def get_all_transactions(
+        self,
+        status: Optional[TransactionStatus] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        Get a page of all transactions, newest first, with the customer (and
+        their user) and merchant loaded by the same query, and the next page's
+        cursor (admin function)
+        """
+        query = self.db.query(Transaction).outerjoin(Transaction.customer).outerjoin(
+            Customer.user
+        ).outerjoin(Transaction.merchant).options(
+            contains_eager(Transaction.customer).contains_eager(Customer.user),
+            contains_eager(Transaction.merchant)
+        )
+        
+        if status:
+            query = query.filter(Transaction.status == status)
+        
+        return paginate(query, "transactions", [Transaction.created_at, Transaction.id], limit, cursor)
     
     def get_pending_transactions_for_customer(self, customer_id: int) -> List[Transaction]:
         """Get pending transactions waiting for customer approval"""
@@ -201,12 +361,53 @@ class TransactionService:
             Transaction.expires_at > datetime.utcnow()
         ).order_by(Transaction.created_at.desc()).all()
     
-    def expire_old_transactions(self) -> int:
-        """Expire transactions that have passed their expiry time"""
-        expired_count = self.db.query(Transaction).filter(
-            Transaction.status == TransactionStatus.PENDING,
-            Transaction.expires_at < datetime.utcnow()
-        ).update({"status": TransactionStatus.EXPIRED})
+    def expire_old_transactions(
+        self,
+        batch_size: int = 500,
+        max_batches: Optional[int] = None
+    ) -> int:
+        """Expire transactions that have passed their expiry time, in bounded batches"""
+        now = datetime.utcnow()
+        expired_count = 0
+        batches = 0
+        
+        while max_batches is None or batches < max_batches:
+            # Walks the (status, expires_at) index so each batch is a short range scan
+            ids = [row.id for row in self.db.query(Transaction.id).filter(
+                Transaction.status == TransactionStatus.PENDING,
+                Transaction.expires_at < now
+            ).order_by(Transaction.expires_at).limit(batch_size).all()]
+            
+            if not ids:
+                break
+            
+            # Re-check the status so rows approved since the select are left alone
+            created = self.db.execute(
+                update(Transaction).where(
+                    Transaction.id.in_(ids),
+                    Transaction.status == TransactionStatus.PENDING
+                ).values(status=TransactionStatus.EXPIRED).returning(Transaction.created_at),
+                execution_options={"synchronize_session": False}
+            ).scalars().all()
+            
+            # One stats update per creation day in the batch
+            days = {}
+            for created_at in created:
+                count, _ = days.get(created_at.date(), (0, created_at))
+                days[created_at.date()] = (count + 1, created_at)
+            for count, created_at in days.values():
+                StatsService(self.db).record_transaction_status_change(
+                    TransactionStatus.PENDING,
+                    TransactionStatus.EXPIRED,
+                    count=count,
+                    created_at=created_at
+                )
+            expired_count += len(created)
+            
+            self.db.commit()
+            batches += 1
+            
+            if len(ids) < batch_size:
+                break
         
-        self.db.commit()
         return expired_count
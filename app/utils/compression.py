@@ -0,0 +1,203 @@
+"""
+Response compression middleware.
+
+Compresses responses with the best coding the client accepts, out of
+brotli, zstd and gzip (brotli and zstd only when their packages are
+installed). Bodies sent in one message under minimum_size, responses that
+already have a Content-Encoding (the precompressed frontend) and
+non-text content types go out unchanged. Streamed responses are
+compressed chunk by chunk and flushed after each one, so CSV exports
+still reach the client as they are produced.
+
+Levels default by CPU count: hosts with one or two cores (PythonAnywhere
+workers) use cheaper levels, where most of the size win on repetitive
+JSON is already made.
+"""
+import os
+import zlib
+from typing import Dict, Optional
+from app.utils.static_files import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def available_codings() -> tuple:
+    """Codings this process can produce, in order of preference"""
+    codings = []
+    if brotli is not None:
+        codings.append("br")
+    if zstandard is not None:
+        codings.append("zstd")
+    codings.append("gzip")
+    return tuple(codings)
+
+
+def default_levels(cpu_count: Optional[int] = None) -> Dict[str, int]:
+    """Compression level per coding for a host with cpu_count cores"""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    if cpu_count <= 2:
+        return {"br": 4, "zstd": 3, "gzip": 5}
+    return {"br": 5, "zstd": 6, "gzip": 6}
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+COMPRESSORS = {"br": _BrotliCompressor, "zstd": _ZstdCompressor, "gzip": _GzipCompressor}
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, levels: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {**default_levels(), **(levels or {})}
+        self.codings = available_codings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accepted = accepted_encodings(value.decode("latin-1"))
+                coding = next((c for c in self.codings if c in accepted), None)
+                break
+
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressedResponder(self, coding, send).send)
+
+
+class _CompressedResponder:
+    """send() wrapper deciding per response whether to compress it"""
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send):
+        self.middleware = middleware
+        self.coding = coding
+        self.downstream = send
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            # Held until the first body message shows the size
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not self._should_compress(start, body, more_body):
+                self.passthrough = True
+                await self.downstream(start)
+                await self.downstream(message)
+                return
+
+            self.compressor = COMPRESSORS[self.coding](self.middleware.levels[self.coding])
+            headers = [
+                (name, value) for name, value in start["headers"]
+                if name not in (b"content-length", b"vary")
+            ]
+            vary = [value for name, value in start["headers"] if name == b"vary"]
+            headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+            headers.append((b"content-encoding", self.coding.encode("latin-1")))
+
+            if not more_body:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                await self.downstream({**start, "headers": headers})
+                await self.downstream({"type": "http.response.body", "body": body})
+                return
+
+            await self.downstream({**start, "headers": headers})
+
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        if more_body:
+            body = self.compressor.compress(body) + self.compressor.flush()
+        else:
+            body = self.compressor.compress(body) + self.compressor.finish()
+        await self.downstream({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _should_compress(self, start, body: bytes, more_body: bool) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        if not more_body and len(body) < self.middleware.minimum_size:
+            return False
+
+        content_type = b""
+        for name, value in start["headers"]:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.decode("latin-1").lower().startswith(COMPRESSIBLE_TYPES)
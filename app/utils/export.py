@@ -0,0 +1,85 @@
+"""
+Streaming CSV / JSON-lines export helpers.
+
+The writers turn an iterator of row dicts into an iterator of text chunks,
+so a response can be sent while rows are still being read from the
+database. Nothing holds more than one chunk of rows in memory.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Callable, Iterable, Iterator, List
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows written per chunk handed to the server
+CHUNK_ROWS = 500
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def iter_csv(rows: Iterable[dict], fieldnames: List[str]) -> Iterator[str]:
+    """CSV text with a header row, in chunks of CHUNK_ROWS rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+
+    count = 0
+    for row in rows:
+        writer.writerow({name: _plain(row.get(name)) for name in fieldnames})
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows: Iterable[dict], fieldnames: List[str]) -> Iterator[str]:
+    """One JSON object per line, in chunks of CHUNK_ROWS rows"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({name: _plain(row.get(name)) for name in fieldnames}, ensure_ascii=False))
+        if len(lines) == CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_export(fmt: str, rows: Iterable[dict], fieldnames: List[str]) -> Iterator[str]:
+    """Text chunks of rows in the given export format"""
+    if fmt == "csv":
+        return iter_csv(rows, fieldnames)
+    if fmt == "ndjson":
+        return iter_ndjson(rows, fieldnames)
+    raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+
+def rows_in_own_session(fetch: Callable[[Session], Iterable[dict]]) -> Iterator[dict]:
+    """
+    Yield the rows produced by fetch(db) using a session owned by the generator.
+
+    A streamed response outlives the request's get_db session, so the
+    generator opens its own and closes it when the stream ends or is aborted.
+    """
+    db = SessionLocal()
+    try:
+        yield from fetch(db)
+    finally:
+        db.close()
@@ -0,0 +1,11 @@
+"""
+Gunicorn worker class used by gunicorn.conf.py. Only gunicorn imports this
+module, so the app itself does not depend on gunicorn (unavailable on Windows).
+"""
+from uvicorn.workers import UvicornWorker
+
+
+class Worker(UvicornWorker):
+    """Uvicorn worker on uvloop and httptools (both installed by uvicorn[standard])"""
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
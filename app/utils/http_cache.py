@@ -0,0 +1,76 @@
+"""
+Conditional GET for per-user reads.
+
+A handler derives a weak ETag and Last-Modified from the updated_at of the
+rows behind its response, then calls not_modified() before building the
+body. When the client's If-None-Match (or, without one, If-Modified-Since)
+shows it already holds that version, the handler returns the 304 and skips
+loading and serializing the rest.
+
+Responses are private to the user and must be revalidated on every use.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(scope: str, *versions) -> str:
+    """Weak ETag for the response named scope built from rows at the given versions"""
+    digest = hashlib.blake2b(repr((scope,) + versions).encode("utf-8"), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    """Most recent of the timestamps that are set"""
+    known = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(known) if known else None
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of etag against an If-None-Match list"""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _unmodified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole-second precision
+    return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Put the validators (last_modified is naive UTC) and Cache-Control on the
+    handler's response, and return a 304 if the client's copy is current.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        current = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        current = bool(if_modified_since and last_modified and _unmodified_since(if_modified_since, last_modified))
+
+    if current:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,113 @@
+"""
+Monotonic, time-sortable reference numbers.
+
+A reference looks like TXN-01M5910VZZ80H5F000 where the 18 characters after
+the prefix are a fixed-width Crockford base32 encoding of:
+
+    48 bits  milliseconds since the Unix epoch
+    25 bits  node id (unique per running process)
+    15 bits  per-millisecond sequence
+
+References from one process are strictly increasing, and two processes never
+share a node id, so references are unique without a database round trip and
+sort in creation order.
+"""
+import os
+import socket
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Optional
+from app.config import settings
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32
+
+TIMESTAMP_BITS = 48
+NODE_BITS = 25
+SEQUENCE_BITS = 15
+
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+_ENCODED_LENGTH = (TIMESTAMP_BITS + NODE_BITS + SEQUENCE_BITS + 4) // 5  # 18 chars
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(_ENCODED_LENGTH):
+        chars.append(_ALPHABET[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def default_node_id() -> int:
+    """
+    Node id for this process.
+
+    Uses NODE_ID when configured (required when several hosts share a
+    database). Otherwise combines the process id, which is unique on a host
+    (Linux pid_max is at most 2**22), with a few bits of the host name.
+    """
+    if settings.NODE_ID is not None:
+        return settings.NODE_ID & MAX_NODE
+
+    host_bits = zlib.crc32(socket.gethostname().encode("utf-8")) & 0x7
+    return (host_bits << 22) | (os.getpid() & 0x3FFFFF)
+
+
+class ReferenceGenerator:
+    """Thread-safe generator of sortable reference numbers"""
+
+    def __init__(self, node_id: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._fixed_node_id = node_id
+        self._pid = None
+        self._node_id = 0
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next(self, prefix: str = "TXN") -> str:
+        """Return the next reference number"""
+        with self._lock:
+            pid = os.getpid()
+            if pid != self._pid:
+                # First call, or we are in a freshly forked worker
+                self._pid = pid
+                self._node_id = (
+                    self._fixed_node_id if self._fixed_node_id is not None else default_node_id()
+                )
+                self._sequence = 0
+
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms <= self._last_ms:
+                # Same millisecond, or the clock stepped back - keep counting from the last one
+                now_ms = self._last_ms
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    # Sequence exhausted - borrow the next millisecond
+                    now_ms += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+
+            value = (now_ms << (NODE_BITS + SEQUENCE_BITS)) | (self._node_id << SEQUENCE_BITS) | self._sequence
+
+        return f"{prefix}-{_encode(value)}"
+
+
+def reference_floor(moment: datetime, prefix: str = "TXN") -> str:
+    """
+    Smallest reference that can be generated at or after moment.
+
+    Use a pair of these as bounds to range-scan references in time order.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    ms = int(moment.timestamp() * 1000)
+    return f"{prefix}-{_encode(ms << (NODE_BITS + SEQUENCE_BITS))}"
+
+
+# Process-wide generator
+reference_generator = ReferenceGenerator()
@@ -0,0 +1,122 @@
+"""
+Routers and mounted apps imported on the first request under their prefix.
+
+Importing a router builds its Pydantic schemas and FastAPI dependency
+graphs, most of a worker's import time. LazyRouters registers nothing at
+startup; LazyRouterMiddleware imports and includes a router the first
+time a request path falls under it, before routing. The import runs in
+a worker thread so other requests keep being served meanwhile; only
+adding the already imported routes happens on the event loop. A failed
+import is retried by the next request. Generating the OpenAPI schema
+(/docs, /openapi.json) loads every router first.
+
+Routes are inserted where the routers would have been included, so
+routes registered after them (the SPA catch-all) still match last.
+
+LazyWSGIApp does the same for a mounted WSGI app such as the Flask admin.
+"""
+import importlib
+import threading
+from typing import Dict, Optional
+from a2wsgi import WSGIMiddleware
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+
+class LazyRouters:
+    def __init__(self, app: FastAPI, prefix: str, modules: Dict[str, str]):
+        """
+        modules maps the first path segment under prefix ("/auth") to the
+        module whose `router` serves it.
+        """
+        self.app = app
+        self.prefix = prefix
+        self.modules = dict(modules)
+        self._insert_at = len(app.router.routes)
+        self._lock = threading.Lock()
+
+        generate_openapi = app.openapi
+
+        def openapi():
+            self.load_all()
+            return generate_openapi()
+
+        app.openapi = openapi
+
+    def load(self, segment: str) -> None:
+        if segment not in self.modules:
+            return
+        with self._lock:
+            module = self.modules.get(segment)
+            if module is None:
+                return
+            router = importlib.import_module(module).router
+
+            routes = self.app.router.routes
+            before = len(routes)
+            self.app.include_router(router, prefix=self.prefix)
+            added = routes[before:]
+            del routes[before:]
+            routes[self._insert_at:self._insert_at] = added
+            self._insert_at += len(added)
+            # Only once it is routable; a failed import stays pending
+            del self.modules[segment]
+
+    def load_all(self) -> None:
+        for segment in list(self.modules):
+            self.load(segment)
+
+    def pending_segment(self, path: str) -> Optional[str]:
+        """Segment of path whose router is not loaded yet, if any"""
+        if not self.modules or not path.startswith(self.prefix + "/"):
+            return None
+        segment = "/" + path[len(self.prefix) + 1:].split("/", 1)[0]
+        return segment if segment in self.modules else None
+
+    async def load_for_path(self, path: str) -> None:
+        segment = self.pending_segment(path)
+        if segment is None:
+            return
+        module = self.modules.get(segment)
+        if module is not None:
+            await run_in_threadpool(importlib.import_module, module)
+        self.load(segment)
+
+
+class LazyRouterMiddleware:
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            await self.routers.load_for_path(scope["path"])
+        await self.app(scope, receive, send)
+
+
+class LazyWSGIApp:
+    """
+    ASGI app for app.mount() that imports a WSGI app ("module:attribute")
+    on its first request and runs it on a pool of `threads` threads.
+    """
+
+    def __init__(self, target: str, threads: int):
+        self.target = target
+        self.threads = threads
+        self._app = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    module, attribute = self.target.split(":")
+                    wsgi_app = getattr(importlib.import_module(module), attribute)
+                    self._app = WSGIMiddleware(wsgi_app, workers=self.threads)
+        return self._app
+
+    async def __call__(self, scope, receive, send):
+        app = self._app
+        if app is None:
+            app = await run_in_threadpool(self.load)
+        await app(scope, receive, send)
@@ -0,0 +1,55 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class Metrics:
+    """Thread-safe in-process counters and timing summaries"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timings: Dict[str, dict] = {}
+    
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add value to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+    
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration in seconds"""
+        with self._lock:
+            timing = self._timings.setdefault(
+                name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            )
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["last"] = seconds
+            if seconds > timing["max"]:
+                timing["max"] = seconds
+    
+    @contextmanager
+    def timer(self, name: str):
+        """Time the wrapped block and record it under name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+    
+    def snapshot(self) -> dict:
+        """Return a copy of all counters and timings"""
+        with self._lock:
+            timings = {}
+            for name, timing in self._timings.items():
+                timings[name] = dict(timing)
+                timings[name]["avg"] = timing["total"] / timing["count"] if timing["count"] else 0.0
+            return {
+                "counters": dict(self._counters),
+                "timings": timings
+            }
+
+
+# Process-wide registry
+metrics = Metrics()
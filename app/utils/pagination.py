@@ -0,0 +1,114 @@
+"""
+Keyset (cursor) pagination.
+
+A page is read with `WHERE (key1, key2) < (last1, last2) ORDER BY key1 DESC,
+key2 DESC LIMIT n`, so every page costs the same index range scan no matter
+how deep it is. The position of the last row is handed to the client as an
+opaque cursor signed with SECRET_KEY and bound to the listing it came from,
+so it cannot be forged or replayed against another listing.
+"""
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_EXACT_HEADER = "X-Total-Count-Exact"
+
+_SIGNATURE_BYTES = 16
+_DATETIME_TAG = "dt:"
+
+
+class InvalidCursor(ValueError):
+    """The cursor was tampered with, truncated or issued by another listing"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(scope: str, payload: bytes) -> bytes:
+    key = settings.SECRET_KEY.encode("utf-8")
+    return hmac.new(key, scope.encode("utf-8") + b"\0" + payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """Opaque cursor for the row whose sort key is values"""
+    plain = [_DATETIME_TAG + value.isoformat() if isinstance(value, datetime) else value for value in values]
+    payload = json.dumps(plain, separators=(",", ":")).encode("utf-8")
+    return f"{_b64encode(payload)}.{_b64encode(_sign(scope, payload))}"
+
+
+def decode_cursor(scope: str, cursor: str) -> List[Any]:
+    """Sort key values stored in a cursor issued for scope"""
+    try:
+        payload_text, signature_text = cursor.split(".", 1)
+        payload = _b64decode(payload_text)
+        signature = _b64decode(signature_text)
+    except ValueError:
+        raise InvalidCursor("Invalid cursor")
+
+    if not hmac.compare_digest(signature, _sign(scope, payload)):
+        raise InvalidCursor("Invalid cursor")
+
+    values = json.loads(payload)
+    return [
+        datetime.fromisoformat(value[len(_DATETIME_TAG):])
+        if isinstance(value, str) and value.startswith(_DATETIME_TAG) else value
+        for value in values
+    ]
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Page size bounded to 1..PAGE_SIZE_MAX, PAGE_SIZE_DEFAULT when not given"""
+    if not limit:
+        return settings.PAGE_SIZE_DEFAULT
+    return max(1, min(limit, settings.PAGE_SIZE_MAX))
+
+
+def paginate(
+    query: Query,
+    scope: str,
+    keys: Sequence,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    descending: bool = True
+) -> Tuple[list, Optional[str]]:
+    """
+    One page of query ordered by keys, and the cursor for the next page.
+
+    keys must end with a unique column (normally the primary key) so the
+    order is total. The next cursor is None on the last page. Raises
+    InvalidCursor for a bad cursor.
+    """
+    limit = clamp_page_size(limit)
+
+    if cursor:
+        values = decode_cursor(scope, cursor)
+        if len(values) != len(keys):
+            raise InvalidCursor("Invalid cursor")
+        if len(keys) == 1:
+            position, after = keys[0], values[0]
+        else:
+            position, after = tuple_(*keys), tuple_(*values)
+        query = query.filter(position < after if descending else position > after)
+
+    order = [key.desc() if descending else key.asc() for key in keys]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(scope, [getattr(rows[-1], key.key) for key in keys])
+
+    return rows, next_cursor
@@ -0,0 +1,72 @@
+"""
+Fast JSON responses.
+
+FastJSONResponse encodes with orjson when it is installed and is used as
+the app's default response class when FAST_JSON_RESPONSES is on.
+
+json_response serializes response models we built ourselves straight to
+JSON bytes with pydantic-core. Returning a Response from a handler skips
+FastAPI's re-validation of the value against response_model, which stays
+on the route for the OpenAPI schema.
+"""
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional
+    orjson = None
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+        ).encode("utf-8")
+
+
+def adapter_for(type_) -> TypeAdapter:
+    """TypeAdapter for a response type, built once"""
+    adapter = _adapters.get(type_)
+    if adapter is None:
+        adapter = _adapters[type_] = TypeAdapter(type_)
+    return adapter
+
+
+def json_response(type_, value, response: Optional[Response] = None, status_code: int = 200) -> Response:
+    """
+    value (already an instance of type_, e.g. a list of models) as JSON,
+    without validating it again. Headers set on the handler's injected
+    response (cursors, counts, cookies) are carried over.
+    """
+    result = Response(
+        adapter_for(type_).dump_json(value),
+        status_code=status_code,
+        media_type="application/json"
+    )
+    if response is not None:
+        # Raw pairs, so repeated headers such as Set-Cookie all survive
+        own = {name for name, _ in result.raw_headers}
+        result.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers if name not in own
+        )
+    return result
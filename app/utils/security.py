@@ -3,6 +3,7 @@ from typing import Optional, Union
 from jose import JWTError, jwt
 import bcrypt
 from app.config import settings
+from app.utils.ids import reference_generator
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -72,10 +73,5 @@ def decode_token(token: str) -> Optional[dict]:
 
 
 def generate_reference_number(prefix: str = "TXN") -> str:
-    """Generate a unique reference number for transactions"""
-    import uuid
-    import time
-    
-    timestamp = int(time.time() * 1000) % 100000000
-    unique_part = uuid.uuid4().hex[:6].upper()
-    return f"{prefix}-{timestamp}-{unique_part}"
+    """Generate a unique, time-sortable reference number for transactions"""
+    return reference_generator.next(prefix)
@@ -0,0 +1,147 @@
+"""
+In-memory serving of the built frontend (frontend/dist).
+
+The dist tree is read once at startup into a manifest of path -> file,
+with the bytes, an ETag and any compressed variants. Requests are
+answered from the manifest only: a path that is not a key in it is never
+joined onto the dist directory, so there is no filesystem access and no
+way to reach files outside dist.
+
+Files under assets/ carry a content hash in their name (Vite) and are
+cached for a year as immutable; everything else, index.html included, is
+revalidated with If-None-Match. Compressed variants come from .br/.gz
+files next to the original when the build made them, otherwise text
+files are gzipped the first time a client asks for gzip, keeping the
+work off the worker's startup path.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, Mapping, Optional
+from starlette.responses import Response
+
+HASHED_ASSETS_PREFIX = "assets/"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Smaller files are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Codings an Accept-Encoding header allows (q > 0)"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, content: bytes, media_type: str, cache_control: str):
+        self.content = content
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = f'"{hashlib.blake2b(content, digest_size=12).hexdigest()}"'
+        self.variants: Dict[str, bytes] = {}
+        self.gzip_on_demand = False
+
+    def response(self, headers: Mapping[str, str]) -> Response:
+        response_headers = {"Cache-Control": self.cache_control, "ETag": self.etag}
+        if self.variants or self.gzip_on_demand:
+            response_headers["Vary"] = "Accept-Encoding"
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or self.etag in if_none_match):
+            return Response(status_code=304, headers=response_headers)
+
+        content = self.content
+        if self.variants or self.gzip_on_demand:
+            accepted = accepted_encodings(headers.get("accept-encoding", ""))
+            if self.gzip_on_demand and "gzip" in accepted:
+                # Racing requests may both compress; either result is kept
+                self.variants["gzip"] = gzip.compress(self.content, compresslevel=9, mtime=0)
+                self.gzip_on_demand = False
+            for coding in ENCODINGS:
+                if coding in self.variants and coding in accepted:
+                    content = self.variants[coding]
+                    response_headers["Content-Encoding"] = coding
+                    break
+
+        return Response(content, media_type=self.media_type, headers=response_headers)
+
+
+class FrontendFiles:
+    """The built SPA, served from memory"""
+
+    def __init__(self, files: Dict[str, StaticFile], index: StaticFile):
+        self.files = files
+        self.index = index
+
+    @classmethod
+    def load(cls, root: str) -> "FrontendFiles":
+        """Read every file under root; raises FileNotFoundError without an index.html"""
+        contents: Dict[str, bytes] = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path, "rb") as f:
+                    contents[os.path.relpath(path, root).replace(os.sep, "/")] = f.read()
+
+        files = {}
+        for relpath, content in contents.items():
+            if any(relpath.endswith(suffix) and relpath[:-len(suffix)] in contents for suffix in ENCODINGS.values()):
+                continue  # A variant of another file
+
+            media_type = mimetypes.guess_type(relpath)[0] or "application/octet-stream"
+            if media_type == "application/javascript":
+                media_type += "; charset=utf-8"  # Response adds it to text/* itself
+            cache_control = IMMUTABLE_CACHE if relpath.startswith(HASHED_ASSETS_PREFIX) else REVALIDATE_CACHE
+            static_file = StaticFile(content, media_type, cache_control)
+
+            for coding, suffix in ENCODINGS.items():
+                if relpath + suffix in contents:
+                    static_file.variants[coding] = contents[relpath + suffix]
+            if (
+                "gzip" not in static_file.variants
+                and len(content) >= MIN_COMPRESS_SIZE
+                and media_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                static_file.gzip_on_demand = True
+
+            files[relpath] = static_file
+
+        if "index.html" not in files:
+            raise FileNotFoundError(os.path.join(root, "index.html"))
+        return cls(files, files["index.html"])
+
+    def lookup(self, path: str) -> Optional[StaticFile]:
+        """
+        The file for a request path. Missing hashed assets are None (404);
+        any other unknown path is a client-side route and gets index.html.
+        """
+        path = path.lstrip("/")
+        static_file = self.files.get(path)
+        if static_file is None and not path.startswith(HASHED_ASSETS_PREFIX):
+            return self.index
+        return static_file
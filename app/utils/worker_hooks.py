@@ -0,0 +1,35 @@
+"""
+Per-worker startup hooks, run by gunicorn.conf.py.
+
+Functions registered with @on_worker_start run in every worker after it
+forks and before it accepts a connection, so a freshly (re)started worker
+does not make its first requests wait for imports or a database connection.
+With PRELOAD_APP the hooks also run once in the master before forking, so
+the modules they import are shared by all workers; hooks must therefore be
+safe to run twice.
+"""
+import logging
+import time
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+_worker_start_hooks: List[Callable[[], None]] = []
+
+
+def on_worker_start(func: Callable[[], None]) -> Callable[[], None]:
+    """Register func to run in every worker before it serves requests"""
+    _worker_start_hooks.append(func)
+    return func
+
+
+def run_worker_start_hooks(log=logger) -> None:
+    """Run the registered hooks; one failing is logged and does not stop the worker"""
+    for hook in _worker_start_hooks:
+        started = time.perf_counter()
+        try:
+            hook()
+        except Exception:
+            log.exception("Worker start hook %s failed", hook.__name__)
+            continue
+        log.info("Worker start hook %s took %.0f ms", hook.__name__, (time.perf_counter() - started) * 1000)
@@ -0,0 +1,387 @@
+"""
+ASGI to WSGI bridge for hosts that only speak WSGI (PythonAnywhere).
+
+Each worker process runs one event loop in a background thread for its
+whole life. WSGI threads hand requests to it with run_coroutine_threadsafe
+and read the response back through a queue, so response bodies stream
+out as the app sends them. The loop starts on the first request, after
+any fork by the WSGI server, and runs the app's lifespan startup then;
+shutdown runs when the process exits.
+
+At most RESPONSE_QUEUE_SIZE body chunks wait for the client; send() blocks
+the app until the WSGI thread takes one, so a slow client holds back a
+streamed export instead of the worker buffering all of it. timeout bounds
+the app until it starts the response, and idle_timeout the wait for each
+chunk after that. A response that fails or stalls once started is aborted
+by raising from the body iterable, so the client sees a broken connection
+rather than a short body that looks complete.
+
+Request bodies up to BODY_CHUNK_SIZE are read before the app is called.
+Larger bodies are read one chunk per receive() call, so a worker holds at
+most one chunk of an upload at a time. Bodies whose Content-Length exceeds
+max_body_size are rejected with 413 without reading them.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import queue
+import threading
+from http import HTTPStatus
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATUS_LINES = {status.value: f"{status.value} {status.phrase}" for status in HTTPStatus}
+
+# Marks the end of a response in the message queue
+_END = object()
+
+# Request bodies larger than this are read from wsgi.input one chunk per receive()
+BODY_CHUNK_SIZE = 64 * 1024
+
+# Response body chunks the app may send ahead of the client
+RESPONSE_QUEUE_SIZE = 16
+
+
+def status_line(status: int) -> str:
+    return STATUS_LINES.get(status) or f"{status} Unknown"
+
+
+def build_scope(environ: dict, state: Optional[dict] = None) -> dict:
+    """ASGI http scope for a WSGI environ"""
+    headers = []
+    for key, value in environ.items():
+        if key.startswith('HTTP_'):
+            headers.append((key[5:].replace('_', '-').lower().encode('latin-1'), value.encode('latin-1')))
+        elif key == 'CONTENT_TYPE' and value:
+            headers.append((b'content-type', value.encode('latin-1')))
+        elif key == 'CONTENT_LENGTH' and value:
+            headers.append((b'content-length', value.encode('latin-1')))
+
+    try:
+        server_port = int(environ.get('SERVER_PORT', '80'))
+    except (ValueError, TypeError):
+        server_port = 80
+
+    # PEP 3333 hands PATH_INFO over as latin-1 decoded bytes
+    raw_path = environ.get('PATH_INFO', '/').encode('latin-1')
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0', 'spec_version': '2.3'},
+        'http_version': environ.get('SERVER_PROTOCOL', 'HTTP/1.1').split('/')[-1],
+        'method': environ['REQUEST_METHOD'],
+        'scheme': environ.get('wsgi.url_scheme', 'https'),
+        'path': raw_path.decode('utf-8', 'replace'),
+        'raw_path': raw_path,
+        'query_string': environ.get('QUERY_STRING', '').encode('latin-1'),
+        'root_path': environ.get('SCRIPT_NAME', ''),
+        'headers': headers,
+        'server': (environ.get('SERVER_NAME', 'localhost'), server_port),
+        'client': (environ.get('REMOTE_ADDR', ''), 0),
+    }
+    if state is not None:
+        scope['state'] = dict(state)
+    return scope
+
+
+class ResponseBody:
+    """
+    WSGI response iterable fed by the event loop.
+
+    Yields body chunks as the app sends them, freeing a slot in space for
+    each. Raises if the app fails or sends nothing for idle_timeout, so the
+    WSGI server aborts the response. close() (called by the WSGI server,
+    also when the client goes away) tells the app the client disconnected
+    and cancels it if it is still running.
+    """
+
+    def __init__(
+        self,
+        bridge: "ASGItoWSGI",
+        messages: queue.Queue,
+        space: asyncio.Semaphore,
+        future,
+        disconnected: asyncio.Event
+    ):
+        self.bridge = bridge
+        self.messages = messages
+        self.space = space
+        self.future = future
+        self.disconnected = disconnected
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            try:
+                message = self.messages.get(timeout=self.bridge.idle_timeout)
+            except queue.Empty:
+                raise TimeoutError(
+                    f"ASGI app sent no response data for {self.bridge.idle_timeout} s"
+                ) from None
+            if message is _END:
+                return
+            if isinstance(message, BaseException):
+                raise RuntimeError("ASGI app failed while streaming the response") from message
+            self.bridge.loop.call_soon_threadsafe(self.space.release)
+            if message:
+                yield message
+
+    def close(self) -> None:
+        self.bridge.loop.call_soon_threadsafe(self.disconnected.set)
+        if not self.future.done():
+            self.future.cancel()
+
+
+class RequestBody:
+    """
+    A request body handed to the app as http.request messages.
+
+    Either already read (stream is None) or read from stream BODY_CHUNK_SIZE
+    bytes at a time in the loop's executor, so a slow upload never blocks
+    the event loop.
+    """
+
+    def __init__(self, stream, remaining: int, data: Optional[bytes] = None):
+        self.stream = stream
+        self.remaining = remaining
+        self.data = data
+        self.complete = False
+
+    async def read(self) -> bytes:
+        if self.stream is None:
+            self.complete = True
+            return self.data
+        chunk = await asyncio.get_running_loop().run_in_executor(
+            None, self.stream.read, min(BODY_CHUNK_SIZE, self.remaining)
+        )
+        self.remaining -= len(chunk)
+        # A short read means the client sent less than its Content-Length
+        self.complete = self.remaining <= 0 or not chunk
+        return chunk
+
+
+class ASGItoWSGI:
+    """WSGI application running an ASGI app on a long-lived background event loop"""
+
+    def __init__(
+        self,
+        asgi_app,
+        timeout: float = 60.0,
+        lifespan: bool = True,
+        max_body_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None
+    ):
+        self.asgi_app = asgi_app
+        self.timeout = timeout
+        self.idle_timeout = timeout if idle_timeout is None else idle_timeout
+        self.max_body_size = max_body_size
+        self.lifespan = lifespan
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.state: dict = {}
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._lifespan_queue: Optional[asyncio.Queue] = None
+        self._lifespan_replies: Optional[asyncio.Queue] = None
+        self._lifespan_task: Optional[asyncio.Task] = None
+
+    # ---- event loop lifecycle ----
+
+    def start(self) -> None:
+        """Start the loop thread and run lifespan startup, once per process"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            # A loop inherited through fork has no thread behind it
+            self.loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self.loop.run_forever, name="asgi-bridge-loop", daemon=True)
+            thread.start()
+
+            if self.lifespan:
+                self.state = {}
+                self._lifespan_queue = None
+                try:
+                    asyncio.run_coroutine_threadsafe(self._lifespan_event('startup'), self.loop).result()
+                except BaseException:
+                    # The next request starts over with a new loop
+                    self.loop.call_soon_threadsafe(self.loop.stop)
+                    thread.join()
+                    self.loop.close()
+                    self.loop = None
+                    raise
+
+            self._pid = os.getpid()
+            atexit.register(self.close)
+
+    def close(self) -> None:
+        """Run lifespan shutdown and stop the loop"""
+        with self._lock:
+            if self._pid != os.getpid() or self.loop is None:
+                return
+            if self.lifespan:
+                try:
+                    asyncio.run_coroutine_threadsafe(
+                        self._lifespan_event('shutdown'), self.loop
+                    ).result(timeout=self.timeout)
+                except Exception:
+                    logger.exception("ASGI lifespan shutdown failed")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._pid = None
+
+    async def _lifespan_event(self, event: str) -> None:
+        """Send lifespan.startup or lifespan.shutdown and wait for the app's reply"""
+        if self._lifespan_queue is None:
+            self._lifespan_queue = asyncio.Queue()
+            replies: asyncio.Queue = asyncio.Queue()
+
+            async def send(message):
+                await replies.put(message)
+
+            async def run():
+                scope = {'type': 'lifespan', 'asgi': {'version': '3.0', 'spec_version': '2.0'}, 'state': self.state}
+                try:
+                    await self.asgi_app(scope, self._lifespan_queue.get, send)
+                except Exception:
+                    # Apps without lifespan support raise on the lifespan scope
+                    logger.info("ASGI app does not support lifespan events")
+                await replies.put(None)
+
+            self._lifespan_replies = replies
+            self._lifespan_task = asyncio.get_running_loop().create_task(run())
+
+        if self._lifespan_task.done():
+            return
+        await self._lifespan_queue.put({'type': f'lifespan.{event}'})
+        reply = await self._lifespan_replies.get()
+        if reply and reply['type'] == f'lifespan.{event}.failed':
+            raise RuntimeError(f"ASGI lifespan {event} failed: {reply.get('message', '')}")
+
+    # ---- requests ----
+
+    def __call__(self, environ, start_response):
+        self.start()
+
+        try:
+            content_length = max(int(environ.get('CONTENT_LENGTH') or 0), 0)
+        except ValueError:
+            content_length = 0
+        if self.max_body_size is not None and content_length > self.max_body_size:
+            error_body = b'{"detail":"Request body too large"}'
+            start_response(status_line(413), [
+                ('Content-Type', 'application/json'),
+                ('Content-Length', str(len(error_body)))
+            ])
+            return [error_body]
+
+        messages: queue.Queue = queue.Queue()
+        space = asyncio.Semaphore(RESPONSE_QUEUE_SIZE)
+        disconnected = asyncio.Event()
+        if content_length <= BODY_CHUNK_SIZE:
+            # Small bodies are read here rather than through the loop's executor
+            body = RequestBody(None, 0, environ['wsgi.input'].read(content_length) if content_length else b'')
+        else:
+            body = RequestBody(environ['wsgi.input'], content_length)
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._run(build_scope(environ, self.state), body, messages, space, disconnected),
+            self.loop
+        )
+
+        try:
+            start = messages.get(timeout=self.timeout + 5)
+        except queue.Empty:
+            future.cancel()
+            start = (504, [('Content-Type', 'text/plain')], b'Gateway Timeout')
+
+        if start is _END:
+            # _run sends a complete 500 for this; never unpack the end marker
+            start = (500, [('Content-Type', 'text/plain')], b'Internal Server Error')
+
+        if isinstance(start, BaseException):
+            error_body = f'Internal Server Error: {start}'.encode('utf-8')
+            start_response('500 Internal Server Error', [
+                ('Content-Type', 'text/plain'),
+                ('Content-Length', str(len(error_body)))
+            ])
+            return [error_body]
+
+        status, headers, first_chunk = start
+        start_response(status_line(status), headers)
+        if first_chunk is not None:
+            return [first_chunk]
+        return ResponseBody(self, messages, space, future, disconnected)
+
+    async def _run(
+        self,
+        scope: dict,
+        body: "RequestBody",
+        messages: queue.Queue,
+        space: asyncio.Semaphore,
+        disconnected: asyncio.Event
+    ) -> None:
+        """
+        Run the app for one request, putting (status, headers, None) then body
+        chunks and _END on messages. Each body chunk first takes a slot in
+        space. An error is put on messages as the exception, whether or not
+        the response has started; not starting it within timeout, or
+        returning without starting it, becomes a complete 504 or 500
+        (status, headers, body) entry.
+        """
+        started = False
+        finished = False
+        response_started = asyncio.Event()
+
+        async def receive():
+            if not body.complete:
+                chunk = await body.read()
+                return {'type': 'http.request', 'body': chunk, 'more_body': not body.complete}
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal started, finished
+            if message['type'] == 'http.response.start':
+                started = True
+                headers: List[Tuple[str, str]] = [
+                    (name.decode('latin-1'), value.decode('latin-1'))
+                    for name, value in message.get('headers', [])
+                ]
+                messages.put((message['status'], headers, None))
+                response_started.set()
+            elif message['type'] == 'http.response.body':
+                await space.acquire()
+                messages.put(message.get('body', b''))
+                if not message.get('more_body', False):
+                    finished = True
+                    messages.put(_END)
+
+        app = asyncio.ensure_future(self.asgi_app(scope, receive, send))
+        try:
+            # timeout only covers the app until it starts the response
+            waiter = asyncio.ensure_future(response_started.wait())
+            await asyncio.wait({app, waiter}, timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not started and not app.done():
+                messages.put((504, [('Content-Type', 'text/plain')], b'Gateway Timeout'))
+                return
+
+            try:
+                await app
+            except Exception as e:
+                if started:
+                    logger.exception("ASGI app failed while streaming a response")
+                messages.put(e)
+                return
+            if not started:
+                logger.error("ASGI app returned without starting a response")
+                messages.put((500, [('Content-Type', 'text/plain')], b'Internal Server Error'))
+                return
+            if not finished:
+                # Ends the stream if the app returned without a final body message
+                messages.put(_END)
+        finally:
+            if not app.done():
+                app.cancel()
@@ -0,0 +1,113 @@
+"""
+Profile a worker's cold start: imports, init_db, and time to first response.
+
+    imports       `python -X importtime -c "import app.main"`, the slowest
+                  modules by cumulative time
+    init_db       on a fresh database, then again against the stamped schema
+    first request a new interpreter imports app.main, wraps it in ASGItoWSGI
+                  (as pythonanywhere_wsgi does) and serves one request, with
+                  LAZY_ROUTERS on and off
+
+Each step runs in a fresh interpreter so nothing is already imported.
+
+Usage:
+    python benchmarks/cold_start.py [--path /api/v1/auth/me] [--repeat N] [--budget SECONDS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/api/v1/auth/me")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget", type=float, default=3.0, help="seconds allowed from spawn to first response")
+    parser.add_argument("--db", default="/tmp/bareq_cold_start.db")
+    return parser.parse_args()
+
+
+INIT_DB = """
+import time
+import app.models
+from app.database import init_db
+started = time.perf_counter()
+init_db()
+print(time.perf_counter() - started)
+"""
+
+FIRST_REQUEST = """
+import io, sys
+from app.main import app
+from app.utils.wsgi_bridge import ASGItoWSGI
+bridge = ASGItoWSGI(app)
+environ = {
+    "REQUEST_METHOD": "GET", "PATH_INFO": sys.argv[1], "QUERY_STRING": "", "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1", "wsgi.url_scheme": "http", "wsgi.input": io.BytesIO(),
+}
+status = []
+body = b"".join(bridge(environ, lambda line, headers, exc_info=None: status.append(line)))
+print(status[0])
+"""
+
+
+def run(code, env, *argv):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code, *argv], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return time.perf_counter() - started, result
+
+
+def import_report(env, top):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+
+    total = max(cumulative for cumulative, _, name in rows if name == "app.main")
+    print(f"import app.main: {total / 1000:.0f} ms cumulative")
+    print(f"  {'module':<48} {'self ms':>8} {'cumulative ms':>14}")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {name:<48} {self_us / 1000:>8.1f} {cumulative / 1000:>14.1f}")
+
+
+def main():
+    args = parse_args()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{args.db}", "SCHEDULER_ENABLED": "False"}
+
+    import_report(env, args.top)
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    print("\ninit_db")
+    for label in ("fresh database", "stamped schema"):
+        _, result = run(INIT_DB, env)
+        print(f"  {label:<16} {float(result.stdout) * 1000:>8.1f} ms")
+
+    print(f"\nspawn to first response, GET {args.path}, median of {args.repeat}")
+    for lazy in ("True", "False"):
+        timings = []
+        for _ in range(args.repeat):
+            elapsed, result = run(FIRST_REQUEST, {**env, "LAZY_ROUTERS": lazy}, args.path)
+            timings.append(elapsed)
+        median = statistics.median(timings)
+        verdict = "within" if median <= args.budget else "over"
+        print(f"  LAZY_ROUTERS={lazy:<5} {median * 1000:>8.0f} ms  {result.stdout.strip():<16} "
+              f"{verdict} the {args.budget:.1f} s budget")
+
+
+if __name__ == "__main__":
+    main()
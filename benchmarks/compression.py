@@ -0,0 +1,161 @@
+"""
+Benchmark response compression on representative API payloads.
+
+Builds one payload shaped like a real response from each router and
+serves it through CompressionMiddleware, once per coding. Reports bytes
+on the wire and p50/p95 request latency (in-process, no network) for:
+
+    merchant transactions  GET /merchants/me/transactions - 50 TransactionResponse rows
+    repayment plans        GET /repayments/plans - 10 plans with 12 installments each
+    admin customers        GET /admin/customers - 50 customer rows
+    admin merchants        GET /admin/merchants - 50 merchant rows
+    customer profile       GET /customers/me - one small object
+
+Usage:
+    python benchmarks/compression.py [--requests N]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Response  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from app.schemas.repayment import RepaymentPlanResponse, RepaymentScheduleResponse  # noqa: E402
+from app.schemas.transaction import TransactionResponse  # noqa: E402
+from app.utils.compression import CompressionMiddleware, available_codings, default_levels  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    return parser.parse_args()
+
+
+def payloads():
+    rng = random.Random(42)
+    now = datetime(2024, 6, 1, 12, 0)
+    statuses = ["pending", "approved", "completed", "rejected"]
+
+    transactions = [
+        TransactionResponse(
+            id=i,
+            reference_number=f"TXN{rng.randrange(10**15):015d}",
+            customer_id=rng.randrange(1, 20000),
+            merchant_id=42,
+            amount=round(rng.uniform(50, 5000), 2),
+            fee_percentage=0.5,
+            fee_amount=round(rng.uniform(0.25, 25), 2),
+            merchant_receives=round(rng.uniform(50, 5000), 2),
+            description="Purchase at store",
+            product_name=rng.choice(["Phone", "Laptop", "Headphones", "Sofa"]),
+            status=rng.choice(statuses),
+            created_at=now - timedelta(minutes=i * 37),
+            approved_at=now - timedelta(minutes=i * 37 - 5),
+            expires_at=now - timedelta(minutes=i * 37 - 1440),
+            customer_name=f"Customer {rng.randrange(20000)}",
+            merchant_name="Electronics Store",
+        ).model_dump(mode="json")
+        for i in range(50)
+    ]
+
+    plans = []
+    for i in range(10):
+        schedules = [
+            RepaymentScheduleResponse(
+                id=i * 12 + n,
+                installment_number=n + 1,
+                due_date=now + timedelta(days=30 * (n + 1)),
+                amount=250.0,
+                amount_paid=250.0 if n < 3 else 0.0,
+                status="paid" if n < 3 else "pending",
+                paid_at=now + timedelta(days=30 * n) if n < 3 else None,
+            )
+            for n in range(12)
+        ]
+        plans.append(RepaymentPlanResponse(
+            id=i, transaction_id=i, customer_id=7, total_amount=3000.0, number_of_months=12,
+            monthly_payment=250.0, total_paid=750.0, remaining_amount=2250.0, payments_made=3,
+            payments_remaining=9, status="pending", start_date=now, end_date=now + timedelta(days=360),
+            created_at=now, schedules=schedules, transaction_reference=f"TXN{i:015d}",
+        ).model_dump(mode="json"))
+
+    customers = [
+        {
+            "id": i, "user_id": i, "full_name": f"Customer {i}", "email": f"customer{i}@example.com",
+            "phone_number": f"05{rng.randrange(10**8):08d}", "national_id": f"{rng.randrange(10**10):010d}",
+            "city": rng.choice(["Riyadh", "Jeddah", "Dammam"]), "credit_limit": 5000.0,
+            "available_limit": round(rng.uniform(0, 5000), 2), "used_limit": round(rng.uniform(0, 5000), 2),
+            "is_approved": True, "created_at": (now - timedelta(days=i)).isoformat(),
+        }
+        for i in range(50)
+    ]
+
+    merchants = [
+        {
+            "id": i, "user_id": i, "business_name": f"Store {i}", "owner_name": f"Owner {i}",
+            "email": f"merchant{i}@example.com", "phone_number": f"05{rng.randrange(10**8):08d}",
+            "commercial_registration": f"{rng.randrange(10**10):010d}", "business_category": "Electronics",
+            "city": "Riyadh", "balance": round(rng.uniform(0, 100000), 2), "is_approved": True,
+            "created_at": (now - timedelta(days=i)).isoformat(),
+        }
+        for i in range(50)
+    ]
+
+    profile = {
+        "id": 7, "user_id": 7, "national_id": "1234567890", "credit_limit": 5000.0,
+        "available_limit": 2750.0, "used_limit": 2250.0, "city": "Riyadh", "is_approved": True,
+    }
+
+    return {
+        "merchant transactions": transactions,
+        "repayment plans": plans,
+        "admin customers": customers,
+        "admin merchants": merchants,
+        "customer profile": profile,
+    }
+
+
+def build_app(body: bytes) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/")
+    def payload():
+        return Response(body, media_type="application/json")
+
+    return app
+
+
+def main():
+    args = parse_args()
+    codings = ("identity",) + available_codings()
+    print(f"levels: {default_levels()} ({os.cpu_count()} CPUs), {args.requests} requests each")
+    print(f"{'payload':<22} {'coding':<9} {'bytes':>8} {'ratio':>6} {'p50 ms':>7} {'p95 ms':>7}")
+
+    for name, data in payloads().items():
+        body = json.dumps(data).encode()
+        client = TestClient(build_app(body))
+        for coding in codings:
+            headers = {"accept-encoding": coding}
+            size = int(client.get("/", headers=headers).headers["content-length"])
+            times = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                client.get("/", headers=headers)
+                times.append((time.perf_counter() - started) * 1000)
+            times.sort()
+            print(
+                f"{name:<22} {coding:<9} {size:>8} {len(body) / size:>6.1f} "
+                f"{statistics.median(times):>7.2f} {times[int(len(times) * 0.95)]:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmark the admin dashboard statistics queries.
+
+Seeds a throwaway SQLite database (1,000,000 transactions by default) and
+times three ways of producing the dashboard:
+
+    per-status   one COUNT/SUM query per figure (the original dashboard)
+    single-scan  StatsService.compute_stats - one conditional-aggregation
+                 statement per table
+    materialized StatsService.get_dashboard_stats - reads the platform_stats row
+
+Usage:
+    python benchmarks/dashboard_stats.py [--transactions N] [--db PATH] [--repeat N]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--merchants", type=int, default=2_000)
+    parser.add_argument("--db", default="/tmp/bareq_benchmark.db")
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+
+from sqlalchemy import func, insert  # noqa: E402
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.user import User, UserType  # noqa: E402
+from app.models.customer import Customer  # noqa: E402
+from app.models.merchant import Merchant  # noqa: E402
+from app.models.transaction import Transaction, TransactionStatus  # noqa: E402
+from app.services.stats_service import StatsService  # noqa: E402
+
+BATCH = 20_000
+
+
+def seed(db):
+    """Fill an empty database with users, customers, merchants and transactions"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    users = [
+        {
+            "email": f"user{i}@bench.local",
+            "phone_number": f"05{i:08d}",
+            "full_name": f"User {i}",
+            "hashed_password": "x",
+            "user_type": UserType.CUSTOMER if i < args.customers else UserType.MERCHANT,
+            "is_active": True,
+            "is_verified": True,
+        }
+        for i in range(args.customers + args.merchants)
+    ]
+    for start in range(0, len(users), BATCH):
+        db.execute(insert(User), users[start:start + BATCH])
+
+    db.execute(insert(Customer), [
+        {
+            "user_id": i + 1,
+            "national_id": f"1{i:09d}",
+            "credit_limit": 5000.0,
+            "available_limit": 5000.0,
+            "used_limit": 0.0,
+            "is_approved": rng.random() < 0.9,
+        }
+        for i in range(args.customers)
+    ])
+    db.execute(insert(Merchant), [
+        {
+            "user_id": args.customers + i + 1,
+            "business_name": f"Shop {i}",
+            "commercial_registration": f"CR{i:08d}",
+            "balance": 0.0,
+            "total_earnings": 0.0,
+            "total_fees_paid": 0.0,
+            "is_approved": rng.random() < 0.9,
+        }
+        for i in range(args.merchants)
+    ])
+
+    statuses = list(TransactionStatus)
+    weights = [10, 30, 10, 5, 40, 5]
+    for start in range(0, args.transactions, BATCH):
+        rows = []
+        for i in range(start, min(start + BATCH, args.transactions)):
+            amount = round(rng.uniform(50, 5000), 2)
+            fee_amount, merchant_receives = Transaction.calculate_fee(amount, 0.5)
+            created_at = now - timedelta(minutes=i)
+            rows.append({
+                "reference_number": f"BENCH-{i:010d}",
+                "customer_id": rng.randint(1, args.customers),
+                "merchant_id": rng.randint(1, args.merchants),
+                "amount": amount,
+                "fee_percentage": 0.5,
+                "fee_amount": fee_amount,
+                "merchant_receives": merchant_receives,
+                "status": rng.choices(statuses, weights)[0],
+                "created_at": created_at,
+                "expires_at": created_at + timedelta(hours=24),
+            })
+        db.execute(insert(Transaction), rows)
+        db.commit()
+        print(f"  seeded {start + len(rows):,} transactions", end="\r", flush=True)
+    print()
+
+    StatsService(db).rebuild_stats()
+    db.commit()
+
+
+def per_status(db) -> dict:
+    """The original dashboard: one query per figure"""
+    value_statuses = [TransactionStatus.APPROVED, TransactionStatus.COMPLETED]
+    return {
+        "customers_total": db.query(Customer).count(),
+        "customers_approved": db.query(Customer).filter(Customer.is_approved == True).count(),
+        "customers_pending": db.query(Customer).filter(Customer.is_approved == False).count(),
+        "merchants_total": db.query(Merchant).count(),
+        "merchants_approved": db.query(Merchant).filter(Merchant.is_approved == True).count(),
+        "merchants_pending": db.query(Merchant).filter(Merchant.is_approved == False).count(),
+        "transactions_total": db.query(Transaction).count(),
+        "transactions_pending": db.query(Transaction).filter(
+            Transaction.status == TransactionStatus.PENDING).count(),
+        "transactions_approved": db.query(Transaction).filter(
+            Transaction.status == TransactionStatus.APPROVED).count(),
+        "transactions_completed": db.query(Transaction).filter(
+            Transaction.status == TransactionStatus.COMPLETED).count(),
+        "total_value": db.query(func.sum(Transaction.amount)).filter(
+            Transaction.status.in_(value_statuses)).scalar() or 0,
+        "total_fees": db.query(func.sum(Transaction.fee_amount)).filter(
+            Transaction.status.in_(value_statuses)).scalar() or 0,
+    }
+
+
+def timed(label, func, db):
+    samples = []
+    result = None
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        result = func(db)
+        samples.append(time.perf_counter() - started)
+    print(f"{label:<14} median {statistics.median(samples) * 1000:9.2f} ms   best {min(samples) * 1000:9.2f} ms")
+    return statistics.median(samples), result
+
+
+def main():
+    init_db()
+    db = SessionLocal()
+    try:
+        existing = db.query(func.count(Transaction.id)).scalar()
+        if existing == 0:
+            print(f"Seeding {args.db} ...")
+            seed(db)
+        elif existing != args.transactions:
+            sys.exit(f"{args.db} holds {existing:,} transactions; delete it or pass --transactions {existing}")
+
+        print(f"{args.transactions:,} transactions, {args.customers:,} customers, "
+              f"{args.merchants:,} merchants, {args.repeat} runs each\n")
+
+        service = StatsService(db)
+        legacy_time, legacy = timed("per-status", per_status, db)
+        scan_time, scanned = timed("single-scan", lambda db: service.compute_stats(), db)
+        row_time, _ = timed("materialized", lambda db: service.get_dashboard_stats(), db)
+
+        for name in ("customers_total", "customers_approved", "merchants_total", "transactions_total",
+                     "transactions_pending", "transactions_approved", "transactions_completed"):
+            assert legacy[name] == scanned[name], (name, legacy[name], scanned[name])
+        assert abs(legacy["total_value"] - scanned["total_value"]) < 0.01
+        assert abs(legacy["total_fees"] - scanned["total_fees"]) < 0.01
+
+        print(f"\nsingle-scan is {legacy_time / scan_time:.1f}x faster than per-status")
+        print(f"materialized is {legacy_time / row_time:.0f}x faster than per-status")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark response serialization for the two heaviest read shapes.
+
+    transaction page  50 TransactionResponse rows (GET /merchants/me/transactions)
+    repayment plan    one RepaymentPlanResponse with 28 installments (GET /repayments/plans/{id})
+
+Each is taken from ORM-like rows to bytes on the wire three ways:
+
+    validated     build models with validation, then FastAPI re-validates them
+                  against response_model and encodes with json (the old path)
+    validated+fast  the same, encoded by FastJSONResponse (FAST_JSON_RESPONSES)
+    construct     model_construct + TypeAdapter.dump_json (json_response)
+
+The validated paths include one event-loop round trip, as in FastAPI.
+
+Usage:
+    python benchmarks/serialization.py [--repeat N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from app.models.repayment_plan import PaymentStatus  # noqa: E402
+from app.models.transaction import TransactionStatus  # noqa: E402
+from app.schemas.repayment import RepaymentPlanResponse  # noqa: E402
+from app.schemas.transaction import TransactionResponse  # noqa: E402
+from app.utils.responses import FastJSONResponse, json_response  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    return parser.parse_args()
+
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+TRANSACTIONS = [
+    SimpleNamespace(
+        id=i, reference_number=f"TXN{i:015d}", customer_id=1000 + i, merchant_id=42,
+        amount=1200.0 + i, fee_percentage=0.5, fee_amount=6.0, merchant_receives=1194.0 + i,
+        description="Purchase", product_name="Phone", status=TransactionStatus.APPROVED,
+        created_at=NOW - timedelta(hours=i), approved_at=NOW - timedelta(hours=i) + timedelta(minutes=3),
+        rejected_at=None, completed_at=None, expires_at=NOW - timedelta(hours=i) + timedelta(days=1),
+    )
+    for i in range(50)
+]
+
+PLAN = SimpleNamespace(
+    id=1, transaction_id=1, customer_id=7, total_amount=2800.0, number_of_months=28, monthly_payment=100.0,
+    total_paid=300.0, remaining_amount=2500.0, payments_made=3, payments_remaining=25,
+    status=PaymentStatus.PENDING, start_date=NOW, end_date=NOW + timedelta(days=28 * 30),
+    created_at=NOW, completed_at=None,
+    schedules=[
+        SimpleNamespace(
+            id=n, installment_number=n + 1, due_date=NOW + timedelta(days=30 * (n + 1)), amount=100.0,
+            amount_paid=100.0 if n < 3 else 0.0, status=PaymentStatus.PAID if n < 3 else PaymentStatus.PENDING,
+            paid_at=NOW + timedelta(days=30 * n) if n < 3 else None, payment_reference=None,
+        )
+        for n in range(28)
+    ],
+)
+
+
+def validated_transactions():
+    return [
+        TransactionResponse(**{**vars(tx), "status": tx.status.value}, customer_name="Customer")
+        for tx in TRANSACTIONS
+    ]
+
+
+def validated_plan():
+    fields = {**vars(PLAN), "status": PLAN.status.value, "transaction_reference": "TXN000000000000001"}
+    fields["schedules"] = [{**vars(s), "status": s.status.value} for s in PLAN.schedules]
+    return RepaymentPlanResponse(**fields)
+
+
+def through_fastapi(type_, build, response_class):
+    """What FastAPI does with a returned value and response_model=type_"""
+    field = create_response_field(name="response", type_=type_, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def run():
+        content = loop.run_until_complete(serialize_response(field=field, response_content=build()))
+        return response_class(content).body
+
+    return run
+
+
+def timed(func, repeat):
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = func()
+    return (time.perf_counter() - started) * 1e6 / repeat, len(body)
+
+
+def main():
+    args = parse_args()
+    cases = {
+        "transaction page": {
+            "validated": through_fastapi(List[TransactionResponse], validated_transactions, JSONResponse),
+            "validated+fast": through_fastapi(List[TransactionResponse], validated_transactions, FastJSONResponse),
+            "construct": lambda: json_response(List[TransactionResponse], [
+                TransactionResponse.from_transaction(tx, customer_name="Customer") for tx in TRANSACTIONS
+            ]).body,
+        },
+        "repayment plan": {
+            "validated": through_fastapi(RepaymentPlanResponse, validated_plan, JSONResponse),
+            "validated+fast": through_fastapi(RepaymentPlanResponse, validated_plan, FastJSONResponse),
+            "construct": lambda: json_response(
+                RepaymentPlanResponse, RepaymentPlanResponse.from_plan(PLAN, "TXN000000000000001")
+            ).body,
+        },
+    }
+
+    print(f"{'payload':<18} {'path':<16} {'us/response':>12} {'bytes':>7}")
+    for payload, paths in cases.items():
+        for path, func in paths.items():
+            micros, size = timed(func, args.repeat)
+            print(f"{payload:<18} {path:<16} {micros:>12.1f} {size:>7}")
+
+
+if __name__ == "__main__":
+    main()
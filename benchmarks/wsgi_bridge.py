@@ -0,0 +1,148 @@
+"""
+Benchmark the per-request overhead of the ASGI to WSGI bridges.
+
+Calls the FastAPI app's /health endpoint through each bridge directly as a
+WSGI callable (no server, no sockets), from one or more threads:
+
+    per-request  the previous pythonanywhere_wsgi adapter - a new event loop
+                 per request and a buffered body
+    persistent   app.utils.wsgi_bridge.ASGItoWSGI - one background loop
+    a2wsgi       a2wsgi.ASGIMiddleware
+
+Usage:
+    python benchmarks/wsgi_bridge.py [--requests N] [--threads N] [--path /health]
+"""
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--db", default="/tmp/bareq_benchmark.db")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+os.environ["SCHEDULER_ENABLED"] = "False"
+
+from a2wsgi import ASGIMiddleware  # noqa: E402
+from app.database import init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.utils.wsgi_bridge import ASGItoWSGI, build_scope  # noqa: E402
+
+
+class PerRequestLoopBridge:
+    """The previous adapter: a fresh event loop and a fully buffered body per request"""
+
+    def __init__(self, asgi_app):
+        self.asgi_app = asgi_app
+
+    def __call__(self, environ, start_response):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            scope = build_scope(environ)
+            content_length = int(environ.get('CONTENT_LENGTH') or 0)
+            body = environ['wsgi.input'].read(content_length) if content_length > 0 else b''
+            status_code = 500
+            response_headers = []
+            body_parts = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+
+            async def send(message):
+                nonlocal status_code, response_headers
+                if message['type'] == 'http.response.start':
+                    status_code = message['status']
+                    response_headers = [(k.decode(), v.decode()) for k, v in message.get('headers', [])]
+                elif message['type'] == 'http.response.body':
+                    body_parts.append(message.get('body', b''))
+
+            loop.run_until_complete(asyncio.wait_for(self.asgi_app(scope, receive, send), timeout=60.0))
+            status_phrases = {200: 'OK', 404: 'Not Found', 500: 'Internal Server Error'}
+            start_response(f"{status_code} {status_phrases.get(status_code, 'Unknown')}", response_headers)
+            return [b''.join(body_parts)]
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+
+def environ_for(path):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        'wsgi.version': (1, 0),
+    }
+
+
+def call(application, path):
+    statuses = []
+    result = application(environ_for(path), lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    assert statuses[0].startswith('200'), statuses[0]
+    return body
+
+
+def run(application, requests, threads, path):
+    """Seconds for `requests` calls spread over `threads` threads"""
+    started = time.perf_counter()
+    if threads == 1:
+        for _ in range(requests):
+            call(application, path)
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda _: call(application, path), range(requests)))
+    return time.perf_counter() - started
+
+
+def main():
+    init_db()
+    bridges = {
+        "per-request": PerRequestLoopBridge(app),
+        "persistent": ASGItoWSGI(app),
+        "a2wsgi": ASGIMiddleware(app),
+    }
+
+    print(f"{args.requests} x GET {args.path}, {args.threads} thread(s), best of {args.repeat}")
+    for name, application in bridges.items():
+        call(application, args.path)  # warm up
+        times = [run(application, args.requests, args.threads, args.path) for _ in range(args.repeat)]
+        best = min(times)
+        print(
+            f"  {name:<12} {best * 1e6 / args.requests:8.1f} us/request  "
+            f"{args.requests / best:8.0f} req/s  (median {statistics.median(times):.2f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request, session
+from flask import Flask, Response, g, jsonify, request, session, stream_with_context
 from flask_cors import CORS
 from functools import wraps
 import sys
@@ -10,26 +10,44 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.config import settings
 from app.database import SessionLocal
 from app.models.user import User, UserType
-from app.models.customer import Customer
-from app.models.merchant import Merchant
-from app.models.transaction import Transaction, TransactionStatus
 from app.models.repayment_plan import RepaymentPlan, RepaymentSchedule, PaymentStatus
+from app.services.admin_service import (
+    AdminService,
+    CUSTOMER_EXPORT_COLUMNS,
+    MERCHANT_EXPORT_COLUMNS,
+    parse_columns
+)
+from app.services.credit_limit_service import ADJUSTMENT_FILTERS, CreditLimitService
+from app.services.stats_service import StatsService
+from app.utils.export import EXPORT_FORMATS, iter_export, rows_in_own_session
+from app.utils.pagination import (
+    InvalidCursor,
+    NEXT_CURSOR_HEADER,
+    TOTAL_COUNT_HEADER,
+    TOTAL_COUNT_EXACT_HEADER
+)
 from app.utils.security import verify_password, create_access_token, decode_token, get_password_hash
 from datetime import datetime
 
 # Create Flask app
 flask_app = Flask(__name__)
 flask_app.secret_key = settings.FLASK_SECRET_KEY
-CORS(flask_app)
+CORS(flask_app, expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_EXACT_HEADER])
 
 
 def get_db():
-    """Get database session"""
-    db = SessionLocal()
-    try:
-        return db
-    finally:
-        pass  # Don't close here, will be handled by caller
+    """Database session for the current request, closed when the request ends"""
+    if 'db' not in g:
+        g.db = SessionLocal()
+    return g.db
+
+
+@flask_app.teardown_appcontext
+def close_db(exc):
+    """Roll back anything uncommitted and return the connection to the pool"""
+    db = g.pop('db', None)
+    if db is not None:
+        db.close()
 
 
 def require_admin(f):
@@ -48,10 +66,46 @@ def require_admin(f):
         if payload.get("user_type") != "admin":
             return jsonify({"error": "Admin access required"}), 403
         
+        g.admin_id = int(payload.get("sub", 0))
         return f(*args, **kwargs)
     return decorated_function
 
 
+def export_response(available, filename, fetch):
+    """Validate export query arguments and stream fetch(db, column_names, filters)"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Invalid format. Valid values: {list(EXPORT_FORMATS)}"}), 400
+    
+    try:
+        names = parse_columns(request.args.get('columns'), available)
+        filters = {}
+        is_approved = request.args.get('is_approved')
+        if is_approved is not None:
+            filters['is_approved'] = is_approved.lower() == 'true'
+        for name in ('created_from', 'created_to'):
+            if request.args.get(name):
+                filters[name] = datetime.fromisoformat(request.args[name])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    rows = rows_in_own_session(lambda db: fetch(db, names, filters))
+    
+    return Response(
+        stream_with_context(iter_export(fmt, rows, names)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
+
+
+def page_response(result, next_cursor):
+    """JSON list response with the next page cursor in the X-Next-Cursor header"""
+    response = jsonify(result)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+
 # ============ Admin Authentication ============
 
 @flask_app.route('/admin/login', methods=['POST'])
@@ -65,33 +119,30 @@ def admin_login():
         return jsonify({"error": "Email and password required"}), 400
     
     db = get_db()
-    try:
-        user = db.query(User).filter(
-            User.email == email,
-            User.user_type == UserType.ADMIN
-        ).first()
-        
-        if not user or not verify_password(password, user.hashed_password):
-            return jsonify({"error": "Invalid credentials"}), 401
-        
-        token_data = {
-            "sub": user.id,
+    user = db.query(User).filter(
+        User.email == email,
+        User.user_type == UserType.ADMIN
+    ).first()
+    
+    if not user or not verify_password(password, user.hashed_password):
+        return jsonify({"error": "Invalid credentials"}), 401
+    
+    token_data = {
+        "sub": str(user.id),
+        "email": user.email,
+        "user_type": "admin"
+    }
+    access_token = create_access_token(token_data)
+    
+    return jsonify({
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": {
+            "id": user.id,
             "email": user.email,
-            "user_type": "admin"
+            "full_name": user.full_name
         }
-        access_token = create_access_token(token_data)
-        
-        return jsonify({
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": {
-                "id": user.id,
-                "email": user.email,
-                "full_name": user.full_name
-            }
-        })
-    finally:
-        db.close()
+    })
 
 
 # ============ Dashboard ============
@@ -101,63 +152,8 @@ def admin_login():
 def dashboard():
     """Get admin dashboard statistics"""
     db = get_db()
-    try:
-        # Count statistics
-        total_customers = db.query(Customer).count()
-        approved_customers = db.query(Customer).filter(Customer.is_approved == True).count()
-        pending_customers = db.query(Customer).filter(Customer.is_approved == False).count()
-        
-        total_merchants = db.query(Merchant).count()
-        approved_merchants = db.query(Merchant).filter(Merchant.is_approved == True).count()
-        pending_merchants = db.query(Merchant).filter(Merchant.is_approved == False).count()
-        
-        total_transactions = db.query(Transaction).count()
-        pending_transactions = db.query(Transaction).filter(
-            Transaction.status == TransactionStatus.PENDING
-        ).count()
-        approved_transactions = db.query(Transaction).filter(
-            Transaction.status == TransactionStatus.APPROVED
-        ).count()
-        completed_transactions = db.query(Transaction).filter(
-            Transaction.status == TransactionStatus.COMPLETED
-        ).count()
-        
-        # Calculate total transaction value
-        from sqlalchemy import func
-        total_transaction_value = db.query(
-            func.sum(Transaction.amount)
-        ).filter(
-            Transaction.status.in_([TransactionStatus.APPROVED, TransactionStatus.COMPLETED])
-        ).scalar() or 0
-        
-        total_fees_collected = db.query(
-            func.sum(Transaction.fee_amount)
-        ).filter(
-            Transaction.status.in_([TransactionStatus.APPROVED, TransactionStatus.COMPLETED])
-        ).scalar() or 0
-        
-        return jsonify({
-            "customers": {
-                "total": total_customers,
-                "approved": approved_customers,
-                "pending": pending_customers
-            },
-            "merchants": {
-                "total": total_merchants,
-                "approved": approved_merchants,
-                "pending": pending_merchants
-            },
-            "transactions": {
-                "total": total_transactions,
-                "pending": pending_transactions,
-                "approved": approved_transactions,
-                "completed": completed_transactions,
-                "total_value": total_transaction_value,
-                "total_fees": total_fees_collected
-            }
-        })
-    finally:
-        db.close()
+    live = request.args.get('live', '').lower() == 'true'
+    return jsonify(StatsService(db).get_dashboard_stats(materialized=not live))
 
 
 # ============ Customer Management ============
@@ -165,97 +161,108 @@ def dashboard():
 @flask_app.route('/admin/customers', methods=['GET'])
 @require_admin
 def list_customers():
-    """List all customers"""
+    """List customers one page at a time, filtered and sorted on the server"""
     db = get_db()
     try:
+        filters = {}
         is_approved = request.args.get('is_approved')
-        
-        query = db.query(Customer)
         if is_approved is not None:
-            query = query.filter(Customer.is_approved == (is_approved.lower() == 'true'))
-        
-        customers = query.all()
-        
-        result = []
-        for customer in customers:
-            user = db.query(User).filter(User.id == customer.user_id).first()
-            result.append({
-                "id": customer.id,
-                "user_id": customer.user_id,
-                "full_name": user.full_name if user else None,
-                "email": user.email if user else None,
-                "phone_number": user.phone_number if user else None,
-                "national_id": customer.national_id,
-                "credit_limit": customer.credit_limit,
-                "available_limit": customer.available_limit,
-                "used_limit": customer.used_limit,
-                "is_approved": customer.is_approved,
-                "created_at": customer.created_at.isoformat() if customer.created_at else None
-            })
-        
-        return jsonify(result)
-    finally:
-        db.close()
+            filters['is_approved'] = is_approved.lower() == 'true'
+        for name in ('city', 'search'):
+            if request.args.get(name, '').strip():
+                filters[name] = request.args[name].strip()
+        for name in ('min_limit', 'max_limit', 'min_utilisation', 'max_utilisation'):
+            if request.args.get(name):
+                filters[name] = float(request.args[name])
+        for name in ('created_from', 'created_to'):
+            if request.args.get(name):
+                filters[name] = datetime.fromisoformat(request.args[name])
+        
+        service = AdminService(db)
+        customers, next_cursor = service.customer_page(
+            sort=request.args.get('sort', 'id'),
+            descending=request.args.get('order', 'asc') == 'desc',
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            **filters
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    response = page_response(customers, next_cursor)
+    if not request.args.get('cursor'):
+        total, exact = service.count_customers(**filters)
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+        response.headers[TOTAL_COUNT_EXACT_HEADER] = "true" if exact else "false"
+    return response
+
+
+@flask_app.route('/admin/customers/export', methods=['GET'])
+@require_admin
+def export_customers():
+    """Stream customers as CSV or JSON lines"""
+    city = request.args.get('city')
+    return export_response(
+        CUSTOMER_EXPORT_COLUMNS, "customers",
+        lambda db, names, filters: AdminService(db).iter_customers_export(names, city=city, **filters)
+    )
 
 
 @flask_app.route('/admin/customers/<int:customer_id>/approve', methods=['POST'])
 @require_admin
 def approve_customer(customer_id):
     """Approve a customer"""
-    db = get_db()
-    try:
-        customer = db.query(Customer).filter(Customer.id == customer_id).first()
-        
-        if not customer:
-            return jsonify({"error": "Customer not found"}), 404
-        
-        customer.is_approved = True
-        customer.approved_at = datetime.utcnow()
-        db.commit()
-        
-        return jsonify({"message": "Customer approved successfully"})
-    finally:
-        db.close()
+    if AdminService(get_db()).approve_customer(customer_id) is None:
+        return jsonify({"error": "Customer not found"}), 404
+    
+    return jsonify({"message": "Customer approved successfully"})
 
 
 @flask_app.route('/admin/customers/<int:customer_id>/credit-limit', methods=['PUT'])
 @require_admin
 def update_credit_limit(customer_id):
     """Update customer credit limit"""
+    data = request.get_json()
+    new_limit = data.get('credit_limit')
+    
+    if new_limit is None:
+        return jsonify({"error": "Invalid credit limit"}), 400
+    
+    try:
+        result = AdminService(get_db()).set_credit_limit(customer_id, new_limit, data.get('reason'), g.admin_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if result is None:
+        return jsonify({"error": "Customer not found"}), 404
+    
+    return jsonify(result)
+
+
+@flask_app.route('/admin/customers/credit-limits/adjust', methods=['POST'])
+@require_admin
+def adjust_credit_limits():
+    """Change many customers' credit limits by one rule, recording every change"""
     db = get_db()
+    data = request.get_json() or {}
+    filters = {name: data[name] for name in ADJUSTMENT_FILTERS if data.get(name) is not None}
+    
     try:
-        data = request.get_json()
-        new_limit = data.get('credit_limit')
-        
-        if new_limit is None or new_limit < 0:
-            return jsonify({"error": "Invalid credit limit"}), 400
-        
-        customer = db.query(Customer).filter(Customer.id == customer_id).first()
-        
-        if not customer:
-            return jsonify({"error": "Customer not found"}), 404
-        
-        old_limit = customer.credit_limit
-        difference = new_limit - old_limit
-        
-        customer.credit_limit = new_limit
-        customer.available_limit += difference
-        
-        if customer.available_limit > customer.credit_limit:
-            customer.available_limit = customer.credit_limit
-        if customer.available_limit < 0:
-            customer.available_limit = 0
-        
-        db.commit()
-        
-        return jsonify({
-            "message": "Credit limit updated",
-            "old_limit": old_limit,
-            "new_limit": new_limit,
-            "available_limit": customer.available_limit
-        })
-    finally:
-        db.close()
+        limits = {int(item['customer_id']): float(item['credit_limit']) for item in data.get('limits') or []}
+        summary = CreditLimitService(db).adjust(
+            data.get('rule'),
+            percent=data.get('percent'),
+            cap=data.get('cap'),
+            limits=limits,
+            filters=filters,
+            reason=data.get('reason'),
+            changed_by=g.admin_id,
+            batch_size=settings.CREDIT_LIMIT_BATCH_SIZE
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(summary)
 
 
 # ============ Merchant Management ============
@@ -263,58 +270,45 @@ def update_credit_limit(customer_id):
 @flask_app.route('/admin/merchants', methods=['GET'])
 @require_admin
 def list_merchants():
-    """List all merchants"""
-    db = get_db()
+    """List merchants one page at a time"""
+    is_approved = request.args.get('is_approved')
+    if is_approved is not None:
+        is_approved = is_approved.lower() == 'true'
+    
     try:
-        is_approved = request.args.get('is_approved')
-        
-        query = db.query(Merchant)
-        if is_approved is not None:
-            query = query.filter(Merchant.is_approved == (is_approved.lower() == 'true'))
-        
-        merchants = query.all()
-        
-        result = []
-        for merchant in merchants:
-            user = db.query(User).filter(User.id == merchant.user_id).first()
-            result.append({
-                "id": merchant.id,
-                "user_id": merchant.user_id,
-                "full_name": user.full_name if user else None,
-                "email": user.email if user else None,
-                "phone_number": user.phone_number if user else None,
-                "business_name": merchant.business_name,
-                "commercial_registration": merchant.commercial_registration,
-                "balance": merchant.balance,
-                "total_earnings": merchant.total_earnings,
-                "total_fees_paid": merchant.total_fees_paid,
-                "is_approved": merchant.is_approved,
-                "created_at": merchant.created_at.isoformat() if merchant.created_at else None
-            })
-        
-        return jsonify(result)
-    finally:
-        db.close()
+        merchants, next_cursor = AdminService(get_db()).merchant_page(
+            is_approved=is_approved,
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor')
+        )
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return page_response(merchants, next_cursor)
+
+
+@flask_app.route('/admin/merchants/export', methods=['GET'])
+@require_admin
+def export_merchants():
+    """Stream merchants as CSV or JSON lines"""
+    city = request.args.get('city')
+    business_category = request.args.get('business_category')
+    return export_response(
+        MERCHANT_EXPORT_COLUMNS, "merchants",
+        lambda db, names, filters: AdminService(db).iter_merchants_export(
+            names, city=city, business_category=business_category, **filters
+        )
+    )
 
 
 @flask_app.route('/admin/merchants/<int:merchant_id>/approve', methods=['POST'])
 @require_admin
 def approve_merchant(merchant_id):
     """Approve a merchant"""
-    db = get_db()
-    try:
-        merchant = db.query(Merchant).filter(Merchant.id == merchant_id).first()
-        
-        if not merchant:
-            return jsonify({"error": "Merchant not found"}), 404
-        
-        merchant.is_approved = True
-        merchant.approved_at = datetime.utcnow()
-        db.commit()
-        
-        return jsonify({"message": "Merchant approved successfully"})
-    finally:
-        db.close()
+    if AdminService(get_db()).approve_merchant(merchant_id) is None:
+        return jsonify({"error": "Merchant not found"}), 404
+    
+    return jsonify({"message": "Merchant approved successfully"})
 
 
 # ============ Transaction Management ============
@@ -322,45 +316,17 @@ def approve_merchant(merchant_id):
 @flask_app.route('/admin/transactions', methods=['GET'])
 @require_admin
 def list_transactions():
-    """List all transactions"""
-    db = get_db()
+    """List transactions newest first, one page at a time"""
     try:
-        status = request.args.get('status')
-        limit = int(request.args.get('limit', 50))
-        offset = int(request.args.get('offset', 0))
-        
-        query = db.query(Transaction)
-        if status:
-            try:
-                tx_status = TransactionStatus(status)
-                query = query.filter(Transaction.status == tx_status)
-            except ValueError:
-                pass
-        
-        transactions = query.order_by(Transaction.created_at.desc()).offset(offset).limit(limit).all()
-        
-        result = []
-        for tx in transactions:
-            customer = db.query(Customer).filter(Customer.id == tx.customer_id).first()
-            merchant = db.query(Merchant).filter(Merchant.id == tx.merchant_id).first()
-            customer_user = db.query(User).filter(User.id == customer.user_id).first() if customer else None
-            
-            result.append({
-                "id": tx.id,
-                "reference_number": tx.reference_number,
-                "customer_name": customer_user.full_name if customer_user else None,
-                "merchant_name": merchant.business_name if merchant else None,
-                "amount": tx.amount,
-                "fee_amount": tx.fee_amount,
-                "merchant_receives": tx.merchant_receives,
-                "status": tx.status.value,
-                "created_at": tx.created_at.isoformat() if tx.created_at else None,
-                "approved_at": tx.approved_at.isoformat() if tx.approved_at else None
-            })
-        
-        return jsonify(result)
-    finally:
-        db.close()
+        transactions, next_cursor = AdminService(get_db()).transaction_page(
+            status=request.args.get('status'),
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor')
+        )
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return page_response(transactions, next_cursor)
 
 
 # ============ Create Admin User ============
@@ -382,31 +348,28 @@ def create_admin():
         return jsonify({"error": "All fields required"}), 400
     
     db = get_db()
-    try:
-        existing = db.query(User).filter(User.email == email).first()
-        if existing:
-            return jsonify({"error": "Email already exists"}), 400
-        
-        admin = User(
-            email=email,
-            phone_number="0000000000",  # Placeholder
-            full_name=full_name,
-            hashed_password=get_password_hash(password),
-            user_type=UserType.ADMIN,
-            is_active=True,
-            is_verified=True
-        )
-        db.add(admin)
-        db.commit()
-        db.refresh(admin)
-        
-        return jsonify({
-            "message": "Admin created successfully",
-            "admin_id": admin.id,
-            "email": admin.email
-        }), 201
-    finally:
-        db.close()
+    existing = db.query(User).filter(User.email == email).first()
+    if existing:
+        return jsonify({"error": "Email already exists"}), 400
+    
+    admin = User(
+        email=email,
+        phone_number="0000000000",  # Placeholder
+        full_name=full_name,
+        hashed_password=get_password_hash(password),
+        user_type=UserType.ADMIN,
+        is_active=True,
+        is_verified=True
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    
+    return jsonify({
+        "message": "Admin created successfully",
+        "admin_id": admin.id,
+        "email": admin.email
+    }), 201
 
 
 @flask_app.route('/')
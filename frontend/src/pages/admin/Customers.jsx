@@ -6,11 +6,38 @@ import {
   FaFilter, FaUser, FaPhone, FaEnvelope, FaWallet
 } from 'react-icons/fa'
 
+const EMPTY_FILTERS = {
+  city: '',
+  min_limit: '',
+  max_limit: '',
+  min_utilisation: '',
+  max_utilisation: '',
+  created_from: '',
+  created_to: '',
+}
+
+const SORT_OPTIONS = [
+  { value: 'created_at:desc', label: 'الأحدث تسجيلاً' },
+  { value: 'created_at:asc', label: 'الأقدم تسجيلاً' },
+  { value: 'credit_limit:desc', label: 'الحد الائتماني: الأعلى' },
+  { value: 'credit_limit:asc', label: 'الحد الائتماني: الأقل' },
+  { value: 'available_limit:desc', label: 'المتاح: الأعلى' },
+  { value: 'available_limit:asc', label: 'المتاح: الأقل' },
+]
+
 const AdminCustomers = () => {
   const [loading, setLoading] = useState(true)
   const [customers, setCustomers] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [total, setTotal] = useState(null)
   const [statusFilter, setStatusFilter] = useState('all')
   const [searchQuery, setSearchQuery] = useState('')
+  const [search, setSearch] = useState('')
+  const [sort, setSort] = useState('created_at:desc')
+  const [showFilters, setShowFilters] = useState(false)
+  const [draftFilters, setDraftFilters] = useState(EMPTY_FILTERS)
+  const [filters, setFilters] = useState(EMPTY_FILTERS)
   const [selectedCustomer, setSelectedCustomer] = useState(null)
   const [showApproveModal, setShowApproveModal] = useState(false)
   const [showRejectModal, setShowRejectModal] = useState(false)
@@ -19,15 +46,36 @@ const AdminCustomers = () => {
   const [rejectReason, setRejectReason] = useState('')
   const [actionLoading, setActionLoading] = useState(false)
   
+  // Search as the admin types, without a request per keystroke
+  useEffect(() => {
+    const timer = setTimeout(() => setSearch(searchQuery.trim()), 300)
+    return () => clearTimeout(timer)
+  }, [searchQuery])
+  
   useEffect(() => {
     loadCustomers()
-  }, [statusFilter])
+  }, [statusFilter, search, sort, filters])
+  
+  const buildQuery = () => {
+    const [sortKey, order] = sort.split(':')
+    const percent = (value) => (value === '' ? '' : parseFloat(value) / 100)
+    return {
+      ...filters,
+      min_utilisation: percent(filters.min_utilisation),
+      max_utilisation: percent(filters.max_utilisation),
+      is_approved: statusFilter === 'all' ? null : statusFilter === 'approved',
+      search,
+      sort: sortKey,
+      order,
+    }
+  }
   
   const loadCustomers = async () => {
     try {
-      const status = statusFilter === 'all' ? null : statusFilter
-      const data = await adminAPI.getCustomers(status)
+      const data = await adminAPI.getCustomers(buildQuery())
       setCustomers(data)
+      setNextCursor(data.nextCursor)
+      setTotal(data.totalCount !== undefined ? { count: data.totalCount, exact: data.totalExact } : null)
     } catch (error) {
       toast.error('خطأ في تحميل العملاء')
     } finally {
@@ -35,6 +83,30 @@ const AdminCustomers = () => {
     }
   }
   
+  const loadMore = async () => {
+    if (!nextCursor) return
+    
+    setLoadingMore(true)
+    try {
+      const data = await adminAPI.getCustomers(buildQuery(), nextCursor)
+      setCustomers(prev => [...prev, ...data])
+      setNextCursor(data.nextCursor)
+    } catch (error) {
+      toast.error('خطأ في تحميل العملاء')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+  
+  const updateDraft = (key, value) => {
+    setDraftFilters(prev => ({ ...prev, [key]: value }))
+  }
+  
+  const resetFilters = () => {
+    setDraftFilters(EMPTY_FILTERS)
+    setFilters(EMPTY_FILTERS)
+  }
+  
   const handleApprove = async () => {
     if (!selectedCustomer || !creditLimit) return
     
@@ -100,17 +172,6 @@ const AdminCustomers = () => {
     return new Date(date).toLocaleDateString('ar-SA')
   }
   
-  const filteredCustomers = customers.filter(c => {
-    if (!searchQuery) return true
-    const query = searchQuery.toLowerCase()
-    return (
-      c.full_name?.toLowerCase().includes(query) ||
-      c.email?.toLowerCase().includes(query) ||
-      c.phone_number?.includes(query) ||
-      c.national_id?.includes(query)
-    )
-  })
-  
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -129,7 +190,8 @@ const AdminCustomers = () => {
             type="text"
             value={searchQuery}
             onChange={(e) => setSearchQuery(e.target.value)}
-            placeholder="بحث بالاسم أو البريد أو الهاتف..."
+            placeholder="بحث ببداية الاسم أو الهاتف أو رقم الهوية (يميز حالة الأحرف)..."
+            title="يطابق بداية القيمة ويميز بين الأحرف الكبيرة والصغيرة"
             className="w-full pr-10 pl-4 py-3 border border-gray-300 rounded-lg"
           />
         </div>
@@ -145,9 +207,117 @@ const AdminCustomers = () => {
             <option value="pending">في الانتظار</option>
             <option value="approved">موافق عليهم</option>
           </select>
+          <select
+            value={sort}
+            onChange={(e) => setSort(e.target.value)}
+            className="px-4 py-3 border border-gray-300 rounded-lg"
+          >
+            {SORT_OPTIONS.map(option => (
+              <option key={option.value} value={option.value}>{option.label}</option>
+            ))}
+          </select>
+          <button
+            onClick={() => setShowFilters(!showFilters)}
+            className="px-4 py-3 border border-gray-300 rounded-lg text-gray-700 hover:bg-gray-50"
+          >
+            تصفية متقدمة
+          </button>
         </div>
       </div>
       
+      {showFilters && (
+        <div className="bg-white rounded-xl shadow-sm p-4 space-y-4">
+          <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
+            <div>
+              <label className="block text-sm text-gray-600 mb-1">المدينة</label>
+              <input
+                type="text"
+                value={draftFilters.city}
+                onChange={(e) => updateDraft('city', e.target.value)}
+                className="w-full px-3 py-2 border border-gray-300 rounded-lg"
+              />
+            </div>
+            <div>
+              <label className="block text-sm text-gray-600 mb-1">الحد الائتماني (من - إلى)</label>
+              <div className="flex gap-2">
+                <input
+                  type="number"
+                  min="0"
+                  value={draftFilters.min_limit}
+                  onChange={(e) => updateDraft('min_limit', e.target.value)}
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg"
+                />
+                <input
+                  type="number"
+                  min="0"
+                  value={draftFilters.max_limit}
+                  onChange={(e) => updateDraft('max_limit', e.target.value)}
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg"
+                />
+              </div>
+            </div>
+            <div>
+              <label className="block text-sm text-gray-600 mb-1">نسبة الاستخدام % (من - إلى)</label>
+              <div className="flex gap-2">
+                <input
+                  type="number"
+                  min="0"
+                  max="100"
+                  value={draftFilters.min_utilisation}
+                  onChange={(e) => updateDraft('min_utilisation', e.target.value)}
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg"
+                />
+                <input
+                  type="number"
+                  min="0"
+                  max="100"
+                  value={draftFilters.max_utilisation}
+                  onChange={(e) => updateDraft('max_utilisation', e.target.value)}
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg"
+                />
+              </div>
+            </div>
+            <div>
+              <label className="block text-sm text-gray-600 mb-1">تاريخ التسجيل (من - إلى)</label>
+              <div className="flex gap-2">
+                <input
+                  type="date"
+                  value={draftFilters.created_from}
+                  onChange={(e) => updateDraft('created_from', e.target.value)}
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg"
+                />
+                <input
+                  type="date"
+                  value={draftFilters.created_to}
+                  onChange={(e) => updateDraft('created_to', e.target.value)}
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg"
+                />
+              </div>
+            </div>
+          </div>
+          <div className="flex gap-2">
+            <button
+              onClick={() => setFilters(draftFilters)}
+              className="px-4 py-2 bg-primary-600 text-white rounded-lg hover:bg-primary-700"
+            >
+              تطبيق
+            </button>
+            <button
+              onClick={resetFilters}
+              className="px-4 py-2 border border-gray-300 rounded-lg text-gray-700 hover:bg-gray-50"
+            >
+              إعادة تعيين
+            </button>
+          </div>
+        </div>
+      )}
+      
+      {total && (
+        <p className="text-sm text-gray-500">
+          عدد العملاء: {total.count}{total.exact ? '' : '+'}
+        </p>
+      )}
+      
       {/* Table */}
       <div className="bg-white rounded-xl shadow-sm overflow-hidden">
         <div className="overflow-x-auto">
@@ -163,14 +333,14 @@ const AdminCustomers = () => {
               </tr>
             </thead>
             <tbody className="divide-y">
-              {filteredCustomers.length === 0 ? (
+              {customers.length === 0 ? (
                 <tr>
                   <td colSpan={6} className="text-center py-8 text-gray-500">
                     لا يوجد عملاء
                   </td>
                 </tr>
               ) : (
-                filteredCustomers.map(customer => (
+                customers.map(customer => (
                   <tr key={customer.id} className="hover:bg-gray-50">
                     <td className="py-4 px-6">
                       <div className="flex items-center gap-3">
@@ -250,6 +420,19 @@ const AdminCustomers = () => {
         </div>
       </div>
       
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-6 py-2 bg-white border rounded-lg text-gray-700 hover:bg-gray-50 disabled:opacity-50 flex items-center gap-2"
+          >
+            {loadingMore && <FaSpinner className="animate-spin" />}
+            تحميل المزيد
+          </button>
+        </div>
+      )}
+      
       {/* Approve Modal */}
       {showApproveModal && selectedCustomer && (
         <div className="fixed inset-0 bg-black/50 flex items-center justify-center z-50 p-4">
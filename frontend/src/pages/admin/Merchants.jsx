@@ -9,6 +9,8 @@ import {
 const AdminMerchants = () => {
   const [loading, setLoading] = useState(true)
   const [merchants, setMerchants] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [statusFilter, setStatusFilter] = useState('all')
   const [searchQuery, setSearchQuery] = useState('')
   const [selectedMerchant, setSelectedMerchant] = useState(null)
@@ -26,6 +28,7 @@ const AdminMerchants = () => {
       const status = statusFilter === 'all' ? null : statusFilter
       const data = await adminAPI.getMerchants(status)
       setMerchants(data)
+      setNextCursor(data.nextCursor)
     } catch (error) {
       toast.error('خطأ في تحميل التجار')
     } finally {
@@ -33,6 +36,22 @@ const AdminMerchants = () => {
     }
   }
   
+  const loadMore = async () => {
+    if (!nextCursor) return
+    
+    setLoadingMore(true)
+    try {
+      const status = statusFilter === 'all' ? null : statusFilter
+      const data = await adminAPI.getMerchants(status, nextCursor)
+      setMerchants(prev => [...prev, ...data])
+      setNextCursor(data.nextCursor)
+    } catch (error) {
+      toast.error('خطأ في تحميل التجار')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+  
   const handleApprove = async () => {
     if (!selectedMerchant) return
     
@@ -220,6 +239,19 @@ const AdminMerchants = () => {
         </div>
       )}
       
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-6 py-2 bg-white border rounded-lg text-gray-700 hover:bg-gray-50 disabled:opacity-50 flex items-center gap-2"
+          >
+            {loadingMore && <FaSpinner className="animate-spin" />}
+            تحميل المزيد
+          </button>
+        </div>
+      )}
+      
       {/* Approve Modal */}
       {showApproveModal && selectedMerchant && (
         <div className="fixed inset-0 bg-black/50 flex items-center justify-center z-50 p-4">
@@ -9,6 +9,8 @@ import {
 const AdminTransactions = () => {
   const [loading, setLoading] = useState(true)
   const [transactions, setTransactions] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [statusFilter, setStatusFilter] = useState('all')
   const [searchQuery, setSearchQuery] = useState('')
   
@@ -21,6 +23,7 @@ const AdminTransactions = () => {
       const status = statusFilter === 'all' ? null : statusFilter
       const data = await adminAPI.getTransactions(status)
       setTransactions(data)
+      setNextCursor(data.nextCursor)
     } catch (error) {
       toast.error('خطأ في تحميل المعاملات')
     } finally {
@@ -28,6 +31,22 @@ const AdminTransactions = () => {
     }
   }
   
+  const loadMore = async () => {
+    if (!nextCursor) return
+    
+    setLoadingMore(true)
+    try {
+      const status = statusFilter === 'all' ? null : statusFilter
+      const data = await adminAPI.getTransactions(status, nextCursor)
+      setTransactions(prev => [...prev, ...data])
+      setNextCursor(data.nextCursor)
+    } catch (error) {
+      toast.error('خطأ في تحميل المعاملات')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+  
   const formatCurrency = (amount) => {
     return new Intl.NumberFormat('ar-SA', {
       style: 'currency',
@@ -224,6 +243,19 @@ const AdminTransactions = () => {
           </table>
         </div>
       </div>
+      
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-6 py-2 bg-white border rounded-lg text-gray-700 hover:bg-gray-50 disabled:opacity-50 flex items-center gap-2"
+          >
+            {loadingMore && <FaSpinner className="animate-spin" />}
+            تحميل المزيد
+          </button>
+        </div>
+      )}
     </div>
   )
 }
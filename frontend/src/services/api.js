@@ -25,6 +25,13 @@ api.interceptors.request.use(
   }
 )
 
+// Paged listings return an array body and the next page's cursor in a header
+const withNextCursor = (response) => {
+  const data = response.data
+  data.nextCursor = response.headers['x-next-cursor'] || null
+  return data
+}
+
 // Response interceptor to handle errors
 api.interceptors.response.use(
   (response) => response,
@@ -93,9 +100,10 @@ export const customerAPI = {
     return response.data
   },
   
-  getTransactionHistory: async () => {
-    const response = await api.get('/customers/me/transactions/history')
-    return response.data
+  getTransactionHistory: async (cursor = null) => {
+    const params = cursor ? { cursor } : {}
+    const response = await api.get('/customers/me/transactions/history', { params })
+    return withNextCursor(response)
   },
   
   approveTransaction: async (transactionId, numberOfMonths) => {
@@ -184,10 +192,11 @@ export const merchantAPI = {
     return response.data
   },
   
-  getTransactions: async (status = null) => {
+  getTransactions: async (status = null, cursor = null) => {
     const params = status ? { status } : {}
+    if (cursor) params.cursor = cursor
     const response = await api.get('/merchants/me/transactions', { params })
-    return response.data
+    return withNextCursor(response)
   },
   
   getPaymentRequests: async () => {
@@ -233,12 +242,22 @@ export const adminAPI = {
     return response.data
   },
   
-  getCustomers: async (status = null) => {
+  // filters: is_approved, city, min_limit, max_limit, min_utilisation,
+  // max_utilisation, created_from, created_to, search, sort, order
+  getCustomers: async (filters = {}, cursor = null) => {
     const token = localStorage.getItem('token')
     const params = { authorization: `Bearer ${token}` }
-    if (status) params.status = status
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== null && value !== undefined && value !== '') params[key] = value
+    })
+    if (cursor) params.cursor = cursor
     const response = await api.get('/admin/customers', { params })
-    return response.data
+    const data = withNextCursor(response)
+    if (response.headers['x-total-count'] !== undefined) {
+      data.totalCount = parseInt(response.headers['x-total-count'], 10)
+      data.totalExact = response.headers['x-total-count-exact'] === 'true'
+    }
+    return data
   },
   
   approveCustomer: async (customerId, creditLimit) => {
@@ -268,12 +287,13 @@ export const adminAPI = {
     return response.data
   },
   
-  getMerchants: async (status = null) => {
+  getMerchants: async (status = null, cursor = null) => {
     const token = localStorage.getItem('token')
     const params = { authorization: `Bearer ${token}` }
     if (status) params.status = status
+    if (cursor) params.cursor = cursor
     const response = await api.get('/admin/merchants', { params })
-    return response.data
+    return withNextCursor(response)
   },
   
   approveMerchant: async (merchantId) => {
@@ -293,12 +313,13 @@ export const adminAPI = {
     return response.data
   },
   
-  getTransactions: async (status = null) => {
+  getTransactions: async (status = null, cursor = null) => {
     const token = localStorage.getItem('token')
     const params = { authorization: `Bearer ${token}` }
     if (status) params.status = status
+    if (cursor) params.cursor = cursor
     const response = await api.get('/admin/transactions', { params })
-    return response.data
+    return withNextCursor(response)
   },
 }
 
@@ -0,0 +1,58 @@
+"""
+Production launcher: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+One worker per CPU core (WORKERS to override), each running the app on
+uvloop and httptools. The master creates the tables once, imports the app
+and runs the worker start hooks before forking (PRELOAD_APP), so workers
+share the imported code; every worker runs the hooks again before it
+accepts connections.
+
+Signals to the master:
+
+    HUP       start new workers with re-read configuration, then stop the old
+              ones gracefully. With PRELOAD_APP the new workers fork from the
+              master's already imported code, so deploy new code with USR2.
+    USR2      start a second master running the new code on the same socket;
+              send WINCH then QUIT to the old master once it is up
+    TERM      stop gracefully; workers finish in-flight requests for up to
+              GRACEFUL_TIMEOUT_SECONDS
+
+The listening socket stays open across HUP and USR2, so no connection is
+refused during a deploy.
+"""
+import os
+from app.config import settings
+
+bind = f"0.0.0.0:{settings.FASTAPI_PORT}"
+workers = settings.WORKERS or os.cpu_count() or 1
+worker_class = "app.utils.gunicorn_worker.Worker"
+preload_app = settings.PRELOAD_APP
+graceful_timeout = settings.GRACEFUL_TIMEOUT_SECONDS
+timeout = 60
+keepalive = 5
+accesslog = "-"
+
+
+def on_starting(server):
+    """Create or check the schema once, before any worker exists"""
+    from app.database import init_db
+    init_db()
+
+
+def when_ready(server):
+    if preload_app:
+        from app.utils.worker_hooks import run_worker_start_hooks
+        run_worker_start_hooks(server.log)
+
+
+def post_fork(server, worker):
+    # Connections opened by the master must not be shared with the worker
+    from app.database import dispose_engine
+    dispose_engine(close=False)
+
+
+def post_worker_init(worker):
+    from app.utils.worker_hooks import run_worker_start_hooks
+    run_worker_start_hooks(worker.log)
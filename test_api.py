@@ -7,7 +7,7 @@ import json
 from datetime import datetime
 
 BASE_URL = "http://127.0.0.1:8000/api/v1"
-FLASK_URL = "http://127.0.0.1:5000"
+FLASK_URL = "http://127.0.0.1:8000/flask"  # Flask admin mounted in the FastAPI app
 
 # Store tokens and IDs for later use
 tokens = {}
@@ -435,12 +435,6 @@ def run_all_tests():
     test_get_merchant_profile()
     test_get_merchant_balance()
     
-    print("\n" + "⚠️" * 20)
-    print("   STARTING FLASK ADMIN SERVER...")
-    print("   Make sure Flask is running on port 5000!")
-    print("⚠️" * 20)
-    input("\nPress Enter after starting Flask server (python flask_admin/app.py)...")
-    
     # Admin operations
     test_create_admin()
     test_admin_login()